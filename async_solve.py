@@ -0,0 +1,206 @@
+import asyncio
+import functools
+import os
+import sys
+import weakref
+import cloudpickle
+from pyomo.environ import Var
+"""
+Async versions of initialisation and solving, for serving many flowsheets from one event loop.
+
+Pyomo isn't thread-safe, so each job runs in its own subprocess: the model is pickled (see flowsheet_cache.py),
+the job is run on the copy, and the values of the variables in the block are sent back and applied to
+the original model when the job completes. If the job is cancelled or times out, the subprocess is killed
+and the original model is left unchanged.
+
+Example:
+    executor = SubprocessExecutor(max_workers=4)
+    res = await solve_async(m.fs, timeout=60, executor=executor)
+
+    # or, for many flowsheets at once
+    await asyncio.gather(*(staged_initialise_async(m.fs.h1, executor=executor) for m in models))
+"""
+
+
+def _solve_job(solver, options, blk):
+    from idaes.core.solvers import get_solver
+
+    return get_solver(solver, options).solve(blk)
+
+
+def _staged_initialise_job(solver, options, blk):
+    from idaes.core.solvers import get_solver
+    from model_initialisation import StagedInitialisationMixin, solver_options
+    from recycle import initialise_unit
+
+    if isinstance(blk, StagedInitialisationMixin):
+        blk.initialize(solver=solver, optarg=options)
+    elif isinstance(solver, str):
+        initialise_unit(blk, get_solver(solver, options))
+    else:
+        with solver_options(solver, options or {}):
+            initialise_unit(blk, solver)
+
+
+def _initialize_job(kwargs, blk):
+    blk.initialize(**kwargs)
+
+
+def _block_state(blk):
+    return [(v.value, v.fixed) for v in blk.component_data_objects(Var, descend_into=True)]
+
+
+def _apply_block_state(blk, state):
+    variables = list(blk.component_data_objects(Var, descend_into=True))
+    if len(variables) != len(state):
+        raise RuntimeError(
+            f"Block {blk.name} has changed structure while the job was running, so the results can't be applied."
+        )
+    for v, (val, fixed) in zip(variables, state):
+        v.set_value(val, skip_validation=True)
+        v.fixed = fixed
+
+
+def _worker():
+    """
+    Entry point of the subprocess. Reads (model, block name, job) from stdin,
+    and writes ("ok", block state, result) or ("error", exception) to stdout.
+    """
+    # Anything the job prints (e.g solver output) goes to stderr, so stdout is only used for the response.
+    out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    model, block_name, job = cloudpickle.loads(sys.stdin.buffer.read())
+    blk = model if block_name is None else model.find_component(block_name)
+    try:
+        result = job(blk)
+        response = ("ok", _block_state(blk), result)
+        data = cloudpickle.dumps(response)
+    except Exception as e:
+        try:
+            data = cloudpickle.dumps(("error", e))
+        except Exception:
+            data = cloudpickle.dumps(("error", RuntimeError(repr(e))))
+    out.write(data)
+    out.flush()
+
+
+class SubprocessExecutor:
+    """
+    Runs jobs on copies of a model in subprocesses, with at most max_workers running at once.
+
+    Args:
+        max_workers: The maximum number of subprocesses running at the same time. Defaults to the number of CPUs.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count()
+        # A semaphore is bound to the event loop it is first used in, and the executor may be shared
+        # between loops (e.g successive asyncio.run calls with the default executor), so there is one per loop.
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_workers)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def run(self, blk, job, timeout=None, apply=True):
+        """
+        Run job(blk) on a copy of the model in a subprocess, and apply the resulting
+        variable values (and fixed flags) to blk once it completes.
+
+        Args:
+            blk: The block to run the job on.
+            job: A function taking the block. It (and its return value) must be picklable with cloudpickle.
+            timeout: Seconds to wait before killing the subprocess and raising TimeoutError.
+                This includes time spent waiting for a free worker.
+            apply: If False, the block is left unchanged, and (result, state) is returned instead,
+                so the state can be applied later with _apply_block_state(blk, state).
+        Returns:
+            The return value of job.
+        """
+        model = blk.model()
+        block_name = None if blk is model else blk.getname(fully_qualified=True)
+        payload = cloudpickle.dumps((model, block_name, job))
+        result, state = await asyncio.wait_for(self._run(blk, payload), timeout)
+        if not apply:
+            return result, state
+        _apply_block_state(blk, state)
+        return result
+
+    async def _run(self, blk, payload):
+        async with self._semaphore():
+            env = dict(os.environ)
+            # The model is pickled by reference to the modules it was built with, so the subprocess
+            # needs to be able to import the same modules.
+            env["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-c",
+                "import async_solve; async_solve._worker()",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                env=env,
+            )
+            try:
+                data, _ = await proc.communicate(payload)
+            except BaseException:
+                # Cancelled or timed out
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                raise
+
+        if len(data) == 0:
+            raise RuntimeError(f"The subprocess for {blk.name} exited with code {proc.returncode} without a result.")
+        response = cloudpickle.loads(data)
+        if response[0] == "error":
+            raise response[1]
+        _, state, result = response
+        return result, state
+
+
+_default_executor = None
+
+
+def get_executor():
+    """
+    The executor used when none is given.
+    """
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = SubprocessExecutor()
+    return _default_executor
+
+
+async def solve_async(blk, solver="ipopt", options=None, timeout=None, executor=None):
+    """
+    Solve the block in a subprocess, and apply the solution to it.
+
+    Returns:
+        The solver results.
+    """
+    executor = executor or get_executor()
+    return await executor.run(blk, functools.partial(_solve_job, solver, options), timeout)
+
+
+async def staged_initialise_async(blk, solver="ipopt", options=None, timeout=None, executor=None):
+    """
+    Run staged_initialise() on the block in a subprocess, and apply the result to it.
+    As with recycle.initialise_unit(), the block's specification is released for the initialisation
+    (units with StagedInitialisationMixin use their initialize()), and its fixed variables are left as they were.
+    solver is a name for get_solver(), or a picklable solver object.
+    Raises InitializationError if the initialisation fails.
+    """
+    executor = executor or get_executor()
+    await executor.run(blk, functools.partial(_staged_initialise_job, solver, options), timeout)
+
+
+async def initialize_async(blk, timeout=None, executor=None, **kwargs):
+    """
+    Run blk.initialize(**kwargs) (e.g a unit model's initialize_build) in a subprocess, and apply the result to it.
+    """
+    executor = executor or get_executor()
+    await executor.run(blk, functools.partial(_initialize_job, kwargs), timeout)
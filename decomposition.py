@@ -0,0 +1,319 @@
+import asyncio
+import time
+import numpy as np
+from pyomo.environ import Constraint, Var
+from pyomo.network import SequentialDecomposition
+from pyomo.common.collections import ComponentMap, ComponentSet
+from recycle import _accelerators
+from solver_pool import WorkerProcess, worker_streams, read_message, write_message
+"""
+Solve a large flowsheet as several smaller ones in parallel.
+
+The units are partitioned along Arcs into sub-flowsheets. Each unit keeps its own registered state vars
+and replacements, so a partition is square once the inlet ports fed from other partitions are fixed.
+Each partition is kept in its own worker process (see solver_pool.py), which is sent the model once.
+Each round, a worker is only sent the values of its partition's inlets fed from other partitions (the coupling
+variables), and replies with the values of its outlets feeding other partitions, which become the new inlet values,
+until the two ends of every Arc between partitions agree. The values of the rest of each partition's variables
+are only sent back once, at the end.
+
+With method="jacobi", all partitions are solved at once with the coupling values from the previous round.
+With method="gauss-seidel", they are solved one after another in order, each using the latest values
+from the partitions before it, which needs fewer rounds on a mostly feed-forward flowsheet but doesn't
+run in parallel. The coupling values can also be accelerated like recycle tears (see recycle.py).
+
+Example:
+    report = solve_decomposed(m.fs, n_partitions=4, solver="ipopt", max_workers=4)
+    print(report)
+"""
+
+
+class DecompositionReport:
+    """
+    The partitions, and the coupling error and time of each round.
+    """
+
+    def __init__(self, name, partitions, coupling):
+        self.name = name
+        self.partitions = partitions  # lists of unit names
+        self.coupling = coupling  # names of the Arcs between partitions
+        self.rounds = []  # (seconds, coupling error)
+        self.converged = False
+
+    def add(self, seconds, error):
+        self.rounds.append((seconds, error))
+
+    @property
+    def total_time(self):
+        return sum(seconds for seconds, _ in self.rounds)
+
+    def __str__(self):
+        status = "converged" if self.converged else "not converged"
+        lines = [
+            f"Decomposed solve of {self.name}: {len(self.partitions)} partitions, "
+            f"{len(self.coupling)} coupling arcs, {len(self.rounds)} rounds, {self.total_time:.3f} s, {status}"
+        ]
+        for i, (seconds, error) in enumerate(self.rounds, 1):
+            lines.append(f"  round {i}: {seconds:.3f} s, coupling error {error:.3g}")
+        return "\n".join(lines)
+
+
+def partition_flowsheet(blk, n_partitions):
+    """
+    Split the units connected by Arcs into n_partitions groups of consecutive units in calculation order
+    (after tearing any recycles), so most Arcs are inside a partition or go forwards to the next one.
+    """
+    seq = SequentialDecomposition(select_tear_method="heuristic")
+    G = seq.create_graph(blk)
+    units = [unit for stage in seq.calculation_order(G) for unit in stage]
+    n_partitions = max(1, min(n_partitions, len(units)))
+    size, extra = divmod(len(units), n_partitions)
+    partitions = []
+    start = 0
+    for k in range(n_partitions):
+        end = start + size + (k < extra)
+        partitions.append(units[start:end])
+        start = end
+    return partitions
+
+
+def _owner(component, blk, units):
+    parent = component.parent_block()
+    while parent is not None and parent is not blk:
+        if parent in units:
+            return parent
+        parent = parent.parent_block()
+    return None
+
+
+def _arcs(blk):
+    seq = SequentialDecomposition()
+    G = seq.create_graph(blk)
+    return [data["arc"] for _, _, data in G.edges(data=True)]
+
+
+def _partition_worker():
+    """
+    Entry point of a partition's worker process. Reads the model and the partition,
+    then loops over ("solve", inlet values) and ("values",) messages.
+
+    Everything outside the partition's units and internal Arcs is deactivated, and the inlets fed from other
+    partitions are fixed. A solve replies with ("ok", optimal, termination condition, outlet values)
+    or ("error", exception), and ("values",) with the values of the variables of the partition's units.
+    """
+    conn, out = worker_streams()
+
+    from pyomo.environ import check_optimal_termination
+    from idaes.core.solvers import get_solver
+
+    model, block_name, unit_names, arc_names, inlet_names, outlet_names, solver, options = read_message(conn)
+    blk = model if block_name is None else model.find_component(block_name)
+    units = [blk.find_component(name) for name in unit_names]
+    unit_set = ComponentSet(units)
+    arc_blocks = ComponentSet(blk.find_component(name).expanded_block for name in arc_names)
+    for con in list(blk.component_data_objects(Constraint, active=True, descend_into=True)):
+        if _owner(con, blk, unit_set) is None and _owner(con, blk, arc_blocks) is None:
+            con.deactivate()
+    inlets = [v for name in inlet_names for v in blk.find_component(name).iter_vars()]
+    outlets = [v for name in outlet_names for v in blk.find_component(name).iter_vars()]
+    for v in inlets:
+        v.fix()
+    if isinstance(solver, str):
+        solver = get_solver(solver, options)
+
+    while True:
+        try:
+            message = read_message(conn)
+        except EOFError:
+            return
+        if message[0] == "values":
+            write_message(out, [v.value for v in _partition_vars(units)])
+            continue
+        for v, val in zip(inlets, message[1]):
+            v.set_value(val, skip_validation=True)
+        try:
+            res = solver.solve(blk)
+            reply = (
+                "ok",
+                check_optimal_termination(res),
+                str(res.solver.termination_condition),
+                [v.value for v in outlets],
+            )
+        except Exception as e:
+            reply = ("error", RuntimeError(f"Solving the partition {', '.join(unit_names)} failed: {e!r}"))
+        write_message(out, reply)
+
+
+def _partition_vars(units):
+    """
+    The variables of the units, in an order that is the same in a worker's copy of the model.
+    """
+    return [v for unit in units for v in unit.component_data_objects(Var, descend_into=True)]
+
+
+async def solve_decomposed_async(
+    blk,
+    partitions=None,
+    n_partitions=2,
+    solver="ipopt",
+    options=None,
+    method="jacobi",
+    acceleration="direct",
+    tol=1e-6,
+    max_iter=50,
+    max_workers=None,
+    timeout=None,
+):
+    """
+    Solve the flowsheet by partitions, each kept in a worker process, until the Arcs between them are consistent.
+
+    Args:
+        blk: The flowsheet. Its Arcs must have been expanded. Every active constraint must be in a unit
+            connected by an Arc, or in an expanded Arc.
+        partitions: Lists of units. Defaults to partition_flowsheet(blk, n_partitions).
+        solver: A solver name (with options), or a picklable solver object.
+        method: "jacobi" or "gauss-seidel".
+        acceleration: How the coupling values are updated between rounds: "direct", "wegstein" or "broyden".
+        tol: Converged once the ends of every coupling Arc agree within tol (relative to max(1, |value|)).
+        max_iter: The maximum number of rounds.
+        max_workers: The maximum number of partitions solved at once. Defaults to all of them.
+            There is still one worker process per partition.
+        timeout: Seconds allowed for each partition solve.
+    Returns:
+        A DecompositionReport. Raises RuntimeError if a partition fails to solve, or the rounds don't converge,
+        leaving the values from the last round.
+    """
+    if method not in ("jacobi", "gauss-seidel"):
+        raise ValueError(f"Unknown method {method}, expected jacobi or gauss-seidel.")
+    if partitions is None:
+        partitions = partition_flowsheet(blk, n_partitions)
+    owner = ComponentMap((unit, k) for k, units in enumerate(partitions) for unit in units)
+    units = ComponentSet(owner.keys())
+    arcs = _arcs(blk)
+    arc_blocks = ComponentSet(arc.expanded_block for arc in arcs)
+    stray = [
+        con.name
+        for con in blk.component_data_objects(Constraint, active=True, descend_into=True)
+        if _owner(con, blk, units) is None and _owner(con, blk, arc_blocks) is None
+    ]
+    if stray:
+        raise ValueError(
+            f"These constraints of {blk.name} aren't part of any partition: {', '.join(stray[:10])}"
+            + (" ..." if len(stray) > 10 else "")
+        )
+
+    def relative(component):
+        return component.getname(fully_qualified=True, relative_to=blk)
+
+    model = blk.model()
+    block_name = None if blk is model else blk.getname(fully_qualified=True)
+    coupling = [arc for arc in arcs if owner[arc.source.parent_block()] != owner[arc.destination.parent_block()]]
+    incoming = [[arc for arc in coupling if owner[arc.destination.parent_block()] == k] for k in range(len(partitions))]
+    outgoing = [[arc for arc in coupling if owner[arc.source.parent_block()] == k] for k in range(len(partitions))]
+    # The coupling variables each worker is sent, and replies with
+    inlets = [[v for arc in arcs_in for v in arc.destination.iter_vars()] for arcs_in in incoming]
+    outlets = [[v for arc in arcs_out for v in arc.source.iter_vars()] for arcs_out in outgoing]
+
+    report = DecompositionReport(blk.name, [[u.name for u in p] for p in partitions], [arc.name for arc in coupling])
+    dest_vars = [v for arc in coupling for v in arc.destination.iter_vars()]
+    source_vars = [v for arc in coupling for v in arc.source.iter_vars()]
+    accelerate = _accelerators[acceleration]()
+    semaphore = asyncio.Semaphore(max_workers or len(partitions))
+    solved = [False] * len(partitions)  # whether each worker's last solve succeeded
+
+    workers = [WorkerProcess("decomposition._partition_worker") for _ in partitions]
+
+    def exchange(worker, message):
+        worker.request(message)
+        return worker.reply()
+
+    async def call(k, message):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(asyncio.to_thread(exchange, workers[k], message), timeout)
+            except BaseException:
+                # Timed out or cancelled: the thread is left waiting for the reply until the worker is killed.
+                workers[k].process.kill()
+                raise
+
+    async def run(k):
+        solved[k] = False
+        reply = await call(k, ("solve", [v.value for v in inlets[k]]))
+        if reply[0] == "error":
+            raise reply[1]
+        _, ok, condition, values = reply
+        if not ok:
+            raise RuntimeError(f"Partition {k} of {blk.name} ({', '.join(report.partitions[k])}) failed: {condition}.")
+        for v, val in zip(outlets[k], values):
+            v.set_value(val, skip_validation=True)
+        solved[k] = True
+
+    async def fetch():
+        # Bring back the values of every partition that solved in its last round.
+        for k, partition in enumerate(partitions):
+            if solved[k] and workers[k].alive:
+                values = await call(k, ("values",))
+                for v, val in zip(_partition_vars(partition), values):
+                    v.set_value(val, skip_validation=True)
+                solved[k] = False
+
+    try:
+        # The whole model is only sent once to each worker.
+        for k, partition in enumerate(partitions):
+            internal = [relative(arc) for arc in arcs if arc not in coupling and owner[arc.source.parent_block()] == k]
+            workers[k].request(
+                (
+                    model,
+                    block_name,
+                    [relative(u) for u in partition],
+                    internal,
+                    [relative(arc.destination) for arc in incoming[k]],
+                    [relative(arc.source) for arc in outgoing[k]],
+                    solver,
+                    options,
+                )
+            )
+
+        x = np.array([v.value for v in dest_vars], dtype=float)
+        for _ in range(max_iter):
+            start = time.perf_counter()
+            for v, val in zip(dest_vars, x.tolist()):
+                v.set_value(val, skip_validation=True)
+            if method == "jacobi":
+                # Let every partition finish before raising, so the values left are all from this round.
+                results = await asyncio.gather(*(run(k) for k in range(len(partitions))), return_exceptions=True)
+                errors = [r for r in results if isinstance(r, BaseException)]
+                if errors:
+                    raise errors[0]
+            else:
+                for k in range(len(partitions)):
+                    for arc in incoming[k]:
+                        if owner[arc.source.parent_block()] < k:
+                            for src, dest in zip(arc.source.iter_vars(), arc.destination.iter_vars()):
+                                dest.set_value(src.value, skip_validation=True)
+                    await run(k)
+            x = np.array([v.value for v in dest_vars], dtype=float)
+            gx = np.array([v.value for v in source_vars], dtype=float)
+            error = float(np.max(np.abs(gx - x) / np.maximum(1.0, np.abs(x)), initial=0.0))
+            report.add(time.perf_counter() - start, error)
+            if error <= tol:
+                await fetch()
+                for v, val in zip(dest_vars, gx.tolist()):
+                    v.set_value(val, skip_validation=True)
+                report.converged = True
+                return report
+            x = accelerate(x, gx)
+        raise RuntimeError(f"The decomposed solve of {blk.name} did not converge in {max_iter} rounds.\n{report}")
+    finally:
+        try:
+            await fetch()
+        finally:
+            for worker in workers:
+                worker.close()
+
+
+def solve_decomposed(blk, max_workers=None, **kwargs):
+    """
+    Blocking version of solve_decomposed_async(), for use outside an event loop.
+    """
+    return asyncio.run(solve_decomposed_async(blk, max_workers=max_workers, **kwargs))
@@ -0,0 +1,95 @@
+import hashlib
+import os
+import cloudpickle
+"""
+A cache of fully built (and registered) flowsheets.
+
+Building an IAPWS based flowsheet from scratch takes seconds, which adds up when every
+worker in a process pool has to build its own copy. Instead, the flowsheet is built once,
+pickled, and every later request (in this process, or in any process sharing the cache directory)
+gets a fresh copy by unpickling it.
+
+IDAES creates a new class for every unit model instance, which the standard pickle module can't handle,
+so cloudpickle is used. The state variable registry is stored relative to each block (see model.RegistryList),
+so it stays consistent in the copies.
+
+Example:
+    def build_flowsheet(n_stages):
+        m = pyo.ConcreteModel()
+        ...
+        register_inlet_ports(m.fs)
+        return m
+
+    cache = FlowsheetCache(directory="/tmp/flowsheets")
+    m = cache.get(build_flowsheet, n_stages=3)
+"""
+
+
+class FlowsheetCache:
+    """
+    Stores pickled flowsheets keyed by the builder function and its parameters.
+
+    Args:
+        directory: If given, pickled flowsheets are also saved here, so other processes can load them.
+        max_size: The maximum number of flowsheets to keep in memory.
+    """
+
+    def __init__(self, directory=None, max_size=16):
+        self.directory = directory
+        self.max_size = max_size
+        self._pickles = {}
+
+    @staticmethod
+    def key(builder, **params):
+        """
+        The cache key for a builder function and its parameters.
+        """
+        return (builder.__module__, builder.__qualname__, tuple(sorted(params.items())))
+
+    def _path(self, key):
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.pkl")
+
+    def _load(self, key):
+        data = self._pickles.get(key)
+        if data is None and self.directory is not None:
+            path = self._path(key)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    data = f.read()
+                self._remember(key, data)
+        return data
+
+    def _remember(self, key, data):
+        self._pickles[key] = data
+        while len(self._pickles) > self.max_size:
+            # dicts keep insertion order, so this is the oldest entry
+            del self._pickles[next(iter(self._pickles))]
+
+    def store(self, model, builder, **params):
+        """
+        Add an already built model to the cache.
+        """
+        key = self.key(builder, **params)
+        data = cloudpickle.dumps(model)
+        self._remember(key, data)
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temporary file first, so other processes never see a partially written file.
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    def get(self, builder, **params):
+        """
+        Get a fresh copy of the flowsheet built by builder(**params), building it if it isn't in the cache.
+        """
+        key = self.key(builder, **params)
+        data = self._load(key)
+        if data is None:
+            model = builder(**params)
+            self.store(model, builder, **params)
+            return model
+        return cloudpickle.loads(data)
@@ -4,6 +4,14 @@ from pyomo.contrib.incidence_analysis import IncidenceGraphInterface
 from pyomo.network import Port, Arc
 from pyomo.core.base.var import IndexedVar, ScalarVar
 from pyomo.gdp import Disjunct
+from pyomo.common.collections import ComponentMap, ComponentSet
+from pyomo.core.base.indexed_component_slice import IndexedComponent_slice
+from pyomo.core.base.componentuid import ComponentUID
+from pyomo.core.expr.visitor import identify_variables
+from collections import deque
+import warnings
+from pyomo.common.errors import PyomoException, InfeasibleConstraintException
+from pyomo.contrib.fbbt.fbbt import fbbt
 """
 Requirements:
 - Ability to identify state vars in a block
@@ -16,6 +24,89 @@ Requirements:
     - current guess variables (state vars that are replaced) (recursively)
 """
 
+class RegistryList:
+    """
+    A list of components (or tuples of components, for replacements) registered on a block.
+
+    The components are stored as ComponentUID strings relative to the block that owns the list,
+    rather than as references to the components themselves. This is compact, and means the registry
+    stays consistent when the block is cloned or pickled: the entries are resolved against whichever
+    block the list ends up on. Components outside the owner block are stored relative to the model.
+
+    It behaves like a list of the components themselves, so it can be iterated, indexed and appended to.
+    """
+
+    def __init__(self, owner, items=()):
+        self._owner = owner
+        self._entries = []
+        self._resolved = None  # cache of the resolved components, not copied or pickled
+        self.extend(items)
+
+    def _encode(self, component):
+        if isinstance(component, tuple):
+            return tuple(self._encode(c) for c in component)
+        if component.parent_block() is None:
+            # Not attached to a model (e.g an unnamed Reference), so it can't be looked up by name.
+            return component
+        try:
+            return str(ComponentUID(component, context=self._owner))
+        except ValueError:
+            return ComponentUID(component)
+
+    def _decode(self, entry):
+        if isinstance(entry, tuple):
+            return tuple(self._decode(e) for e in entry)
+        if isinstance(entry, str):
+            return ComponentUID(entry).find_component_on(self._owner)
+        if isinstance(entry, ComponentUID):
+            return entry.find_component_on(self._owner.model())
+        return entry
+
+    def _components(self):
+        if self._resolved is None:
+            self._resolved = [self._decode(e) for e in self._entries]
+        return self._resolved
+
+    def append(self, item):
+        self._entries.append(self._encode(item))
+        self._resolved = None
+
+    def extend(self, items):
+        self._entries.extend(self._encode(item) for item in items)
+        self._resolved = None
+
+    def __setitem__(self, index, item):
+        self._entries[index] = self._encode(item)
+        self._resolved = None
+
+    def __getitem__(self, index):
+        return self._components()[index]
+
+    def __iter__(self):
+        return iter(self._components())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"RegistryList({self._entries})"
+
+    def __getstate__(self):
+        return {"_owner": self._owner, "_entries": self._entries, "_resolved": None}
+
+
+class _TransientCache:
+    """
+    Holds something that is cheap to rebuild (e.g a matching), and is dropped when the block is cloned or pickled.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    def __getstate__(self):
+        return {"value": None}
+
+
 def is_child_of(block, component):
     parent = component.parent_block()
     while parent is not None:
@@ -32,10 +123,12 @@ def register_block(block, state_vars: list, allow_degrees_of_freedom=False):
     Args:
         block: The block to register the state variables for.
         state_vars: List of variables to register as state variables. These will all be fixed when registering the block.
+            Index slices (e.g block.split_fraction["outlet_1", :]) are expanded into their elements.
         allow_degrees_of_freedom: If True, the block is allowed to have degrees of freedom of greater than zero. This is for example when the block is constrained by external constraints, e.g inlet conditions.
     Raises:
         ValueError: If any of the state variables are not part of the block, or if the block does not have zero degrees of freedom after fixing the state variables.
     """
+    state_vars = _expand_vars(state_vars)
     for v in state_vars:
         if is_child_of(v,block):
             raise ValueError(
@@ -56,8 +149,9 @@ def register_block(block, state_vars: list, allow_degrees_of_freedom=False):
             "Perhaps you included a variable that is not a state variable, or you are fixing extra variables other than the state variables?"
         )
 
-    block._state_vars = state_vars
-    block._replacements = []  # List of (old_var, new_var) tuples for replacements
+    block._state_vars = RegistryList(block, state_vars)
+    block._replacements = RegistryList(block)  # List of (old_var, new_var) tuples for replacements
+    _invalidate_matching(block)
 
 def is_fixed(var : Var | IndexedVar):
     """
@@ -115,6 +209,38 @@ def list_replacements(block):
 
 
 
+def list_block_replacements(block):
+    """
+    List all replacements of state variables that belong to this block.
+
+    replace_state_var() stores replacements on the flowsheet, so this also looks at the
+    replacements stored on parent blocks and picks out the ones whose state variable is inside this block.
+    """
+    replacements = list_replacements(block)
+    parent = block.parent_block()
+    while parent is not None:
+        replacements.extend(
+            r for r in getattr(parent, "_replacements", []) if is_child_of(block, r[0])
+        )
+        parent = parent.parent_block()
+    return replacements
+
+
+def list_specification(block):
+    """
+    List the variables that define the block: the state variables that have not been replaced,
+    followed by the variables that replaced them.
+
+    Unlike list_fixed_state_vars(), this only depends on what has been registered,
+    not on which variables are currently fixed, so it can be used during initialisation.
+    """
+    replacements = list_block_replacements(block)
+    replaced = [state_var for state_var, _ in replacements]
+    return [var for var in list_state_vars(block) if not is_in(var, replaced)] + [
+        new_var for _, new_var in replacements
+    ]
+
+
 def _try_get_state_vars(block):
     """
     Helper function to get state vars from a block, or return an empty list if none are registered.
@@ -128,9 +254,11 @@ def _safe_equal(var1,var2):
     """
     Safe equality check to handle different types of var/indexed var comparisons.
     """
+    if var1 is var2:
+        return True
     try:
-        return var1 == var2
-    except TypeError:
+        return bool(var1 == var2)
+    except (TypeError, PyomoException):
         return False
 
 
@@ -173,7 +301,307 @@ def is_in(obj, container):
     return any(obj is x for x in container)
 
 
-def replace_state_var(state_var, new_var):
+def _unmatched_constraints(parent_block):
+    """
+    Validate that the currently fixed variables do not cause an over-constrained or under-constrained set.
+    Returns the constraints that can't be matched to a variable.
+    """
+    # https://pyomo.readthedocs.io/en/6.8.0/contributed_packages/incidence/tutorial.dm.html
+    igraph = IncidenceGraphInterface(parent_block)
+    var_dm_partition, constraint_dm_partion = igraph.dulmage_mendelsohn()
+
+    #  ignore unmatched variables, as some of them may be fixed by outside constraints.
+    # however, if internal constraints are unmatched, that is definitely over-defined.
+    # this does not guarantee that the system is well-defined, as we would have to check both at the model level.
+    return constraint_dm_partion.unmatched
+
+
+def _unit_of(component, parent_block):
+    """
+    The closest parent of the component (below parent_block) with registered state variables,
+    i.e the unit operation it belongs to. None if it is not part of a unit.
+    """
+    block = component.parent_block()
+    while block is not None and block is not parent_block:
+        if hasattr(block, "_state_vars"):
+            return block
+        block = block.parent_block()
+    return None
+
+
+def _unit_arcs(unit, parent_block):
+    """
+    (arc, port on this unit, unit on the other end) for every Arc connected to the unit.
+    """
+    for port in unit.component_data_objects(Port, descend_into=True):
+        for arc in port.arcs():
+            other_port = arc.destination if arc.source is port else arc.source
+            yield arc, port, _unit_of(other_port, parent_block)
+
+
+def _unmatched_constraints_in_scope(parent_block, variables):
+    """
+    Structural check limited to the units that contain the variables, plus their Arc-connected neighbours.
+
+    Each unit is square once its inlets are known, so inside the scope, variables of ports fed by units
+    outside the scope are treated as given by those units, and variables of ports feeding units outside the scope
+    are free to be calculated here. If the scope can only be matched by also using variables that are
+    given from outside (e.g because a replacement pushes information upstream), the scope is widened
+    to include the units those variables come from, and the check is repeated.
+    This way, the cost of a replacement depends on the size of the units involved, not the size of the flowsheet.
+
+    If a constraint can't be matched even when every variable it contains is available,
+    it can't be matched in the whole flowsheet either, so the check fails straight away.
+    Falls back to checking the whole flowsheet if a variable is not part of a unit.
+
+    Returns:
+        The constraints that could not be matched.
+    """
+    scope = ComponentSet()
+    for var in variables:
+        unit = _unit_of(var, parent_block)
+        if unit is None:
+            return _unmatched_constraints(parent_block)
+        scope.add(unit)
+    for unit in list(scope):
+        scope.update(other for _, _, other in _unit_arcs(unit, parent_block) if other is not None)
+
+    # Constraints directly on the flowsheet can link any units, so they are always included.
+    flowsheet_constraints = list(
+        parent_block.component_data_objects(Constraint, active=True, descend_into=False)
+    )
+    while True:
+        constraints = list(flowsheet_constraints)
+        # variables given from outside the scope -> the unit they come from (None if not part of a unit)
+        given = ComponentMap()
+        arcs_done = ComponentSet()
+        for unit in scope:
+            constraints.extend(unit.component_data_objects(Constraint, active=True, descend_into=True))
+            for arc, port, other in _unit_arcs(unit, parent_block):
+                if other is not None and other in scope:
+                    if arc not in arcs_done and arc.expanded_block is not None:
+                        arcs_done.add(arc)
+                        constraints.extend(
+                            arc.expanded_block.component_data_objects(Constraint, active=True)
+                        )
+                elif arc.destination is port:
+                    for v in port.iter_vars(fixed=False):
+                        given[v] = other
+        interior = ComponentSet()
+        for con in constraints:
+            for v in identify_variables(con.body, include_fixed=False):
+                unit = _unit_of(v, parent_block)
+                if unit is None or unit not in scope:
+                    given[v] = unit
+                elif v not in given:
+                    interior.add(v)
+
+        # Match using the variables inside the scope first, then see if the rest can be matched using given variables.
+        con_to_var = ComponentMap(
+            IncidenceGraphInterface().maximum_matching(variables=list(interior), constraints=constraints)
+        )
+        var_to_con = ComponentMap((v, c) for c, v in con_to_var.items())
+        journal = []
+        unmatched = [
+            con
+            for con in constraints
+            if con not in con_to_var and not _augment_matching(con, con_to_var, var_to_con, journal)
+        ]
+        if len(unmatched) > 0:
+            return unmatched
+
+        wider = ComponentSet()
+        for v in var_to_con:
+            if v in given:
+                if given[v] is None:
+                    return _unmatched_constraints(parent_block)
+                wider.add(given[v])
+        if len(wider) == 0:
+            return []
+        scope.update(wider)
+
+
+def _check_structure(parent_block, state_vars, new_vars):
+    """
+    Check that the replacements (already made, i.e state_vars unfixed and new_vars fixed)
+    do not cause a structural singularity.
+
+    If a matching has been cached for the flowsheet (see retarget_replacement) and no other variables have been
+    fixed or unfixed since, it is updated locally.
+    Otherwise only the units around the variables are checked (see _unmatched_constraints_in_scope).
+
+    Returns:
+        The constraints that could not be matched.
+    """
+    new_var_datas = [v for var in new_vars for v in _var_datas(var)]
+    variables = [v for var in state_vars for v in _var_datas(var)] + new_var_datas
+    if _has_matching(parent_block):
+        matching = parent_block._matching.value
+        if matching.is_current(changed=variables):
+            return _rematch(matching, new_var_datas)
+        # Something else has changed since the matching was made, so it can't be trusted.
+        _invalidate_matching(parent_block)
+    return _unmatched_constraints_in_scope(parent_block, variables)
+
+
+def _expand_vars(variables):
+    """
+    Expand a variable, index slice (e.g m.fs.sep.split_fraction["outlet_1", :]) or list of them
+    into a flat list. Slices are expanded into their variable data objects, other variables are kept as is.
+    """
+    if isinstance(variables, IndexedComponent_slice) or not isinstance(variables, (list, tuple)):
+        variables = [variables]
+    expanded = []
+    for var in variables:
+        if isinstance(var, IndexedComponent_slice):
+            expanded.extend(var)
+        else:
+            expanded.append(var)
+    return expanded
+
+
+def _registered_state_vars(variables):
+    """
+    All state variables registered on the parent blocks of the given variables.
+    """
+    registered = ComponentSet()
+    parents = ComponentSet(var.parent_block() for var in variables)
+    for parent in parents:
+        registered.update(getattr(parent, "_state_vars", []))
+    return registered
+
+
+def replace_state_vars(state_vars, new_vars, values=None, feasibility_check=None, tighten_bounds=False):
+    """
+    Replace many state variables at once, e.g all split_fraction["outlet_1", :] by all outlet_1.flow_mol_comp[:, :].
+
+    This does the same checks as replace_state_var(), but using sets, and with a single structural check
+    for all the replacements, so it is much faster than calling replace_state_var() for each element.
+    The state variables and new variables are paired up in the order they are given (slices are expanded in index order).
+
+    Args:
+        state_vars: A list of state variables and/or index slices of state variables.
+        new_vars: A list of variables and/or index slices of the same length, to replace them with.
+        values, feasibility_check, tighten_bounds: See replace_state_var(). values is a list, one for each new variable.
+    Raises:
+        ValueError: If the replacements are not valid. In this case none of the replacements are made.
+    """
+    state_vars = _expand_vars(state_vars)
+    new_vars = _expand_vars(new_vars)
+    if len(state_vars) != len(new_vars):
+        raise ValueError(
+            f"Cannot replace {len(state_vars)} state variables with {len(new_vars)} variables. "
+            "The same number of variables is needed."
+        )
+    if len(state_vars) == 0:
+        return
+
+    parent_block = state_vars[0].parent_block().flowsheet()
+    if parent_block is None:
+        raise ValueError(
+            f"Variable {state_vars[0]} is not part of a flowsheet."
+        )
+    for state_var in state_vars:
+        if state_var.parent_block().flowsheet() is not parent_block:
+            raise ValueError(
+                f"Variable {state_var} is not in the same flowsheet as {state_vars[0]}. "
+                "Replace state variables in different flowsheets separately."
+            )
+
+    registered = _registered_state_vars(state_vars)
+    registered_new = _registered_state_vars(new_vars)
+    for state_var in state_vars:
+        # The state var must be currently fixed, and must be registered as a state var.
+        if state_var not in registered:
+            raise ValueError(
+                f"Variable {state_var} is not a registered state variable in the closest common parent block {parent_block.name}."
+            )
+        if not is_fixed(state_var):
+            raise ValueError(f"Variable {state_var} must be fixed to be replaced.")
+    for new_var in new_vars:
+        # The new var must not be a state var, and must not be fixed.
+        if new_var in registered_new:
+            raise ValueError(
+                f"Variable {new_var} is a registered state variable in the closest common parent block {parent_block.name}."
+            )
+        if is_fixed(new_var):
+            raise ValueError(
+                f"Variable {new_var} must not be fixed to be used as a replacement."
+            )
+    if len(ComponentSet(state_vars)) != len(state_vars) or len(ComponentSet(new_vars)) != len(new_vars):
+        raise ValueError("The same variable cannot be replaced (or used as a replacement) twice.")
+    if values is not None and len(values) != len(new_vars):
+        raise ValueError(f"{len(values)} values were given for {len(new_vars)} new variables.")
+
+    previous_values = [[v.value for v in _var_datas(new_var)] for new_var in new_vars]
+    for state_var in state_vars:
+        state_var.unfix()
+    for i, new_var in enumerate(new_vars):
+        if values is None:
+            new_var.fix()
+        else:
+            new_var.fix(values[i])
+
+    unmatched = _check_structure(parent_block, state_vars, new_vars)
+    if len(unmatched) > 0:
+        # Revert the replacements
+        for new_var in new_vars:
+            new_var.unfix()
+        for state_var in state_vars:
+            state_var.fix()
+        raise ValueError(
+            f"Replacing {len(state_vars)} variables causes a structural singularity in {parent_block.name}. These variables cannot be replaced with the given system configuration."
+            "Unmatched constraints: "
+            f"{list(i.name for i in unmatched)}"
+        )
+
+    if feasibility_check is not None:
+        try:
+            _check_feasibility(parent_block, state_vars + new_vars, feasibility_check, tighten_bounds)
+        except ValueError:
+            for new_var, previous in zip(new_vars, previous_values):
+                new_var.unfix()
+                for v, val in zip(_var_datas(new_var), previous):
+                    v.set_value(val, skip_validation=True)
+            for state_var in state_vars:
+                state_var.fix()
+            _invalidate_matching(parent_block)
+            raise
+
+    if not hasattr(parent_block, "_replacements"):
+        parent_block._replacements = RegistryList(parent_block)
+    parent_block._replacements.extend(zip(state_vars, new_vars))
+
+
+def replace_state_var(state_var, new_var, value=None, feasibility_check=None, tighten_bounds=False):
+    """
+    Replace a state variable with another variable: the state variable is unfixed,
+    and the new variable is fixed instead.
+
+    If index slices or lists of variables are given, this is done with replace_state_vars().
+
+    Args:
+        value: The value to fix the new variable at. Otherwise it is fixed at its current value.
+        feasibility_check: None, "raise" or "warn". If given, bounds propagation (see propagate_bounds())
+            is run on the units containing the variables, with the new variable fixed. If it shows the units
+            are infeasible (e.g a valve outlet pressure above the inlet pressure), the replacement is undone
+            and ValueError raised, or a warning is given.
+        tighten_bounds: If True (and feasibility_check is given), keep the bounds found by the bounds propagation,
+            which can help later solves.
+    Raises:
+        ValueError: If the state variable can't be replaced by the new variable.
+    """
+    if isinstance(state_var, (IndexedComponent_slice, list, tuple)) or isinstance(
+        new_var, (IndexedComponent_slice, list, tuple)
+    ):
+        return replace_state_vars(
+            state_var,
+            new_var,
+            None if value is None else [value] * len(_expand_vars(new_var)),
+            feasibility_check,
+            tighten_bounds,
+        )
+
     state_var_parent = state_var.parent_block()
     new_var_parent = new_var.parent_block()
     parent_block = state_var_parent.flowsheet()
@@ -210,8 +638,12 @@ def replace_state_var(state_var, new_var):
     #         f"Block {parent_block.name} must have zero degrees of freedom before replacement. Something is wrong with the model formulation. It currently has {degrees_of_freedom(parent_block)} degrees of freedom."
     #     )
     # Perform the replacement
+    previous = [v.value for v in _var_datas(new_var)]
     state_var.unfix()
-    new_var.fix()
+    if value is None:
+        new_var.fix()
+    else:
+        new_var.fix(value)
 
     # if degrees_of_freedom(parent_block) != 0:
     #     # Revert the replacement
@@ -221,31 +653,327 @@ def replace_state_var(state_var, new_var):
     #         f"Block {parent_block.name} must have zero degrees of freedom after replacement. Did you try to replace an indexed variable with one which has a different size?"
     #     )
 
-    # Validate that this does not cause an over-constrained or under-constrained set.
-    # https://pyomo.readthedocs.io/en/6.8.0/contributed_packages/incidence/tutorial.dm.html
-    igraph = IncidenceGraphInterface(parent_block)
-    var_dm_partition, constraint_dm_partion = igraph.dulmage_mendelsohn()
-
-    #  ignore unmatched variables, as some of them may be fixed by outside constraints.
-    # however, if internal constraints are unmatched, that is definitely over-defined.
-    # this does not guarantee that the system is well-defined, as we would have to check both at the model level.
-    if len(constraint_dm_partion.unmatched) > 0:
+    unmatched = _check_structure(parent_block, [state_var], [new_var])
+    if len(unmatched) > 0:
         # Revert the replacement
         state_var.fix()
         new_var.unfix()
         raise ValueError(
             f"Replacing variable {state_var} with {new_var} causes a structural singularity in {parent_block.name}. These variables cannot be replaced with the given system configuration."
             "Unmatched constraints: "
-            f"{list(i.name for i in constraint_dm_partion.unmatched)}"
+            f"{list(i.name for i in unmatched)}"
         )
 
+    if feasibility_check is not None:
+        try:
+            _check_feasibility(parent_block, [state_var, new_var], feasibility_check, tighten_bounds)
+        except ValueError:
+            new_var.unfix()
+            for v, val in zip(_var_datas(new_var), previous):
+                v.set_value(val, skip_validation=True)
+            state_var.fix()
+            _invalidate_matching(parent_block)
+            raise
+
     # Record the replacement (old_var, new_var) so that it can be tracked.
 
     if not hasattr(parent_block, "_replacements"):
-        parent_block._replacements = []
+        parent_block._replacements = RegistryList(parent_block)
 
     parent_block._replacements.append((state_var, new_var))
 
+def propagate_bounds(block, tighten=False):
+    """
+    Run bounds propagation (FBBT) over the active constraints of the block, with fixed variables at their values.
+
+    Raises:
+        ValueError: If no values of the unfixed variables within their bounds can satisfy the constraints.
+    Returns:
+        A ComponentMap of {variable: (lb, ub)} for the variables whose bounds could be tightened.
+        The tighter bounds are only kept on the variables if tighten is True.
+    """
+    variables = ComponentSet()
+    for con in block.component_data_objects(Constraint, active=True, descend_into=True):
+        variables.update(identify_variables(con.body, include_fixed=False))
+    original = ComponentMap((v, (v.lb, v.ub)) for v in variables)
+
+    def restore():
+        for v, (lb, ub) in original.items():
+            v.setlb(lb)
+            v.setub(ub)
+
+    try:
+        fbbt(block)
+    except InfeasibleConstraintException as e:
+        restore()
+        raise ValueError(f"Bounds propagation shows that {block.name} is infeasible: {e}") from e
+    tightened = ComponentMap((v, (v.lb, v.ub)) for v, bounds in original.items() if (v.lb, v.ub) != bounds)
+    if not tighten:
+        restore()
+    return tightened
+
+
+def _check_feasibility(parent_block, variables, mode, tighten):
+    """
+    Run propagate_bounds() on the units containing the variables. Raises ValueError or warns, depending on mode.
+    """
+    if mode not in ("raise", "warn"):
+        raise ValueError(f"feasibility_check must be None, 'raise' or 'warn', not {mode!r}.")
+    units = ComponentSet()
+    for var in variables:
+        unit = _unit_of(var, parent_block)
+        units.add(parent_block if unit is None else unit)
+    for unit in units:
+        try:
+            propagate_bounds(unit, tighten)
+        except ValueError as e:
+            if mode == "raise":
+                raise
+            warnings.warn(str(e))
+
+
+def _var_datas(var):
+    """
+    Return the scalar variable data objects that make up a variable or indexed variable.
+    """
+    if isinstance(var, IndexedVar):
+        return list(var.values())
+    return [var]
+
+
+def _invalidate_matching(block):
+    """
+    Drop any cached matching on this block or its parents, e.g because variables have been fixed.
+    """
+    while block is not None:
+        if getattr(block, "_matching", None) is not None:
+            block._matching = None
+        block = block.parent_block()
+
+
+class _Matching:
+    """
+    A maximum matching between the active equality constraints and unfixed variables of a block,
+    along with which variables were fixed and which constraints were active when it was last updated,
+    so that changes made outside replace_state_var/retarget_replacement (e.g fixing a variable by hand) are detected.
+    """
+
+    def __init__(self, block):
+        igraph = IncidenceGraphInterface(block)
+        self.con_to_var = ComponentMap(igraph.maximum_matching())
+        self.var_to_con = ComponentMap((v, c) for c, v in self.con_to_var.items())
+        self.constraints = list(igraph.constraints)
+        variables = ComponentSet()
+        for con in self.constraints:
+            variables.update(identify_variables(con.body, include_fixed=True))
+        self.variables = list(variables)
+        self.update_signature()
+
+    def update_signature(self):
+        self.fixed = [v.fixed for v in self.variables]
+        self.active = [con.active for con in self.constraints]
+
+    def is_current(self, changed=()):
+        """
+        True if no variable (other than those in changed) has been fixed or unfixed,
+        and no constraint (de)activated, since the matching was last updated.
+        New constraints or variables are not detected.
+        """
+        changed = ComponentSet(changed)
+        return all(
+            con.active == active for con, active in zip(self.constraints, self.active)
+        ) and all(
+            v.fixed == fixed or v in changed for v, fixed in zip(self.variables, self.fixed)
+        )
+
+
+def _get_matching(parent_block):
+    """
+    Get the maximum matching for the block.
+
+    The matching is computed once with the incidence graph and cached on the block,
+    so that later local changes (see retarget_replacement) can be checked against it
+    without redoing the structural analysis of the whole flowsheet.
+    It is recomputed if variables have been fixed or unfixed (or constraints (de)activated) since.
+    """
+    cache = getattr(parent_block, "_matching", None)
+    if cache is None or cache.value is None or not cache.value.is_current():
+        cache = _TransientCache(_Matching(parent_block))
+        parent_block._matching = cache
+    return cache.value
+
+
+def _set_matching(mapping, key, value, journal):
+    """
+    Set (or remove, if value is None) an entry in the matching, recording the old value in journal.
+    """
+    journal.append((mapping, key, mapping.get(key)))
+    if value is None:
+        mapping.pop(key, None)
+    else:
+        mapping[key] = value
+
+
+def _undo_matching(journal):
+    """
+    Undo the changes recorded in the journal, in reverse order.
+    """
+    for mapping, key, old_value in reversed(journal):
+        if old_value is None:
+            mapping.pop(key, None)
+        else:
+            mapping[key] = old_value
+    journal.clear()
+
+
+def _augment_matching(con, con_to_var, var_to_con, journal):
+    """
+    Find a new variable for an unmatched constraint by searching for an augmenting path,
+    i.e constraint -> var -> matched constraint -> var ... -> unmatched var.
+
+    Only the constraints reachable from `con` are visited, so the cost depends on
+    the size of the local change, not the size of the model.
+
+    Returns:
+        True if the constraint could be matched, False otherwise.
+    """
+    reached_from = ComponentMap()  # var -> constraint it was reached from
+    queue = deque([con])
+    while queue:
+        c = queue.popleft()
+        for v in identify_variables(c.body, include_fixed=False):
+            if v in reached_from:
+                continue
+            reached_from[v] = c
+            next_con = var_to_con.get(v)
+            if next_con is not None:
+                queue.append(next_con)
+                continue
+            # v is unmatched, so flip the matching along the path back to con.
+            while True:
+                c = reached_from[v]
+                previous_var = con_to_var.get(c)
+                _set_matching(con_to_var, c, v, journal)
+                _set_matching(var_to_con, v, c, journal)
+                if c is con:
+                    return True
+                v = previous_var
+    return False
+
+
+def _has_matching(block):
+    cache = getattr(block, "_matching", None)
+    return cache is not None and cache.value is not None
+
+
+def _rematch(matching, newly_fixed):
+    """
+    Update the matching after the variables in newly_fixed have been fixed
+    (any variables that have been unfixed are simply available to be matched).
+
+    Returns:
+        The constraints that could not be matched. In this case the matching is left unchanged.
+    """
+    con_to_var, var_to_con = matching.con_to_var, matching.var_to_con
+    journal = []
+    unmatched = []
+    for v in newly_fixed:
+        con = var_to_con.get(v)
+        if con is not None:
+            _set_matching(var_to_con, v, None, journal)
+            _set_matching(con_to_var, con, None, journal)
+            unmatched.append(con)
+    for con in unmatched:
+        if not _augment_matching(con, con_to_var, var_to_con, journal):
+            _undo_matching(journal)
+            return [con]
+    matching.update_signature()
+    return []
+
+
+def _find_replacement(var, position):
+    """
+    Find the replacement list and index where `var` is the state var (position 0)
+    or the replacing var (position 1). Replacements are stored on a parent block,
+    so we walk up from the variable.
+    """
+    block = var.parent_block()
+    while block is not None:
+        for i, replacement in enumerate(getattr(block, "_replacements", [])):
+            if replacement[position] is var:
+                return block, i
+        block = block.parent_block()
+    raise ValueError(f"Variable {var} is not part of an existing replacement.")
+
+
+def retarget_replacement(state_var, new_var):
+    """
+    Change the variable that replaces an already replaced state variable.
+
+    For example, if heat duty has been replaced with outlet enthalpy,
+    this can be used to replace heat duty with outlet temperature instead.
+
+    Rather than redoing the structural check on the whole flowsheet, only the local change is
+    checked against the existing matching: the constraint that was matched to new_var
+    must be able to find another variable (e.g the old replacing variable) to match to.
+
+    Args:
+        state_var: The state variable that has already been replaced.
+        new_var: The variable that should replace it instead.
+    Raises:
+        ValueError: If state_var has not been replaced, if new_var can't be used as a replacement,
+            or if the change causes a structural singularity.
+    """
+    block, index = _find_replacement(state_var, 0)
+    old_var = block._replacements[index][1]
+    if new_var is old_var:
+        return
+
+    new_var_parent = new_var.parent_block()
+    if hasattr(new_var_parent, "_state_vars") and is_in(
+        new_var, new_var_parent._state_vars
+    ):
+        raise ValueError(
+            f"Variable {new_var} is a registered state variable in {new_var_parent.name}."
+        )
+    if any(new_var is v for _, v in list_replacements(block)):
+        raise ValueError(
+            f"Variable {new_var} is already used as a replacement in {block.name}."
+        )
+    if is_fixed(new_var):
+        raise ValueError(
+            f"Variable {new_var} must not be fixed to be used as a replacement."
+        )
+
+    matching = _get_matching(block)
+    old_var.unfix()
+    new_var.fix()
+    # new_var becomes fixed, so the constraints it was matched to need a new match.
+    # old_var becomes unfixed, so it is available to be matched.
+    unmatched = _rematch(matching, _var_datas(new_var))
+    if len(unmatched) > 0:
+        # Revert the change
+        new_var.unfix()
+        old_var.fix()
+        raise ValueError(
+            f"Replacing variable {state_var} with {new_var} causes a structural singularity in {block.name}. These variables cannot be replaced with the given system configuration."
+            f"Unmatched constraints: {list(c.name for c in unmatched)}"
+        )
+
+    block._replacements[index] = (state_var, new_var)
+
+
+def chain_replacement(replacing_var, new_var):
+    """
+    Hand the role of a replacing variable over to another variable.
+
+    If A is replaced by B, chain_replacement(B, C) means A is now replaced by C instead.
+    See retarget_replacement().
+    """
+    block, index = _find_replacement(replacing_var, 1)
+    retarget_replacement(block._replacements[index][0], new_var)
+
+
 def fix_port(port: Port):
     """
     To allow the degrees of freedom check to work,
@@ -311,13 +1039,14 @@ def register_inlet_ports(block):
             parent_block = port.parent_block()
             # Initialise block if there are no state vars yet
             if not hasattr(parent_block, "_state_vars"):
-                parent_block._state_vars = []
-                parent_block._replacements = []
+                parent_block._state_vars = RegistryList(parent_block)
+                parent_block._replacements = RegistryList(parent_block)
             # Add all variables in the port to the state vars if not already present
             for var_name in port.vars:
                 var = getattr(port, var_name)
                 if not _has_var(var, parent_block._state_vars):
                     var.fix()
                     parent_block._state_vars.append(var)
+                    _invalidate_matching(parent_block)
 
     
\ No newline at end of file
@@ -1,5 +1,8 @@
+import time
+import numpy as np
 from idaes.models.unit_models.valve import ValveData
-from model import is_child_of
+from contextlib import contextmanager
+from model import is_child_of, list_block_replacements, list_state_vars, _var_datas
 from idaes.core.util.exceptions import PropertyNotSupportedError, InitializationError
 import idaes.logger as idaeslog
 from idaes.core.solvers import get_solver
@@ -10,12 +13,19 @@ from pyomo.environ import (
     Reference,
     Var,
     Block,
+    Constraint,
 )
 from pyomo.network import Port
+from pyomo.common.collections import ComponentMap, ComponentSet
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.util.calc_var_value import calculate_variable_from_constraint
+from idaes.core.base.property_base import StateBlock
 from idaes.core.util.model_serializer import StoreSpec
 
 from idaes.core.util.model_serializer import (
     to_json, from_json)
+from pyomo.common.tempfiles import TempfileManager
+from surrogates import seed_from_surrogate
 
 
 def record_model_definition(blk: Block) -> dict:
@@ -64,14 +74,36 @@ def restore_model_definition(blk: Block, state: dict):
     from_json(blk, sd=state, wts=StoreSpec.value_isfixed(True)) # only load the fixed values
 
 
+def solve_with_iterations(opt, blk, tee=False, **kwargs):
+    """
+    Solve the block, and also return the number of solver iterations.
+
+    The iteration count is read from the solver log (the line IPOPT prints as "Number of Iterations....:"),
+    and is None if the solver doesn't report it.
+
+    Returns:
+        (results, iterations)
+    """
+    with TempfileManager.new_context() as tempfiles:
+        logfile = tempfiles.create_tempfile(suffix=".log")
+        res = opt.solve(blk, tee=tee, logfile=logfile, **kwargs)
+        iterations = None
+        with open(logfile) as f:
+            for line in f:
+                if line.startswith("Number of Iterations....:"):
+                    iterations = int(line.split(":")[1])
+    return res, iterations
+
+
 def fix_state_vars(blk):
     """
     Fix the state variables for this block.
 
     This requires that the block has state variables registered (via calling register_state_vars on the block.).
     Usually this is done in the build() method of the block.
+    The state variables of sub-blocks are fixed too, so this also works on a flowsheet.
     """
-    for var in blk._state_vars:
+    for var in list_state_vars(blk):
         var.fix()
 
 def fix_replaced_state_vars(blk):
@@ -88,12 +120,166 @@ def fix_replaced_state_vars(blk):
     
     This requires that the block has state variables registered (via calling register_state_vars on the block.).
     Usually this is done in the build() method of the block.
+    Replacements are usually stored on the flowsheet, so this uses list_block_replacements() to find them.
     """
-    for state_var, new_var in blk._replacements:
-        if is_child_of(new_var, blk):
+    for state_var, new_var in list_block_replacements(blk):
+        if is_child_of(blk, new_var):
             new_var.fix() 
             state_var.unfix()
 
+def replacement_targets(blk):
+    """
+    The current values of the variables that replaced state vars in this block (and are children of it),
+    as [(var, value)]. Call this before solving with the state vars fixed,
+    as that solve changes the values of the replacing vars.
+    """
+    return [
+        (v, v.value)
+        for _, new_var in list_block_replacements(blk)
+        if is_child_of(blk, new_var)
+        for v in _var_datas(new_var)
+    ]
+
+def _path_to(start, targets, con_vars, var_cons, blocked):
+    """
+    The shortest path start -> constraint -> variable -> ... -> one of targets,
+    as [(constraint, variable)], not going through blocked variables. None if there is no path.
+    """
+    reached_from = ComponentMap([(start, None)])
+    frontier = [start]
+    while frontier:
+        next_frontier = []
+        for v in frontier:
+            for con in var_cons.get(v, ()):
+                for w in con_vars[con]:
+                    if w in reached_from or (w in blocked and w not in targets):
+                        continue
+                    reached_from[w] = (con, v)
+                    if w in targets:
+                        path = []
+                        while reached_from[w] is not None:
+                            con, previous = reached_from[w]
+                            path.append((con, w))
+                            w = previous
+                        return path[::-1]
+                    next_frontier.append(w)
+        frontier = next_frontier
+    return None
+
+
+def infer_state_var_guesses(blk, targets=None):
+    """
+    Set the values of the replaced state vars in this block from the targets of the variables that replaced them,
+    so the solve with the state vars fixed starts near the specification.
+
+    For each replacing var, this finds the shortest chain of equations linking it back to its state var,
+    e.g t_out = 2 * h_out, h_out = h_in + duty when the outlet temperature replaces the heat duty.
+    Such a chain is a small square, triangular system, so each equation is solved in turn for its next variable
+    with calculate_variable_from_constraint(), holding the other variables in it at their current values.
+    The chain doesn't go through fixed variables, or other state vars and replacing vars.
+    If there is no chain, or an equation can't be solved, the guess is left as it was.
+
+    Args:
+        targets: [(replacing var, value)], from replacement_targets(). The replacing vars are set to these
+            values first (e.g if something has changed them since they were read). Defaults to their current values.
+    Returns:
+        The state vars whose values were set.
+    """
+    replacements = [
+        (state_var, new_var) for state_var, new_var in list_block_replacements(blk) if is_child_of(blk, new_var)
+    ]
+    if not replacements:
+        return []
+    con_vars = ComponentMap()
+    var_cons = ComponentMap()
+    for con in blk.component_data_objects(Constraint, active=True, descend_into=True):
+        if not con.equality:
+            continue
+        con_vars[con] = list(identify_variables(con.body, include_fixed=True))
+        for v in con_vars[con]:
+            var_cons.setdefault(v, []).append(con)
+
+    blocked = ComponentSet(v for var in list_state_vars(blk) for v in _var_datas(var))
+    for state_var, new_var in list_block_replacements(blk):
+        blocked.update(_var_datas(new_var))
+    blocked.update(v for v in var_cons if v.fixed)
+
+    target_values = ComponentMap(targets or ())
+    inferred = []
+    for state_var, new_var in replacements:
+        state_var_datas = ComponentSet(_var_datas(state_var))
+        for v in _var_datas(new_var):
+            if target_values.get(v) is not None:
+                v.set_value(target_values[v], skip_validation=True)
+            if v.value is None:
+                continue
+            path = _path_to(v, state_var_datas, con_vars, var_cons, blocked)
+            if path is None:
+                continue
+            previous = [(w, w.value) for _, w in path]
+            try:
+                for con, w in path:
+                    calculate_variable_from_constraint(w, con)
+            except (ValueError, ArithmeticError, RuntimeError):
+                for w, val in previous:
+                    w.set_value(val, skip_validation=True)
+                continue
+            inferred.append(path[-1][1])
+    return inferred
+
+
+def _body_value(con):
+    try:
+        return value(con.body, exception=False)
+    except (ValueError, ArithmeticError):
+        return None
+
+
+def _residual(con):
+    """
+    How far the constraint is from being satisfied, or nan if it can't be evaluated.
+    """
+    body = _body_value(con)
+    if body is None:
+        return np.nan
+    lb, ub = con.lb, con.ub
+    residual = 0.0
+    if lb is not None and body < lb:
+        residual = lb - body
+    if ub is not None and body > ub:
+        residual = body - ub
+    return residual
+
+
+def constraint_residuals(blk):
+    """
+    How far each active constraint in the block is from being satisfied at the current values, as a numpy array.
+    Constraints that can't be evaluated (e.g a variable has no value) give nan.
+
+    Each constraint body is evaluated once with value(). Pyomo's compiled evaluators (PyNumero) need an NL file
+    to be written first, which costs more than evaluating a unit's constraints this way.
+    """
+    return np.fromiter(
+        (_residual(con) for con in blk.component_data_objects(Constraint, active=True, descend_into=True)),
+        dtype=float,
+    )
+
+
+def is_converged(blk, tol, targets=()):
+    """
+    Whether every active constraint in the block is satisfied within tol at the current values,
+    and so is every (var, target) pair, e.g from replacement_targets().
+    Stops at the first constraint that isn't, so an unconverged block is usually found without evaluating them all.
+    """
+    for v, target in targets:
+        if target is not None and not (v.value is not None and abs(v.value - target) <= tol):
+            return False
+    # nan <= tol is False, so constraints that can't be evaluated count as not converged
+    return all(
+        _residual(con) <= tol for con in blk.component_data_objects(Constraint, active=True, descend_into=True)
+    )
+
+
 def fix_inlets(blk):
     """
     Fix all inlet port state variables.
@@ -105,7 +291,160 @@ def fix_inlets(blk):
         if hasattr(port, "is_inlet") and port.is_inlet:
             port.fix_state()
 
-def staged_initialise(blk: Block, opt, outlvl=idaeslog.NOTSET):
+class InitialisationReport:
+    """
+    How long each stage of an initialisation took, how many solver iterations it used, and how it ended.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.stages = []  # (stage, seconds, iterations, condition)
+        self.prefix = ""  # added to the stage names, e.g the fallback being tried
+        self.outcome = None
+
+    def add(self, stage, seconds, iterations=None, condition=None):
+        self.stages.append((self.prefix + stage, seconds, iterations, condition))
+
+    @property
+    def total_time(self):
+        return sum(seconds for _, seconds, _, _ in self.stages)
+
+    @property
+    def total_iterations(self):
+        return sum(iterations or 0 for _, _, iterations, _ in self.stages)
+
+    def __str__(self):
+        lines = [f"Initialisation of {self.name}: {self.total_time:.3f} s, {self.total_iterations} iterations"]
+        if self.outcome is not None:
+            lines[0] += f", {self.outcome}"
+        for stage, seconds, iterations, condition in self.stages:
+            lines.append(
+                f"  {stage:<30} {seconds:8.3f} s {str(iterations):>6} iterations  {condition or ''}"
+            )
+        return "\n".join(lines)
+
+
+class InitialisationBudget:
+    """
+    A wall clock and solver iteration budget for initialisation.
+
+    Budgets can be nested: a unit's budget can have the flowsheet's budget as its parent,
+    so time spent on one unit is also taken from the flowsheet's budget.
+
+    Args:
+        wall_time: Seconds available, or None for no limit.
+        iterations: Solver iterations available, or None for no limit.
+        max_stage_iterations: The most iterations a single solve can use before it is treated as stalled and abandoned.
+        parent: A budget that is also charged for everything charged to this one.
+    """
+
+    def __init__(self, wall_time=None, iterations=None, max_stage_iterations=None, parent=None):
+        self.wall_time = wall_time
+        self.iterations = iterations
+        self.max_stage_iterations = max_stage_iterations
+        self.parent = parent
+        self.time_used = 0.0
+        self.iterations_used = 0
+
+    def child(self, wall_time=None, iterations=None, max_stage_iterations=None):
+        """
+        A budget for part of the work (e.g one unit), that is also limited by this budget.
+        """
+        return InitialisationBudget(
+            wall_time, iterations, max_stage_iterations or self.max_stage_iterations, parent=self
+        )
+
+    @property
+    def remaining_time(self):
+        remaining = None if self.wall_time is None else self.wall_time - self.time_used
+        if self.parent is not None and self.parent.remaining_time is not None:
+            remaining = self.parent.remaining_time if remaining is None else min(remaining, self.parent.remaining_time)
+        return remaining
+
+    @property
+    def remaining_iterations(self):
+        remaining = None if self.iterations is None else self.iterations - self.iterations_used
+        if self.parent is not None and self.parent.remaining_iterations is not None:
+            remaining = (
+                self.parent.remaining_iterations if remaining is None else min(remaining, self.parent.remaining_iterations)
+            )
+        return remaining
+
+    @property
+    def exhausted(self):
+        return (self.remaining_time is not None and self.remaining_time <= 0) or (
+            self.remaining_iterations is not None and self.remaining_iterations <= 0
+        )
+
+    def charge(self, seconds, iterations=None):
+        self.time_used += seconds
+        self.iterations_used += iterations or 0
+        if self.parent is not None:
+            self.parent.charge(seconds, iterations)
+
+    def solver_options(self):
+        """
+        IPOPT options that stop a solve when the budget (or the stage iteration limit) runs out.
+        """
+        options = {}
+        max_iter = self.remaining_iterations
+        if self.max_stage_iterations is not None:
+            max_iter = self.max_stage_iterations if max_iter is None else min(max_iter, self.max_stage_iterations)
+        if max_iter is not None:
+            options["max_iter"] = max(int(max_iter), 0)
+        if self.remaining_time is not None:
+            options["max_wall_time"] = max(self.remaining_time, 1e-3)
+        return options
+
+
+@contextmanager
+def solver_options(opt, options):
+    """
+    Temporarily set options on a solver.
+    """
+    old = {key: opt.options[key] for key in options if key in opt.options}
+    opt.options.update(options)
+    try:
+        yield opt
+    finally:
+        for key in options:
+            if key in old:
+                opt.options[key] = old[key]
+            else:
+                del opt.options[key]
+
+
+def _timed_solve(opt, blk, solve_log, report, stage, budget=None):
+    options = {}
+    if budget is not None:
+        if budget.exhausted:
+            report.add(stage, 0.0, None, "budget exhausted")
+            raise InitializationError(f"{blk.name} ran out of initialisation budget before the {stage} solve.")
+        options = budget.solver_options()
+    with idaeslog.solver_log(solve_log, idaeslog.DEBUG) as slc, solver_options(opt, options):
+        start = time.perf_counter()
+        res, iterations = solve_with_iterations(opt, blk, tee=slc.tee)
+    seconds = time.perf_counter() - start
+    report.add(stage, seconds, iterations, idaeslog.condition(res))
+    if budget is not None:
+        budget.charge(seconds, iterations)
+    return res
+
+
+def staged_initialise(
+    blk: Block,
+    opt,
+    outlvl=idaeslog.NOTSET,
+    warm_start=None,
+    surrogate=None,
+    report=None,
+    budget=None,
+    continuation_steps=0,
+    infer_guesses=True,
+    skip_tol=None,
+    targets=None,
+    **kwargs,
+):
     """
     Performs a two-step initialization of the block.
 
@@ -116,6 +455,28 @@ def staged_initialise(blk: Block, opt, outlvl=idaeslog.NOTSET):
     This expects that the inlet and outlet state blocks have already been initialised, and that everything is
     unfixed on this block execpt for the inlet state vars. 
 
+    If a warm_start store (see warm_start.WarmStartStore) is given, the initial values are first set from
+    the nearest previously converged solution, and the solution is recorded in the store afterwards.
+    If a surrogate (see surrogates.py) is given or registered for the class of the block,
+    it is used to set the initial values from the state vars before the first solve.
+
+    If the block has a relax_for_initialisation() method (see StagedInitialisationMixin), it is called before step 1
+    and the relaxed model is solved first. Any other keyword arguments are passed to it.
+
+    If a budget (see InitialisationBudget) is given, each solve is limited to what is left of it,
+    and InitializationError is raised once it runs out.
+    If continuation_steps is more than zero, step 2 moves the replacing vars from their values after step 1
+    to their targets in that many solves, instead of all at once.
+    If infer_guesses is True, the guesses for the replaced state vars are first calculated back from the targets
+    of the replacing vars (see infer_state_var_guesses()), so step 1 already lands close to the specification.
+    If skip_tol is given, the whole initialisation is skipped if the block is already converged (every constraint
+    residual within skip_tol, see is_converged()), and so is each step if its solution is already satisfied,
+    e.g step 2 when the state var solution already matches the replaced specification. The skips are reported
+    with the condition "skipped".
+
+    targets are the values the replacing vars are fixed at, from replacement_targets(). If not given they are taken
+    from the current values, so pass them if anything (e.g initialising the state blocks) may have changed them.
+
     A typical usage would be in conjunction with record_model_definition() and restore_model_definition() to ensure that the original model definition is preserved
 
     Example:
@@ -127,29 +488,97 @@ def staged_initialise(blk: Block, opt, outlvl=idaeslog.NOTSET):
     staged_initialise(blk, opt) # perform the staged initialisation
     restore_model_definition(blk, blk_state) # restore original fixed vars so the model definition is unchanged. this will also release any inlet state vars fixed during initialisation.
 
+    Returns:
+        An InitialisationReport with the time and iterations of each solve (added to report, if given).
     """
     init_log = idaeslog.getInitLogger(blk.name, outlvl, tag="unit")
     solve_log = idaeslog.getSolveLogger(blk.name, outlvl, tag="unit")
+    if report is None:
+        report = InitialisationReport(blk.name)
+    if targets is None:
+        targets = replacement_targets(blk)
+
+    if skip_tol is not None and is_converged(blk, skip_tol):
+        report.add("unit", 0.0, None, "skipped")
+        init_log.info_high("Staged Initialisation: Already converged, skipped.")
+        return report
+
+    if warm_start is not None:
+        distance = warm_start.seed(blk)
+        if distance is not None:
+            init_log.info_high(f"Staged Initialisation: Warm started from a stored solution (distance {distance:.3g}).")
 
     fix_state_vars(blk)
     #fix_inlets(blk)
 
+    if infer_guesses:
+        inferred = infer_state_var_guesses(blk, targets)
+        if inferred:
+            init_log.info_high(f"Staged Initialisation: Inferred guesses for {len(inferred)} replaced state vars.")
+
+    if seed_from_surrogate(blk, surrogate):
+        init_log.info_high("Staged Initialisation: Initial values set from surrogate.")
+
+    # Steps 0 and 1 aren't needed if the guesses (e.g inferred above) already solve the block.
+    skip_state_vars = skip_tol is not None and is_converged(blk, skip_tol)
+
+    # Step 0: Solve a simpler version of the model, if the block knows how to make one
+    relaxation = None
+    if hasattr(blk, "relax_for_initialisation") and not skip_state_vars:
+        relaxation = blk.relax_for_initialisation(**kwargs)
+    if relaxation is not None:
+        try:
+            res = _timed_solve(opt, blk, solve_log, report, "relaxed", budget)
+            init_log.info_high("Staged Initialisation: Relaxed solve: {}.".format(idaeslog.condition(res)))
+        finally:
+            # Otherwise the unit would be left relaxed (e.g without its heat transfer equation) if the solve fails
+            blk.restore_after_relaxation(relaxation)
 
     # Step 1: Solve with state vars fixed
-    with idaeslog.solver_log(solve_log, idaeslog.DEBUG) as slc:
-        res = opt.solve(blk, tee=slc.tee)
-    init_log.info_high("Staged Initialisation: State var solve: {}.".format(idaeslog.condition(res)))
-    
-    if not check_optimal_termination(res):
-        raise InitializationError(
-            f"{blk.name} failed to initialize with state vars. Please check "
-            f"the output logs for more information, or try different guesses."
-        )
+    if skip_state_vars:
+        res = None
+        report.add("state vars", 0.0, None, "skipped")
+        init_log.info_high("Staged Initialisation: State var solve skipped, already converged.")
+    else:
+        res = _timed_solve(opt, blk, solve_log, report, "state vars", budget)
+        init_log.info_high("Staged Initialisation: State var solve: {}.".format(idaeslog.condition(res)))
+
+        if not check_optimal_termination(res):
+            raise InitializationError(
+                f"{blk.name} failed to initialize with state vars. Please check "
+                f"the output logs for more information, or try different guesses."
+            )
 
     fix_replaced_state_vars(blk)
 
-    with idaeslog.solver_log(solve_log, idaeslog.DEBUG) as slc:
-        res = opt.solve(blk, tee=slc.tee)
+    # Step 2 isn't needed if the state var solution already matches the replaced specifications.
+    if skip_tol is not None and is_converged(blk, skip_tol, targets):
+        report.add("replacements", 0.0, None, "skipped")
+        init_log.info_high("Staged Initialisation: Replaced var solve skipped, targets already met.")
+        for v, target in targets:
+            if target is not None:
+                v.set_value(target, skip_validation=True)
+        if warm_start is not None:
+            warm_start.record(blk, res)
+        return report
+
+    # Step 2: Solve with the replacing vars fixed at their targets, stepping towards them if continuation is used.
+    starts = [v.value for v, _ in targets]
+    for step in range(1, continuation_steps + 1):
+        fraction = step / (continuation_steps + 1)
+        for (v, target), start in zip(targets, starts):
+            if target is not None and start is not None:
+                v.set_value(start + fraction * (target - start), skip_validation=True)
+        res = _timed_solve(opt, blk, solve_log, report, f"continuation {step}", budget)
+        if not check_optimal_termination(res):
+            raise InitializationError(
+                f"{blk.name} failed to initialize at continuation step {step} of {continuation_steps}."
+            )
+    for v, target in targets:
+        if target is not None:
+            v.set_value(target, skip_validation=True)
+
+    res = _timed_solve(opt, blk, solve_log, report, "replacements", budget)
     init_log.info_high("Staged Initialisation: Replaced var solve: {}.".format(idaeslog.condition(res)))
     
     if not check_optimal_termination(res):
@@ -158,7 +587,272 @@ def staged_initialise(blk: Block, opt, outlvl=idaeslog.NOTSET):
             f"the output logs for more information, or make sure the model is well-posed."
         )
 
-    
+    if warm_start is not None:
+        warm_start.record(blk, res)
+    return report
+
+
+def _staged(blk, opt, outlvl, budget, report, warm_start, surrogate, **kwargs):
+    staged_initialise(blk, opt, outlvl, surrogate=surrogate, report=report, budget=budget, **kwargs)
+
+
+def _warm_start(blk, opt, outlvl, budget, report, warm_start, surrogate, **kwargs):
+    if warm_start is None:
+        raise InitializationError("No warm start store was given.")
+    staged_initialise(blk, opt, outlvl, warm_start, surrogate, report, budget, **kwargs)
+
+
+def _relaxed_tolerance(blk, opt, outlvl, budget, report, warm_start, surrogate, **kwargs):
+    with solver_options(opt, {"tol": 1e-4, "acceptable_tol": 1e-2, "acceptable_iter": 5}):
+        staged_initialise(blk, opt, outlvl, warm_start, surrogate, report, budget, **kwargs)
+
+
+def _continuation(blk, opt, outlvl, budget, report, warm_start, surrogate, **kwargs):
+    staged_initialise(blk, opt, outlvl, warm_start, surrogate, report, budget, continuation_steps=4, **kwargs)
+
+
+# The ways of initialising a block that initialise_with_fallbacks() can try, by name.
+# Each is called as f(blk, opt, outlvl, budget, report, warm_start, surrogate, **kwargs),
+# and raises InitializationError if it fails. Add to this to make other fallbacks available.
+fallbacks = {
+    "staged": _staged,
+    "warm start": _warm_start,
+    "relaxed tolerance": _relaxed_tolerance,
+    "continuation": _continuation,
+}
+
+default_ladder = ("staged", "warm start", "relaxed tolerance", "continuation", "skip")
+
 
-    init_log.info(f"Initialization Complete: {idaeslog.condition(res)}")
+def _snapshot(blk):
+    return [(v, v.value, v.fixed) for v in blk.component_data_objects(Var, descend_into=True)]
 
+
+def _restore_snapshot(snapshot):
+    for v, val, fixed in snapshot:
+        v.set_value(val, skip_validation=True)
+        v.fixed = fixed
+
+
+def initialise_with_fallbacks(
+    blk: Block,
+    opt,
+    ladder=default_ladder,
+    budget=None,
+    outlvl=idaeslog.NOTSET,
+    warm_start=None,
+    surrogate=None,
+    report=None,
+    **kwargs,
+):
+    """
+    Work down a ladder of initialisation methods (see fallbacks), until one succeeds.
+
+    Each method starts from the values and fixed variables the block had when this was called.
+    "skip" leaves the block as it was and returns without raising, so the rest of a flowsheet can still be initialised.
+    Once the budget is exhausted, the remaining methods are not tried.
+
+    Example:
+        flowsheet_budget = InitialisationBudget(wall_time=600)
+        for unit in units:
+            initialise_with_fallbacks(unit, opt, budget=flowsheet_budget.child(wall_time=60, max_stage_iterations=200))
+
+    Returns:
+        An InitialisationReport, with the method that succeeded (or "skipped") as its outcome.
+    """
+    init_log = idaeslog.getInitLogger(blk.name, outlvl, tag="unit")
+    if report is None:
+        report = InitialisationReport(blk.name)
+    snapshot = _snapshot(blk)
+    for rung in ladder:
+        if rung == "skip":
+            _restore_snapshot(snapshot)
+            report.outcome = "skipped"
+            init_log.warning(f"Initialisation skipped after trying {', '.join(ladder[:ladder.index(rung)])}.")
+            return report
+        if budget is not None and budget.exhausted:
+            init_log.info_high(f"Initialisation budget exhausted, not trying {rung}.")
+            continue
+        _restore_snapshot(snapshot)
+        report.prefix = f"{rung}: "
+        try:
+            fallbacks[rung](blk, opt, outlvl, budget, report, warm_start, surrogate, **kwargs)
+        except InitializationError as e:
+            init_log.info_high(f"Initialisation with {rung} failed: {e}")
+            continue
+        finally:
+            report.prefix = ""
+        report.outcome = rung
+        return report
+    report.outcome = "failed"
+    raise InitializationError(f"{blk.name} failed to initialize with any of {', '.join(ladder)}.\n{report}")
+
+
+def state_block_solver(solver):
+    """
+    The solver to pass to IDAES state block and control volume initialize() methods, which only take
+    a solver name: the name if solver is one, otherwise None (the default solver).
+    """
+    return solver if solver is None or isinstance(solver, str) else None
+
+
+class StagedInitialisationMixin:
+    """
+    Replacement-aware initialisation for SV unit models. Put it before the IDAES class, e.g
+
+        class SVHeaterData(StagedInitialisationMixin, HeaterData):
+
+    initialize_build():
+    1. Records the model definition, and unfixes everything.
+    2. Initialises the state blocks, holding the state of the ones connected to inlet ports.
+    3. Runs staged_initialise(): an optional relaxed solve, a solve with the state vars fixed,
+       and a solve with the replacing vars fixed.
+    4. Releases the inlet states and restores the model definition.
+
+    Units can override the hooks:
+    - initialise_state_blocks() and release_state_blocks(), if the state blocks need special treatment.
+    - relax_for_initialisation() and restore_after_relaxation(), to solve a simpler model first
+      (e.g a heat exchanger without its heat transfer equation).
+
+    The time and iterations of each stage are logged, and kept in self.initialisation_report.
+    """
+
+    def initialize_build(
+        self,
+        state_args=None,
+        outlvl=idaeslog.NOTSET,
+        solver=None,
+        optarg=None,
+        warm_start=None,
+        surrogate=None,
+        budget=None,
+        ladder=None,
+        skip_tol=None,
+        **kwargs,
+    ):
+        """
+        Initialise the unit, keeping whatever state vars and replacements have been set.
+
+        Keyword Arguments:
+            state_args : a dict of arguments to be passed to the property
+                         package(s) to provide an initial state for
+                         initialization (default = {}).
+            outlvl : sets output level of initialization routine
+            optarg : solver options dictionary object (default=None, use
+                     default solver options)
+            solver : str indicating which solver to use during
+                     initialization (default = None, use default solver),
+                     or a solver object (e.g from solver_pool.SolverPool.solver()),
+                     in which case optarg is applied to the object for the staged solves.
+                     The object is passed on to initialise_state_blocks(), but IDAES state blocks
+                     only take a solver name, so by default they still use the default solver.
+            warm_start, surrogate, budget : see staged_initialise()
+            skip_tol : if given, the initialisation (including the state blocks) is skipped if the unit
+                       is already converged to this tolerance, and so are the stages of staged_initialise() that
+                       are already satisfied.
+            ladder : if given, initialise_with_fallbacks() is used with this ladder instead of staged_initialise().
+            Any other keyword arguments are passed to the hooks.
+
+        Returns:
+            None
+        """
+        init_log = idaeslog.getInitLogger(self.name, outlvl, tag="unit")
+        if solver is None or isinstance(solver, str):
+            opt = get_solver(solver, optarg)
+            staged_options = {}
+        else:
+            opt = solver
+            staged_options = optarg or {}
+        report = InitialisationReport(self.name)
+        self.initialisation_report = report
+
+        if skip_tol is not None and is_converged(self, skip_tol):
+            report.add("unit", 0.0, None, "skipped")
+            init_log.info(f"{self.name} is already converged, initialisation skipped.")
+            return
+
+        # Before anything can change the values the replacing vars are fixed at
+        targets = replacement_targets(self)
+        state = record_model_definition(self)
+        unfix_everything(self)
+
+        start = time.perf_counter()
+        flags = self.initialise_state_blocks(state_args, outlvl, solver, optarg, **kwargs)
+        report.add("state blocks", time.perf_counter() - start)
+        if budget is not None:
+            budget.charge(time.perf_counter() - start)
+        init_log.info_high("Initialization Step 1 Complete.")
+
+        try:
+            with solver_options(opt, staged_options):
+                if ladder is None:
+                    staged_initialise(
+                        self,
+                        opt,
+                        outlvl,
+                        warm_start,
+                        surrogate,
+                        report,
+                        budget,
+                        skip_tol=skip_tol,
+                        targets=targets,
+                        **kwargs,
+                    )
+                else:
+                    initialise_with_fallbacks(
+                        self,
+                        opt,
+                        ladder,
+                        budget,
+                        outlvl,
+                        warm_start,
+                        surrogate,
+                        report,
+                        skip_tol=skip_tol,
+                        targets=targets,
+                        **kwargs,
+                    )
+        finally:
+            self.release_state_blocks(flags, outlvl)
+            restore_model_definition(self, state)
+            init_log.info(str(report))
+
+    def _inlet_state_blocks(self):
+        """
+        The state blocks that the inlet ports refer to.
+        """
+        blocks = ComponentSet()
+        for port in self.component_data_objects(Port, descend_into=True):
+            if getattr(port, "is_inlet", False):
+                for v in port.iter_vars():
+                    blocks.add(v.parent_block().parent_component())
+        return blocks
+
+    def initialise_state_blocks(self, state_args, outlvl, solver, optarg, **kwargs):
+        """
+        Initialise every state block in the unit. The ones connected to inlet ports are initialised
+        with hold_state=True, so the inlet conditions stay fixed during the staged solves.
+        state_args only describe the inlets, so the other state blocks are initialised without them.
+
+        solver is the solver given to initialize(): a name, or a solver object (e.g from a SolverPool).
+        IDAES state blocks build their solver from a name with get_solver(), so when it is an object they
+        are initialised with the default solver here (see state_block_solver()).
+
+        Returns:
+            The flags to pass to release_state_blocks().
+        """
+        solver = state_block_solver(solver)
+        inlets = self._inlet_state_blocks()
+        flags = []
+        for sb in inlets:
+            flags.append(
+                (sb, sb.initialize(outlvl=outlvl, optarg=optarg, solver=solver, hold_state=True, state_args=state_args))
+            )
+        for sb in self.component_objects(Block, descend_into=True):
+            if isinstance(sb, StateBlock) and sb not in inlets:
+                sb.initialize(outlvl=outlvl, optarg=optarg, solver=solver, hold_state=False, state_args={})
+        return flags
+
+    def release_state_blocks(self, flags, outlvl):
+        for sb, sb_flags in flags:
+            sb.release_state(sb_flags, outlvl)
@@ -0,0 +1,135 @@
+import asyncio
+import functools
+import time
+import numpy as np
+from idaes.core.util.exceptions import InitializationError
+from model import list_block_replacements, _var_datas
+from async_solve import get_executor, _apply_block_state, _staged_initialise_job
+"""
+Multi-start initialisation: race several sets of guesses for the replaced state vars, and keep the first that works.
+
+Each set of guesses is a dict of {variable name relative to the block: value}. They can be written by hand,
+sampled within the bounds of the guess variables (sample_guesses), or taken from stored solutions
+(warm_start.WarmStartStore.nearest_points). Each attempt runs in its own subprocess (see async_solve.py),
+so the time to the first success is roughly that of the fastest attempt, rather than the sum of all of them.
+
+Example:
+    guesses = sample_guesses(m.fs.turbine, 8, seed=0)
+    winner = multistart_initialise(m.fs.turbine, guesses, max_workers=4)
+"""
+
+
+def guess_vars(blk):
+    """
+    The state vars of the block that have been replaced, whose values are used as guesses during initialisation.
+    """
+    return [v for state_var, _ in list_block_replacements(blk) for v in _var_datas(state_var)]
+
+
+def sample_guesses(blk, n, seed=None, spread=0.5):
+    """
+    Sample n sets of guesses for the replaced state vars of the block.
+
+    Variables with both bounds are sampled uniformly between them. Otherwise, values are sampled within
+    spread (as a fraction) of the current value, clipped to whichever bound there is.
+    """
+    rng = np.random.default_rng(seed)
+    variables = guess_vars(blk)
+    names = [v.getname(fully_qualified=True, relative_to=blk) for v in variables]
+    guesses = [{} for _ in range(n)]
+    for name, v in zip(names, variables):
+        lb, ub = v.lb, v.ub
+        if lb is None or ub is None:
+            current = v.value if v.value is not None else 0.0
+            width = abs(current) * spread or spread
+            low = current - width if lb is None else max(lb, current - width)
+            high = current + width if ub is None else min(ub, current + width)
+        else:
+            low, high = lb, ub
+        for guess, val in zip(guesses, rng.uniform(low, high, n).tolist()):
+            guess[name] = val
+    return guesses
+
+
+def _multistart_job(guess, solver, options, initialize_kwargs, blk):
+    for name, val in guess.items():
+        v = blk.find_component(name)
+        # Guesses never change the specification (e.g a stored point's inlet conditions)
+        if v is not None and not v.fixed:
+            v.set_value(val, skip_validation=True)
+    if initialize_kwargs is not None:
+        blk.initialize(**initialize_kwargs)
+    else:
+        _staged_initialise_job(solver, options, blk)
+
+
+async def multistart_initialise_async(
+    blk,
+    guesses,
+    solver="ipopt",
+    options=None,
+    initialize_kwargs=None,
+    timeout=None,
+    executor=None,
+):
+    """
+    Initialise the block from each set of guesses at once, in subprocesses.
+    The first attempt that succeeds is applied to the block, and the others are cancelled.
+
+    Args:
+        blk: The block to initialise.
+        guesses: A list of dicts of {variable name relative to blk: value}. Fixed variables are left as they are.
+        solver, options: The solver used by staged_initialise() (see async_solve.staged_initialise_async()).
+        initialize_kwargs: If given, blk.initialize(**initialize_kwargs) is used instead of staged_initialise(),
+            e.g for SV unit models, which initialise their state blocks first.
+        timeout: Seconds before all remaining attempts are cancelled.
+        executor: The async_solve.SubprocessExecutor to use. Its max_workers limits how many attempts run at once.
+    Returns:
+        The index of the guesses that succeeded.
+    """
+    executor = executor or get_executor()
+    tasks = {
+        asyncio.ensure_future(
+            executor.run(
+                blk,
+                functools.partial(_multistart_job, guess, solver, options, initialize_kwargs),
+                apply=False,
+            )
+        ): i
+        for i, guess in enumerate(guesses)
+    }
+    errors = {}
+    deadline = None if timeout is None else time.monotonic() + timeout
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError(f"No set of guesses initialised {blk.name} within {timeout} s.")
+            # If several finish at the same time, prefer the earliest in the list.
+            for task in sorted(done, key=lambda t: tasks[t]):
+                if task.exception() is None:
+                    _, state = task.result()
+                    _apply_block_state(blk, state)
+                    return tasks[task]
+                errors[tasks[task]] = task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    messages = "\n".join(f"  guesses {i}: {errors[i]}" for i in sorted(errors))
+    raise InitializationError(f"{blk.name} failed to initialize from any of the {len(guesses)} sets of guesses:\n{messages}")
+
+
+def multistart_initialise(blk, guesses, max_workers=None, **kwargs):
+    """
+    Blocking version of multistart_initialise_async(), for use outside an event loop.
+    """
+    from async_solve import SubprocessExecutor
+
+    async def race():
+        executor = kwargs.pop("executor", None) or SubprocessExecutor(max_workers)
+        return await multistart_initialise_async(blk, guesses, executor=executor, **kwargs)
+
+    return asyncio.run(race())
@@ -0,0 +1,174 @@
+import time
+import numpy as np
+from scipy.sparse.linalg import splu
+from pyomo.opt import SolverResults, SolverStatus, TerminationCondition
+from pyomo.common.collections import ComponentMap
+from square_system import SquareSystem
+"""
+A damped Newton solver for square systems, e.g the stages of staged_initialise() or a fully specified flowsheet.
+
+Once the state vars have been replaced, the model is a square system of equations F(x) = 0, so it can be
+solved with Newton's method rather than an interior point NLP solver. Each iteration evaluates the residuals
+and the sparse Jacobian, factorises the Jacobian with scipy's SuperLU, and takes the Newton step,
+halved until the sum of squared residuals decreases enough (an Armijo backtracking line search),
+and clipped to the variable bounds.
+
+The structure of the system (its constraints, variables and Jacobian sparsity pattern), and the fill-reducing
+column ordering found by the first factorisation, are kept between iterations and between solves of the same block,
+so later factorisations skip the COLAMD ordering. SuperLU can't reuse a symbolic factorisation, so each one still
+does the symbolic and numeric factorisation. They are rebuilt if a variable in the block is fixed or unfixed.
+
+NewtonSolver has the same solve(blk, tee, logfile) interface and options dict as the Pyomo solvers,
+so it can be passed anywhere a solver is, e.g staged_initialise(blk, NewtonSolver()).
+
+Example:
+    opt = NewtonSolver(tol=1e-8)
+    res = opt.solve(m)
+    assert check_optimal_termination(res)
+"""
+
+
+class NewtonSolver:
+    """
+    Args:
+        options: Any of
+            max_iter: The maximum number of Newton iterations (default 100).
+            tol: Converged once the largest absolute residual is below this (default 1e-8).
+            max_wall_time: Seconds before giving up (default no limit).
+            min_step: The smallest fraction of the Newton step the line search tries, before taking it anyway (default 1e-4).
+            armijo: The fraction of the predicted decrease in the squared residuals a step must achieve (default 1e-4).
+        Other options (e.g IPOPT ones set by the initialisation fallbacks) are ignored.
+    """
+
+    name = "newton"
+
+    def __init__(self, **options):
+        self.options = {"max_iter": 100, "tol": 1e-8, "min_step": 1e-4, "armijo": 1e-4}
+        self.options.update(options)
+        # block -> (SquareSystem, column ordering)
+        self._structures = ComponentMap()
+
+    def available(self, exception_flag=True):
+        return True
+
+    def _system(self, blk):
+        cached = self._structures.get(blk)
+        if cached is not None and cached[0].is_current():
+            return cached
+        cached = (SquareSystem(blk), None)
+        self._structures[blk] = cached
+        return cached
+
+    def _factorise(self, blk, jacobian):
+        system, order = self._structures[blk]
+        if order is None:
+            lu = splu(jacobian, permc_spec="COLAMD")
+            # SuperLU factorises A Pc, with column i of A at position perm_c[i]. Keep the ordering,
+            # so later factorisations of matrices with the same pattern can skip computing it
+            # (only the ordering: scipy's SuperLU has no refactorisation, so the rest is redone each time).
+            order = np.argsort(lu.perm_c)
+            self._structures[blk] = (system, order)
+            return lambda b: lu.solve(b)
+        lu = splu(jacobian[:, order], permc_spec="NATURAL")
+
+        def solve(b):
+            x = np.empty_like(b)
+            x[order] = lu.solve(b)
+            return x
+
+        return solve
+
+    def solve(self, blk, tee=False, logfile=None, **kwargs):
+        """
+        Solve the block, leaving the variables at the last iterate.
+
+        Returns:
+            SolverResults, with termination condition optimal, maxIterations, maxTimeLimit,
+            invalidProblem (if the block isn't square) or other (if the Jacobian is singular, or no step helps).
+        """
+        options = dict(self.options)
+        options.update(kwargs.pop("options", None) or {})
+        lines = []
+
+        def log(line):
+            lines.append(line)
+            if tee:
+                print(line)
+
+        start = time.perf_counter()
+        iterations = 0
+        try:
+            system, _ = self._system(blk)
+        except ValueError as e:
+            log(str(e))
+            condition, message = TerminationCondition.invalidProblem, str(e)
+        else:
+            condition, message, iterations = self._iterate(blk, system, options, start, log)
+        log(f"Number of Iterations....: {iterations}")
+        log(f"EXIT: {message}")
+        if logfile is not None:
+            with open(logfile, "w") as f:
+                f.write("\n".join(lines) + "\n")
+
+        results = SolverResults()
+        results.solver.name = self.name
+        results.solver.status = SolverStatus.ok if condition == TerminationCondition.optimal else SolverStatus.warning
+        results.solver.termination_condition = condition
+        results.solver.message = message
+        results.solver.time = time.perf_counter() - start
+        results.solver.iterations = iterations
+        return results
+
+    def _iterate(self, blk, system, options, start, log):
+        max_iter = options["max_iter"]
+        tol = options["tol"]
+        max_wall_time = options.get("max_wall_time")
+        lower, upper = system.bounds()
+        x = system.get_values()
+        if np.isnan(x).any():
+            # Variables with no value start at zero (or their nearest bound)
+            x = np.clip(np.nan_to_num(x), lower, upper)
+            system.set_values(x)
+        try:
+            residuals = system.residuals()
+        except (ValueError, ZeroDivisionError, OverflowError) as e:
+            return TerminationCondition.other, f"Could not evaluate the residuals at the starting point: {e}", 0
+        merit = 0.5 * residuals @ residuals
+        log(f"{'iter':>4} {'max residual':>14} {'step':>10}")
+        log(f"{0:>4} {np.abs(residuals).max(initial=0.0):>14.6e} {'':>10}")
+
+        for iteration in range(1, max_iter + 1):
+            if np.abs(residuals).max(initial=0.0) <= tol:
+                return TerminationCondition.optimal, "Converged.", iteration - 1
+            if max_wall_time is not None and time.perf_counter() - start > max_wall_time:
+                return TerminationCondition.maxTimeLimit, "Maximum wall time exceeded.", iteration - 1
+            try:
+                step = -self._factorise(blk, system.jacobian())(residuals)
+            except RuntimeError:
+                return TerminationCondition.other, "The Jacobian is singular.", iteration - 1
+
+            # Backtracking line search on 0.5 ||F||^2, whose directional derivative along the Newton step is -2 * merit
+            alpha = 1.0
+            while True:
+                trial = np.clip(x + alpha * step, lower, upper)
+                system.set_values(trial)
+                try:
+                    trial_residuals = system.residuals()
+                    trial_merit = 0.5 * trial_residuals @ trial_residuals
+                except (ValueError, ZeroDivisionError, OverflowError):
+                    trial_merit = np.inf
+                if trial_merit <= (1 - 2 * options["armijo"] * alpha) * merit:
+                    break
+                if alpha / 2 < options["min_step"]:
+                    if not np.isfinite(trial_merit):
+                        system.set_values(x)
+                        return TerminationCondition.other, "No step could be evaluated.", iteration - 1
+                    # Take the short step anyway, rather than stopping.
+                    break
+                alpha /= 2
+            x, residuals, merit = trial, trial_residuals, trial_merit
+            log(f"{iteration:>4} {np.abs(residuals).max(initial=0.0):>14.6e} {alpha:>10.3e}")
+
+        if np.abs(residuals).max(initial=0.0) <= tol:
+            return TerminationCondition.optimal, "Converged.", max_iter
+        return TerminationCondition.maxIterations, "Maximum number of iterations exceeded.", max_iter
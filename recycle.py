@@ -0,0 +1,251 @@
+import numpy as np
+from pyomo.network import Port, SequentialDecomposition
+from idaes.core.util.exceptions import InitializationError
+from model_initialisation import (
+    record_model_definition,
+    restore_model_definition,
+    unfix_everything,
+    staged_initialise,
+    StagedInitialisationMixin,
+)
+"""
+Sequential initialisation of flowsheets with recycles.
+
+The units of the flowsheet are initialised one at a time in the order of the Arcs, with the values of each unit's
+outlets passed to the inlets downstream. Where the Arcs form a loop, a minimal set of tear streams is chosen
+(with Pyomo's SequentialDecomposition heuristic), and the inlet vars of the torn ports are used as tear variables:
+they are guessed, the units in the loop are initialised in order, and the guesses are updated from the values
+that arrive at the other end of each tear, until they match. The updates are accelerated with Wegstein's method
+(per variable, bounded) or Broyden's method (for all the tear variables of the loop together).
+
+Units are initialised with unit.initialize() if they use StagedInitialisationMixin (so the state blocks
+are handled by the unit), and otherwise with staged_initialise() with their inlets fixed.
+
+Example:
+    report = initialise_recycles(m.fs, opt, method="broyden")
+    print(report)
+"""
+
+
+class RecycleReport:
+    """
+    The tear streams of each loop, how many passes around it were needed, and how the tear error went down.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.loops = []  # (tear arc names, iterations, converged, [error after each pass])
+        self.units = []  # the units in the order they were first initialised
+
+    def add(self, tears, iterations, converged, errors):
+        self.loops.append((tears, iterations, converged, errors))
+
+    @property
+    def total_iterations(self):
+        return sum(iterations for _, iterations, _, _ in self.loops)
+
+    def __str__(self):
+        lines = [f"Recycle initialisation of {self.name}: {len(self.units)} units, {len(self.loops)} loops"]
+        for tears, iterations, converged, errors in self.loops:
+            status = "converged" if converged else "not converged"
+            error = f", tear error {errors[-1]:.3g}" if errors else ""
+            lines.append(f"  tears {', '.join(tears)}: {iterations} iterations, {status}{error}")
+        return "\n".join(lines)
+
+
+def tear_streams(blk):
+    """
+    A minimal set of Arcs to tear so the flowsheet has no loops (empty if it has none).
+    The Arcs must have been expanded.
+    """
+    seq = SequentialDecomposition(select_tear_method="heuristic")
+    G = seq.create_graph(blk)
+    return seq.indexes_to_arcs(G, seq.tear_set(G))
+
+
+def tear_vars(arc):
+    """
+    The tear variables of a torn Arc: the vars of the inlet port it feeds.
+    """
+    return list(arc.destination.iter_vars())
+
+
+def _pass_values(arc):
+    for src, dest in zip(arc.source.iter_vars(), arc.destination.iter_vars()):
+        dest.set_value(src.value, skip_validation=True)
+
+
+def initialise_unit(unit, opt, **kwargs):
+    """
+    Initialise a single unit from the current values of its inlets, leaving its fixed variables as they were.
+    """
+    if isinstance(unit, StagedInitialisationMixin):
+        unit.initialize(**kwargs)
+        return
+    state = record_model_definition(unit)
+    unfix_everything(unit)
+    for port in unit.component_data_objects(Port, descend_into=False):
+        if getattr(port, "is_inlet", False):
+            port.fix()
+    try:
+        staged_initialise(unit, opt, **kwargs)
+    finally:
+        restore_model_definition(unit, state)
+
+
+class _Wegstein:
+    """
+    Bounded Wegstein acceleration, applied to each tear variable separately.
+    """
+
+    def __init__(self, accel_min=-5.0, accel_max=0.0):
+        self.accel_min = accel_min
+        self.accel_max = accel_max
+        self.previous = None
+
+    def __call__(self, x, gx):
+        if self.previous is None:
+            new_x = gx
+        else:
+            x_old, gx_old = self.previous
+            dx = x - x_old
+            with np.errstate(divide="ignore", invalid="ignore"):
+                slope = np.where(dx != 0, (gx - gx_old) / dx, 0.0)
+                q = np.where(slope != 1, slope / (slope - 1), 0.0)
+            q = np.clip(q, self.accel_min, self.accel_max)
+            new_x = q * x + (1 - q) * gx
+        self.previous = (x, gx)
+        return new_x
+
+
+class _Broyden:
+    """
+    Broyden's ("good") method on F(x) = g(x) - x, updating an approximation of the inverse Jacobian.
+    Starting from -I makes the first step direct substitution.
+    """
+
+    def __init__(self):
+        self.inverse = None
+        self.previous = None
+
+    def __call__(self, x, gx):
+        f = gx - x
+        if self.inverse is None:
+            self.inverse = -np.eye(len(x))
+        else:
+            x_old, f_old = self.previous
+            dx, df = x - x_old, f - f_old
+            h_df = self.inverse @ df
+            denominator = dx @ h_df
+            if denominator != 0:
+                self.inverse += np.outer(dx - h_df, dx @ self.inverse) / denominator
+        self.previous = (x, f)
+        return x - self.inverse @ f
+
+
+def _direct(x, gx):
+    return gx
+
+
+_accelerators = {"wegstein": _Wegstein, "broyden": _Broyden, "direct": lambda: _direct}
+
+
+def initialise_recycles(
+    blk,
+    opt,
+    method="wegstein",
+    tol=1e-6,
+    max_iter=30,
+    tears=None,
+    guesses=None,
+    report=None,
+    **kwargs,
+):
+    """
+    Initialise every unit connected by Arcs in the block, converging any recycle loops.
+
+    Args:
+        blk: The flowsheet. Its Arcs must have been expanded, and its feed inlets fixed (e.g by register_inlet_ports).
+        opt: The solver used by staged_initialise() for units without their own initialize().
+        method: "wegstein", "broyden" or "direct" (plain successive substitution).
+        tol: A loop has converged when every tear variable changes by less than tol (relative to max(1, |value|))
+            in a pass around it.
+        max_iter: The maximum number of passes around each loop.
+        tears: The Arcs to tear. Defaults to tear_streams(blk).
+        guesses: {tear Arc: {port var name: value}} starting values for the tear variables.
+            Otherwise, their current values are used.
+        report: A RecycleReport to add to.
+        kwargs: Passed to initialise_unit() for each unit.
+    Returns:
+        The RecycleReport. Raises InitializationError if a loop doesn't converge (after recording it in the report).
+    """
+    if method not in _accelerators:
+        raise ValueError(f"Unknown method {method}, expected one of {', '.join(_accelerators)}.")
+    if report is None:
+        report = RecycleReport(blk.name)
+    seq = SequentialDecomposition(select_tear_method="heuristic")
+    G = seq.create_graph(blk)
+    if tears is not None:
+        seq.set_tear_set(tears)
+    tear_set = seq.tear_set(G)
+    idx_to_edge = seq.idx_to_edge(G)
+    sccNodes, sccEdges, sccOrder, _ = seq.scc_collect(G)
+
+    for arc, values in (guesses or {}).items():
+        for name, val in values.items():
+            for v in arc.destination.vars[name].values():
+                v.set_value(val, skip_validation=True)
+
+    def run(unit, loop_tears):
+        # Take the inlet values from upstream, except across the tears, which hold the current guesses
+        for port in unit.component_data_objects(Port, descend_into=False):
+            for arc in port.arcs():
+                if arc.destination is port and arc not in loop_tears:
+                    _pass_values(arc)
+        initialise_unit(unit, opt, **kwargs)
+        if unit not in report.units:
+            report.units.append(unit)
+
+    for level in sccOrder:
+        for scc in level:
+            loop_tears = [G.edges[idx_to_edge[e]]["arc"] for e in tear_set if e in sccEdges[scc]]
+            order = [unit for stage in seq.calculation_order(G, nodes=sccNodes[scc]) for unit in stage]
+            if not loop_tears:
+                for unit in order:
+                    run(unit, loop_tears)
+            else:
+                _converge_loop(order, loop_tears, run, method, tol, max_iter, report)
+    return report
+
+
+def _converge_loop(order, tears, run, method, tol, max_iter, report):
+    variables = [v for arc in tears for v in tear_vars(arc)]
+    sources = [v for arc in tears for v in arc.source.iter_vars()]
+    accelerate = _accelerators[method]()
+    x = np.array([v.value for v in variables], dtype=float)
+    errors = []
+    names = [arc.name for arc in tears]
+    for iteration in range(1, max_iter + 1):
+        for v, val in zip(variables, x.tolist()):
+            v.set_value(val, skip_validation=True)
+        try:
+            for unit in order:
+                run(unit, tears)
+        except InitializationError:
+            report.add(names, iteration, False, errors)
+            raise
+        gx = np.array([v.value for v in sources], dtype=float)
+        error = float(np.max(np.abs(gx - x) / np.maximum(1.0, np.abs(x)), initial=0.0))
+        errors.append(error)
+        if error <= tol:
+            # Leave the tears consistent with the values that arrived at them
+            for v, val in zip(variables, gx.tolist()):
+                v.set_value(val, skip_validation=True)
+            report.add(names, iteration, True, errors)
+            return
+        x = accelerate(x, gx)
+    report.add(names, max_iter, False, errors)
+    raise InitializationError(
+        f"The loop torn at {', '.join(names)} did not converge in {max_iter} iterations "
+        f"(tear error {errors[-1]:.3g})."
+    )
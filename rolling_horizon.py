@@ -0,0 +1,174 @@
+import time as timer
+from pyomo.environ import Var, Constraint, ComponentUID, check_optimal_termination
+from pyomo.dae import DerivativeVar
+from pyomo.dae.flatten import flatten_dae_components
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.common.collections import ComponentSet
+"""
+Rolling horizon dynamic simulation.
+
+Instead of discretising a long run into one large NLP, a model is built for a single window
+(e.g m.fs.time from 0 to 60 s) and solved repeatedly, moving the window forward each time.
+Because the same model is reused, the replacements (e.g those made by SVPIDController) and the structural
+checks done when they were made carry over to every window, and memory use doesn't grow with the length of the run.
+
+Between windows:
+- The differential variables at the start of the window are fixed to their values at the end of the previous window.
+  Derivatives at the start of the window that were fixed (e.g to start from steady state) are unfixed,
+  if they appear in an active constraint.
+- Other variables fixed only at the start of the window (initial conditions, e.g a controller's manipulated
+  variable at t0) are fixed to their values at the end of the previous window too.
+- Constraints left with no unfixed variables (e.g the equation calculating a PID controller's initial integral
+  term, once the integral is carried over) are deactivated, as they would over-specify the window.
+- Every unfixed time-indexed variable is set to its value at the end of the previous window, as the initial guess.
+- update_inputs(model, t_start) is called, so time-varying inputs (e.g setpoints) can be set for the window.
+
+Example:
+    runner = RollingHorizon(m, m.fs.time, opt, record=[m.fs.tank.control_volume.volume])
+    runner.run(n_windows=60)
+    print(runner.throughput, "simulated seconds per second")
+"""
+
+
+class RollingHorizon:
+    """
+    Solves a dynamic model one window at a time.
+
+    Args:
+        model: The model, discretised over one window.
+        time: The time set of the model (e.g m.fs.time).
+        opt: The solver.
+        update_inputs: Optional function (model, t_start) called before each window is solved.
+        record: Time-indexed components whose trajectories are kept (in self.trajectories, by name).
+    """
+
+    def __init__(self, model, time, opt, update_inputs=None, record=()):
+        self.model = model
+        self.time = time
+        self.opt = opt
+        self.update_inputs = update_inputs
+        self.window = time.last() - time.first()
+        self.t_start = 0.0
+        self.windows = 0
+        self.wall_time = 0.0
+        self.window_times = []
+
+        # This only depends on the structure of the model, so it is done once for all windows.
+        t0 = time.first()
+        _, self._time_vars = flatten_dae_components(model, time, Var)
+        constraints = list(model.component_data_objects(Constraint, active=True, descend_into=True))
+        in_active_constraint = ComponentSet(v for con in constraints for v in identify_variables(con.body))
+        self._differential = []  # (derivative at t0, state var at t0, state var at the end)
+        for ref in self._time_vars:
+            derivative = ref[t0]
+            comp = derivative.parent_component()
+            if isinstance(comp, DerivativeVar) and time in comp.get_continuousset_list():
+                state_var = comp.get_state_var()
+                index = derivative.index()
+                self._differential.append(
+                    (
+                        derivative if derivative in in_active_constraint else None,
+                        state_var[index],
+                        state_var[ref[time.last()].index()],
+                    )
+                )
+        initial_states = ComponentSet(state_var for _, state_var, _ in self._differential)
+        self._initial_conditions = [  # (var at t0, var at the end)
+            (ref[t0], ref[time.last()])
+            for ref in self._time_vars
+            if ref[t0].fixed
+            and ref[t0] not in initial_states
+            and not any(ref[t].fixed for t in time if t != t0)
+        ]
+        initial_vars = initial_states | ComponentSet(v for v, _ in self._initial_conditions)
+        # Constraints that could be left with nothing to solve for once the start of the window is fixed
+        self._initial_constraints = [
+            con for con in constraints if any(v in initial_vars for v in identify_variables(con.body))
+        ]
+        self.deactivated = []
+
+        self.trajectories = {}
+        self._recorded = []
+        record = ComponentSet(record)
+        for ref in self._time_vars:
+            if ref[t0].parent_component() in record:
+                # e.g "fs.tank.control_volume.volume[*,Liq]"
+                name = str(ComponentUID(ref.referent))
+                self._recorded.append((ref, name))
+                self.trajectories[name] = []
+
+    @property
+    def simulated_time(self):
+        return self.windows * self.window
+
+    @property
+    def throughput(self):
+        """
+        Simulated seconds per wall clock second.
+        """
+        return self.simulated_time / self.wall_time if self.wall_time > 0 else None
+
+    def _advance(self):
+        """
+        Move the model forward by one window.
+        """
+        t_end = self.time.last()
+        for derivative, state_var, final_state in self._differential:
+            state_var.fix(final_state.value)
+            if derivative is not None and derivative.fixed:
+                derivative.unfix()
+        for var, final in self._initial_conditions:
+            if final.value is not None:
+                var.fix(final.value)
+        for con in self._initial_constraints:
+            if con.active and not any(True for _ in identify_variables(con.body, include_fixed=False)):
+                con.deactivate()
+                self.deactivated.append(con)
+        for ref in self._time_vars:
+            final = ref[t_end].value
+            if final is None:
+                continue
+            for t in self.time:
+                if t != t_end and not ref[t].fixed:
+                    ref[t].set_value(final, skip_validation=True)
+
+    def _record(self, last):
+        t0 = self.time.first()
+        for ref, name in self._recorded:
+            trajectory = self.trajectories[name]
+            for t in self.time:
+                # The end of a window is the start of the next, so only record it for the last window.
+                if t != self.time.last() or last:
+                    trajectory.append((self.t_start + t - t0, ref[t].value))
+
+    def solve_window(self, last=False):
+        """
+        Move the model forward to the next window (unless this is the first one), and solve it.
+
+        Returns:
+            The solver results.
+        """
+        if self.windows > 0:
+            self._advance()
+        if self.update_inputs is not None:
+            self.update_inputs(self.model, self.t_start)
+        start = timer.perf_counter()
+        res = self.opt.solve(self.model)
+        elapsed = timer.perf_counter() - start
+        if not check_optimal_termination(res):
+            raise RuntimeError(
+                f"Window starting at t={self.t_start} failed to solve. Try a shorter window, or smaller time steps."
+            )
+        self.wall_time += elapsed
+        self.window_times.append(elapsed)
+        self._record(last)
+        self.windows += 1
+        self.t_start += self.window
+        return res
+
+    def run(self, n_windows):
+        """
+        Solve n_windows windows in a row.
+        """
+        for i in range(n_windows):
+            self.solve_window(last=i == n_windows - 1)
@@ -0,0 +1,192 @@
+from pyomo.environ import Block, Constraint
+from pyomo.network import Port, Arc
+from pyomo.common.collections import ComponentMap
+from idaes.core.scaling.util import get_scaling_factor, set_scaling_factor, get_nominal_value
+from idaes.core.scaling.custom_scaler_base import CustomScalerBase
+from model import list_state_vars, list_replacements, _var_datas
+"""
+Scaling factors based on the state variable definition of a flowsheet.
+
+The registered state variables (and whatever replaced them) are the values the modeller
+has actually specified, so they are the best information we have about the magnitude
+of everything else. Starting from those, scaling factors are pushed through each
+unit (inlet -> outlet) and across Arcs (source -> destination) in flow order.
+
+Example:
+    propagate_scaling(m.fs)
+    opt = get_solver("ipopt", {"nlp_scaling_method": "user-scaling"})
+"""
+
+
+def _nominal_scaling_factor(var):
+    """
+    1/|nominal value| for a variable, or None if there is no sensible nominal value (e.g zero).
+    """
+    try:
+        nominal = abs(get_nominal_value(var))
+    except (TypeError, ValueError):
+        return None
+    if nominal == 0:
+        return None
+    return 1 / nominal
+
+
+def seed_scaling_factors(block, overwrite=False):
+    """
+    Set scaling factors for all registered state variables and replacing variables in the block,
+    using their current (fixed) values as nominal values.
+
+    Guesses (state variables that have been replaced) are included too, as their values should
+    at least be in the right ballpark.
+    """
+    seeded = []
+    variables = list(list_state_vars(block)) + [new_var for _, new_var in list_replacements(block)]
+    for var in variables:
+        for v in _var_datas(var):
+            sf = _nominal_scaling_factor(v)
+            if sf is not None:
+                set_scaling_factor(v, sf, overwrite=overwrite)
+                seeded.append(v)
+    return seeded
+
+
+def _copy_scaling_factor(from_var, to_var):
+    """
+    Give to_var the same scaling factor as from_var, unless to_var already has one.
+    """
+    sf = get_scaling_factor(from_var)
+    if sf is not None and get_scaling_factor(to_var) is None:
+        set_scaling_factor(to_var, sf)
+
+
+def _copy_port_scaling(from_port, to_port):
+    """
+    Copy scaling factors between the matching variables of two ports.
+    """
+    for name, from_var in from_port.vars.items():
+        to_var = to_port.vars.get(name)
+        if to_var is None:
+            continue
+        for index in from_var.index_set():
+            if index in to_var.index_set():
+                _copy_scaling_factor(from_var[index], to_var[index])
+
+
+def _ports(unit, is_inlet):
+    return [
+        port
+        for port in unit.component_data_objects(Port, descend_into=False)
+        if getattr(port, "is_inlet", None) is is_inlet
+    ]
+
+
+def propagate_unit_scaling(unit):
+    """
+    Default scaling propagation through a unit: each outlet variable gets the scaling factor of the
+    matching inlet variable, unless it already has one (e.g because it is a replacing variable).
+
+    Unit models can define a propagate_scaling() method to do something more specific,
+    see SVCompressor.
+    """
+    inlets = _ports(unit, True)
+    outlets = _ports(unit, False)
+    for inlet in inlets:
+        for outlet in outlets:
+            _copy_port_scaling(inlet, outlet)
+
+
+def _units_in_flow_order(flowsheet):
+    """
+    All blocks with registered state vars, sorted so that upstream units (by Arcs) come first.
+    Units in a recycle loop are left in the order they were declared.
+    """
+    units = [
+        b
+        for b in flowsheet.component_data_objects(Block, descend_into=True)
+        if hasattr(b, "_state_vars")
+    ]
+    upstream_count = ComponentMap((u, 0) for u in units)
+    downstream = ComponentMap((u, []) for u in units)
+    for arc in flowsheet.component_data_objects(Arc, descend_into=True):
+        src = arc.source.parent_block()
+        dest = arc.destination.parent_block()
+        if src in downstream and dest in upstream_count and src is not dest:
+            downstream[src].append(dest)
+            upstream_count[dest] += 1
+
+    ordered = []
+    ready = [u for u in units if upstream_count[u] == 0]
+    while ready:
+        u = ready.pop(0)
+        ordered.append(u)
+        for d in downstream[u]:
+            upstream_count[d] -= 1
+            if upstream_count[d] == 0:
+                ready.append(d)
+    # Anything left over is part of a recycle.
+    ordered.extend(u for u in units if upstream_count[u] > 0)
+    return ordered
+
+
+def propagate_scaling(flowsheet, overwrite=False, scale_constraints=True):
+    """
+    Set scaling factors for a flowsheet from its state variable definition.
+
+    1. Seed scaling factors from the nominal values of the state vars and replacing vars.
+    2. Going through the units in flow order, propagate scaling factors from inlets to outlets,
+       then across Arcs to the next units' inlets.
+    3. Optionally, scale each unit's constraints by the nominal values of their terms.
+
+    Scaling factors that already exist are never overwritten by propagation,
+    so user-provided and replacement-based factors take priority.
+
+    Args:
+        flowsheet: The flowsheet (or any block) to scale.
+        overwrite: If True, overwrite existing scaling factors of state vars and replacing vars.
+        scale_constraints: If True, also set constraint scaling factors.
+    """
+    seed_scaling_factors(flowsheet, overwrite=overwrite)
+
+    arcs_from = ComponentMap()
+    for arc in flowsheet.component_data_objects(Arc, descend_into=True):
+        arcs_from.setdefault(arc.source.parent_block(), []).append(arc)
+
+    units = _units_in_flow_order(flowsheet)
+    for unit in units:
+        if hasattr(unit, "propagate_scaling"):
+            unit.propagate_scaling()
+        else:
+            propagate_unit_scaling(unit)
+        for arc in arcs_from.get(unit, []):
+            _copy_port_scaling(arc.source, arc.destination)
+
+    if scale_constraints:
+        scaler = CustomScalerBase()
+        for unit in units:
+            for con in unit.component_data_objects(Constraint, active=True, descend_into=True):
+                scaler.scale_constraint_by_nominal_value(con, overwrite=overwrite)
+
+
+def propagate_pressure_changer_scaling(unit):
+    """
+    Scaling propagation for pressure changers (compressors, turbines, pumps).
+
+    The outlet enthalpy is estimated from the inlet enthalpy plus the specific work,
+    and the outlet pressure from the inlet pressure plus deltaP. Anything else
+    falls back to propagate_unit_scaling().
+    """
+    for t in unit.flowsheet().time:
+        flow = get_nominal_value(unit.inlet.flow_mol[t])
+        enth = get_nominal_value(unit.inlet.enth_mol[t])
+        pressure = get_nominal_value(unit.inlet.pressure[t])
+        work = get_nominal_value(unit.work_mechanical[t])
+        delta_p = get_nominal_value(unit.deltaP[t])
+
+        outlet_enth = abs(enth + work / flow) if flow != 0 else 0
+        outlet_pressure = abs(pressure + delta_p)
+        if outlet_enth != 0 and get_scaling_factor(unit.outlet.enth_mol[t]) is None:
+            set_scaling_factor(unit.outlet.enth_mol[t], 1 / outlet_enth)
+        if outlet_pressure != 0 and get_scaling_factor(unit.outlet.pressure[t]) is None:
+            set_scaling_factor(unit.outlet.pressure[t], 1 / outlet_pressure)
+
+    propagate_unit_scaling(unit)
@@ -0,0 +1,109 @@
+import numpy as np
+from scipy.sparse.linalg import splu
+from pyomo.environ import value
+from pyomo.common.collections import ComponentMap
+from model import list_specification, _var_datas
+from square_system import SquareSystem
+"""
+First order predictions of how a converged model changes when its specification changes.
+
+At a solution of the square system F(x, p) = 0, where p is the specification (the state vars that haven't
+been replaced, and the variables that replaced them) and x is everything else,
+
+    dx/dp = -(dF/dx)^-1 dF/dp
+
+dF/dx is factorised once, so after that, answering "what if the outlet pressure were 5% higher?"
+only takes a triangular solve, and the prediction is a good starting point for the follow-up solve.
+
+Example:
+    res = opt.solve(m)
+    sens = Sensitivity(m.fs)
+    predicted = sens.predict({"h1.outlet.pressure[0.0]": 1.05 * p})
+    sens.apply({"h1.outlet.pressure[0.0]": 1.05 * p})  # set the new spec, and the predicted initial values
+    res = opt.solve(m)
+"""
+
+
+class Sensitivity:
+    """
+    The sensitivities of the unfixed variables of a block to its specification, at the current point.
+
+    Args:
+        blk: The block, which should be square and converged.
+    """
+
+    def __init__(self, blk):
+        self.blk = blk
+        self.specification = [v for var in list_specification(blk) for v in _var_datas(var)]
+        # Other fixed variables are constants, as far as the specification is concerned.
+        system = SquareSystem(blk)
+        self.variables = system.variables
+        self._var_index = system.var_index
+        self._spec_index = ComponentMap((v, j) for j, v in enumerate(self.specification))
+        jacobian, self._dF_dp = system.jacobian(parameters=self.specification)
+        try:
+            self._lu = splu(jacobian)
+        except RuntimeError as e:
+            raise ValueError(f"The Jacobian of {blk.name} is singular at the current point.") from e
+        self._dx_dp = None
+
+    def _resolve(self, key):
+        return self.blk.find_component(key) if isinstance(key, str) else key
+
+    @property
+    def matrix(self):
+        """
+        dx/dp, with a row for each of self.variables and a column for each of self.specification.
+        Computed for every specification variable the first time it is used.
+        """
+        if self._dx_dp is None:
+            self._dx_dp = -self._lu.solve(self._dF_dp)
+        return self._dx_dp
+
+    def derivative(self, var, spec_var):
+        """
+        d(var)/d(spec_var). Fixed variables other than spec_var have a derivative of zero.
+        """
+        var, spec_var = self._resolve(var), self._resolve(spec_var)
+        if spec_var not in self._spec_index:
+            raise ValueError(f"{spec_var.name} is not part of the specification of {self.blk.name}.")
+        if var is spec_var:
+            return 1.0
+        if var not in self._var_index:
+            return 0.0
+        return float(self.matrix[self._var_index[var], self._spec_index[spec_var]])
+
+    def _delta(self, changes):
+        dp = np.zeros(len(self.specification))
+        for key, new_value in changes.items():
+            spec_var = self._resolve(key)
+            if spec_var not in self._spec_index:
+                raise ValueError(f"{spec_var.name} is not part of the specification of {self.blk.name}.")
+            dp[self._spec_index[spec_var]] = new_value - value(spec_var)
+        return dp
+
+    def predict(self, changes):
+        """
+        Predict the values of the unfixed variables if the specification changed.
+
+        Args:
+            changes: {specification variable (or name relative to the block): new value}.
+                A ComponentMap is needed if the keys are variables.
+        Returns:
+            A ComponentMap of {variable: predicted value}.
+        """
+        dp = self._delta(changes)
+        # One solve for the combined change, rather than one for each specification variable.
+        dx = -self._lu.solve(self._dF_dp @ dp) if self._dx_dp is None else self._dx_dp @ dp
+        return ComponentMap((v, v.value + d) for v, d in zip(self.variables, dx.tolist()))
+
+    def apply(self, changes):
+        """
+        Set the specification to the new values, and the unfixed variables to their predicted values.
+        """
+        predicted = self.predict(changes)
+        for key, new_value in changes.items():
+            self._resolve(key).fix(new_value)
+        for v, val in predicted.items():
+            v.set_value(val, skip_validation=True)
+        return predicted
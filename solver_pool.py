@@ -0,0 +1,329 @@
+import os
+import queue
+import struct
+import subprocess
+import sys
+import uuid
+import cloudpickle
+from pyomo.environ import Var, Constraint
+from pyomo.common.collections import ComponentSet
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.opt import SolverResults, SolverStatus, TerminationCondition
+"""
+A pool of long-lived solver worker processes, for the many small solves of an initialisation.
+
+Each worker imports Pyomo and IDAES, and builds its solver, once. The first time a model is solved by a worker,
+the whole model is sent to it (pickled, see flowsheet_cache.py); after that, each solve only sends the state of
+the block being solved (the values and fixed flags of its variables and of the variables outside it that its
+constraints use, and which of its constraints are active) over a pipe, and gets the new values back.
+If the block's structure has changed since the worker last saw the model, the model is sent again.
+
+What this saves depends on the solver the workers hold. A solver that runs in the worker process
+(e.g NewtonSolver, which also keeps its factorisation structure between solves) avoids all per-solve setup.
+IPOPT still writes an NL file and starts an ipopt process for each solve inside the worker, so the gain with IPOPT
+comes from running unit solves in parallel (n_workers > 1, with solves made from several threads),
+which Pyomo can't safely do in one process. See tests/benchmark_solver_pool.py.
+
+pool.solver() is used like any other solver, so it works with staged_initialise(), the unit models'
+initialize(solver=...), initialise_with_fallbacks(), initialise_recycles() and so on.
+Its options are sent with each solve. A worker that exits is removed from the pool.
+
+Example:
+    with SolverPool("ipopt", n_workers=1) as pool:
+        opt = pool.solver()
+        m.fs.h1.initialize(solver=opt)
+        staged_initialise(m.fs.h2, opt)
+        res = opt.solve(m)
+"""
+
+
+def _block_components(blk):
+    """
+    The constraints of the block, and the variables a solve of it can see: its own, and those of other blocks
+    used in its active constraints. The order only depends on the model, so it is the same in the worker's copy.
+    """
+    constraints = list(blk.component_data_objects(Constraint, descend_into=True))
+    variables = ComponentSet(blk.component_data_objects(Var, descend_into=True))
+    for con in constraints:
+        if con.active:
+            variables.update(identify_variables(con.body))
+    return list(variables), constraints
+
+
+def _block_state(blk):
+    variables, constraints = _block_components(blk)
+    return [(v.value, v.fixed) for v in variables], [con.active for con in constraints]
+
+
+def _apply_block_state(blk, state):
+    """
+    Returns:
+        The variables of the block (see _block_components()), or None if its structure doesn't match the state.
+    """
+    var_state, con_state = state
+    constraints = list(blk.component_data_objects(Constraint, descend_into=True))
+    if len(constraints) != len(con_state):
+        return None
+    for con, active in zip(constraints, con_state):
+        if con.active != active:
+            con.activate() if active else con.deactivate()
+    variables, _ = _block_components(blk)
+    if len(variables) != len(var_state):
+        return None
+    for v, (val, fixed) in zip(variables, var_state):
+        v.set_value(val, skip_validation=True)
+        v.fixed = fixed
+    return variables
+
+
+def write_message(stream, obj):
+    """
+    Write obj to the stream, pickled with cloudpickle and prefixed with its length.
+    """
+    data = cloudpickle.dumps(obj)
+    stream.write(struct.pack("<Q", len(data)))
+    stream.write(data)
+    stream.flush()
+
+
+def read_message(stream):
+    """
+    Read an object written by write_message(). Raises EOFError if the stream is closed.
+    """
+    header = stream.read(8)
+    if len(header) < 8:
+        raise EOFError
+    (length,) = struct.unpack("<Q", header)
+    return cloudpickle.loads(stream.read(length))
+
+
+def worker_streams():
+    """
+    The streams a WorkerProcess reads messages from and writes replies to.
+    Anything printed (e.g by a solver) goes to stderr from then on, so stdout is only used for replies
+    (as in async_solve.py).
+    """
+    out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    return sys.stdin.buffer, out
+
+
+def _worker():
+    """
+    Entry point of a worker process. Reads (solver, options) from stdin, then loops over
+    ("model", key, model) and ("solve", key, block name, block state, options, tee) messages,
+    replying to each solve on stdout with ("ok", block values, (status, termination condition, message), iterations),
+    ("error", exception), or ("stale",) if it doesn't have the model or the block has changed structure.
+    """
+    conn, out = worker_streams()
+
+    from idaes.core.solvers import get_solver
+    from model_initialisation import solve_with_iterations, solver_options
+
+    solver, options = read_message(conn)
+    if isinstance(solver, str):
+        solver = get_solver(solver, options)
+    models = {}
+    while True:
+        try:
+            message = read_message(conn)
+        except EOFError:
+            return
+        if message[0] == "model":
+            _, key, model = message
+            models[key] = model
+            continue
+        _, key, block_name, state, solve_options, tee = message
+        model = models.get(key)
+        blk = None
+        if model is not None:
+            blk = model if block_name is None else model.find_component(block_name)
+        variables = None if blk is None else _apply_block_state(blk, state)
+        if variables is None:
+            write_message(out, ("stale",))
+            continue
+        try:
+            with solver_options(solver, solve_options):
+                res, iterations = solve_with_iterations(solver, blk, tee=tee)
+            values = [v.value for v in variables]
+            condition = (str(res.solver.status), str(res.solver.termination_condition), res.solver.message)
+            reply = ("ok", values, condition, iterations)
+        except Exception as e:
+            reply = ("error", RuntimeError(f"Solving {blk.name} in the solver pool failed: {e!r}"))
+        write_message(out, reply)
+
+
+class WorkerProcess:
+    """
+    A Python subprocess running entry (e.g "solver_pool._worker"), which exchanges messages with this process
+    (see write_message()) over its stdin and stdout.
+    """
+
+    def __init__(self, entry):
+        module = entry.rsplit(".", 1)[0]
+        env = dict(os.environ)
+        # The models are pickled by reference to the modules they were built with (see async_solve.py)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", f"import {module}; {entry}()"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+        )
+
+    def request(self, message):
+        write_message(self.process.stdin, message)
+
+    def reply(self):
+        try:
+            return read_message(self.process.stdout)
+        except EOFError:
+            raise RuntimeError(f"A worker process exited with code {self.process.poll()}.") from None
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def close(self):
+        if not self.alive:
+            return
+        self.process.stdin.close()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class SolverPool:
+    """
+    Args:
+        solver: The solver each worker uses: a name for get_solver(), or a picklable solver object.
+        options: Options for get_solver(), if solver is a name.
+        n_workers: The number of worker processes. More than one is only useful if solves are made
+            from several threads at once.
+    """
+
+    def __init__(self, solver="ipopt", options=None, n_workers=1):
+        self._workers = []
+        for _ in range(n_workers):
+            worker = WorkerProcess("solver_pool._worker")
+            worker.models = set()  # keys of the models this worker has
+            worker.request((solver, options))
+            self._workers.append(worker)
+        self._idle = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+        self.solves = 0
+        self.models_sent = 0
+
+    def solver(self, **options):
+        """
+        A solver object that solves in the pool, with its own options.
+        """
+        return PooledSolver(self, options)
+
+    def solve(self, blk, options=None, tee=False):
+        """
+        Solve the block in one of the workers, and set the values of its variables from the solution.
+
+        Returns:
+            (results, iterations), like model_initialisation.solve_with_iterations().
+        """
+        model = blk.model()
+        key = model.__dict__.get("_solver_pool_key")
+        if key is None:
+            key = uuid.uuid4().hex
+            model._solver_pool_key = key
+        block_name = None if blk is model else blk.getname(fully_qualified=True)
+        variables, constraints = _block_components(blk)
+        state = ([(v.value, v.fixed) for v in variables], [con.active for con in constraints])
+        message = ("solve", key, block_name, state, dict(options or {}), tee)
+        worker = self._get_worker()
+        try:
+            if key not in worker.models:
+                self._send_model(worker, key, model)
+            worker.request(message)
+            reply = worker.reply()
+            if reply[0] == "stale":
+                self._send_model(worker, key, model)
+                worker.request(message)
+                reply = worker.reply()
+        except (RuntimeError, OSError) as e:
+            # The worker has died (a broken pipe if it was mid-request), so it isn't put back.
+            self._remove(worker)
+            if isinstance(e, OSError):
+                raise RuntimeError(f"A solver pool worker exited with code {worker.process.poll()}.") from e
+            raise
+        self._idle.put(worker)
+        if reply[0] == "error":
+            raise reply[1]
+        _, values, (status, condition, solver_message), iterations = reply
+        for v, val in zip(variables, values):
+            v.set_value(val, skip_validation=True)
+        self.solves += 1
+
+        results = SolverResults()
+        results.solver.status = SolverStatus(status)
+        results.solver.termination_condition = TerminationCondition(condition)
+        results.solver.message = solver_message
+        return results, iterations
+
+    def _get_worker(self):
+        while True:
+            if not self._workers:
+                raise RuntimeError("All the solver pool's workers have exited.")
+            try:
+                worker = self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+            if worker.alive:
+                return worker
+            self._remove(worker)
+
+    def _remove(self, worker):
+        worker.close()
+        if worker in self._workers:
+            self._workers.remove(worker)
+
+    @property
+    def n_workers(self):
+        return len(self._workers)
+
+    def _send_model(self, worker, key, model):
+        worker.request(("model", key, model))
+        worker.models.add(key)
+        self.models_sent += 1
+
+    def close(self):
+        for worker in self._workers:
+            worker.close()
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PooledSolver:
+    """
+    A solver that sends its solves to a SolverPool. Made with SolverPool.solver().
+    """
+
+    def __init__(self, pool, options=None):
+        self.pool = pool
+        self.options = dict(options or {})
+
+    def available(self, exception_flag=True):
+        return True
+
+    def solve(self, blk, tee=False, logfile=None, **kwargs):
+        results, iterations = self.pool.solve(blk, self.options, tee)
+        if logfile is not None:
+            # So solve_with_iterations() can read the iteration count, the same as for IPOPT.
+            with open(logfile, "w") as f:
+                if iterations is not None:
+                    f.write(f"Number of Iterations....: {iterations}\n")
+        return results
@@ -0,0 +1,87 @@
+import numpy as np
+from model import list_state_vars, list_block_replacements, list_specification, _var_datas
+"""
+Access to the values of the registered variables of a flowsheet as numpy arrays.
+
+The order of the variables is fixed when the vector is created (the order they were registered,
+with IndexedVars expanded in index order), so arrays from get_values() can be stored and set back later,
+e.g for a parameter sweep:
+
+    spec = SpecificationVector(m.fs)
+    base = spec.get_values()
+    for scale in np.linspace(0.9, 1.1, 20):
+        spec.set_values(base * scale)
+        opt.solve(m)
+
+Pyomo has no vectorised way to set variable values, so set_values() is still one Python call per variable,
+but with the bound methods looked up once and validation skipped it is a few times cheaper than a loop of
+var.fix(value) (see tests/benchmark_specification_vector.py).
+"""
+
+_kinds = {
+    # the fixed variables that define the problem
+    "specification": lambda block: list_specification(block),
+    # all registered state variables, whether they have been replaced or not
+    "state_vars": lambda block: list_state_vars(block),
+    # state variables that have been replaced, whose values are used as initial guesses
+    "guesses": lambda block: [state_var for state_var, _ in list_block_replacements(block)],
+    # the variables that replaced them
+    "replacements": lambda block: [new_var for _, new_var in list_block_replacements(block)],
+}
+
+
+class SpecificationVector:
+    """
+    A fixed ordering over the registered variables of a block.
+
+    Args:
+        block: The flowsheet or unit.
+        kind: Which variables to include: "specification" (state vars that haven't been replaced,
+            and the variables that replaced them), "state_vars", "guesses" or "replacements".
+    """
+
+    def __init__(self, block, kind="specification"):
+        if kind not in _kinds:
+            raise ValueError(f"kind must be one of {list(_kinds)}, not {kind}.")
+        self.block = block
+        self.kind = kind
+        self.variables = [v for var in _kinds[kind](block) for v in _var_datas(var)]
+        # Bound methods are looked up once here, rather than on every call.
+        self._setters = [v.set_value for v in self.variables]
+        self._fixers = [v.fix for v in self.variables]
+
+    def __len__(self):
+        return len(self.variables)
+
+    @property
+    def names(self):
+        """
+        The names of the variables, relative to the block.
+        """
+        return [v.getname(fully_qualified=True, relative_to=self.block) for v in self.variables]
+
+    def get_values(self):
+        """
+        The current values, as a numpy array (nan where a variable has no value).
+        """
+        return np.array([np.nan if v.value is None else v.value for v in self.variables], dtype=float)
+
+    def set_values(self, values, fix=False):
+        """
+        Set the values of all the variables from an array in the same order as get_values().
+        Values are not validated against the variable bounds or domain. nan sets a variable's value to None,
+        so set_values(get_values()) leaves variables without a value unchanged.
+
+        Args:
+            values: An array (or sequence) with one value per variable.
+            fix: Also fix the variables. Otherwise, whether they are fixed is left unchanged.
+        """
+        values = np.asarray(values, dtype=float)
+        if values.shape != (len(self.variables),):
+            raise ValueError(
+                f"Expected {len(self.variables)} values for the {self.kind} of {self.block.name}, "
+                f"but got an array of shape {values.shape}."
+            )
+        setters = self._fixers if fix else self._setters
+        for setter, val in zip(setters, np.where(np.isnan(values), None, values).tolist()):
+            setter(val, skip_validation=True)
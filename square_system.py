@@ -0,0 +1,104 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from pyomo.environ import Constraint, value
+from pyomo.common.collections import ComponentMap
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.core.expr.calculus.derivatives import differentiate, Modes
+"""
+The active equality constraints of a block as a square system of equations F(x) = 0 in its unfixed variables,
+with numpy/scipy evaluation of the residuals and the sparse Jacobian.
+
+Used by the Newton solver (newton.py) and the sensitivity calculations (sensitivity.py).
+"""
+
+
+class SquareSystem:
+    """
+    Args:
+        blk: The block. Raises ValueError if it doesn't have as many unfixed variables as active equality constraints.
+    """
+
+    def __init__(self, blk):
+        self.blk = blk
+        self.constraints = [
+            con
+            for con in blk.component_data_objects(Constraint, active=True, descend_into=True)
+            if con.equality
+        ]
+        self.variables = []
+        self.var_index = ComponentMap()
+        # Every variable in each constraint, fixed or not, so the Jacobian can also be taken with respect to fixed ones
+        self._con_vars = []
+        for con in self.constraints:
+            con_vars = list(identify_variables(con.body, include_fixed=True))
+            self._con_vars.append(con_vars)
+            for v in con_vars:
+                if not v.fixed and v not in self.var_index:
+                    self.var_index[v] = len(self.variables)
+                    self.variables.append(v)
+        if len(self.variables) != len(self.constraints):
+            raise ValueError(
+                f"{blk.name} has {len(self.constraints)} active equality constraints and "
+                f"{len(self.variables)} unfixed variables, so it is not square."
+            )
+        self.signature = self._signature()
+
+    def __len__(self):
+        return len(self.variables)
+
+    def _signature(self):
+        return tuple(v.fixed for con_vars in self._con_vars for v in con_vars) + tuple(
+            con.active for con in self.constraints
+        )
+
+    def is_current(self):
+        """
+        True if no variable in the system has been fixed or unfixed, and no constraint (de)activated, since it was built.
+        New constraints or variables are not detected.
+        """
+        return self._signature() == self.signature
+
+    def get_values(self):
+        return np.array([v.value for v in self.variables], dtype=float)
+
+    def set_values(self, x):
+        for v, val in zip(self.variables, x.tolist()):
+            v.set_value(val, skip_validation=True)
+
+    def bounds(self):
+        lower = np.array([-np.inf if v.lb is None else v.lb for v in self.variables], dtype=float)
+        upper = np.array([np.inf if v.ub is None else v.ub for v in self.variables], dtype=float)
+        return lower, upper
+
+    def residuals(self):
+        return np.array([value(con.body) - value(con.upper) for con in self.constraints], dtype=float)
+
+    def jacobian(self, parameters=None):
+        """
+        The sparse (csc) Jacobian dF/dx at the current values.
+
+        Args:
+            parameters: An optional list of fixed variables. If given, (dF/dx, dF/dparameters) is returned,
+                with dF/dparameters as a dense array.
+        """
+        param_index = ComponentMap((v, j) for j, v in enumerate(parameters or []))
+        rows, cols, vals = [], [], []
+        p_rows, p_cols, p_vals = [], [], []
+        for i, (con, con_vars) in enumerate(zip(self.constraints, self._con_vars)):
+            gradient = differentiate(con.body, wrt_list=con_vars, mode=Modes.reverse_numeric)
+            for v, d in zip(con_vars, gradient):
+                if d == 0:
+                    continue
+                if v in self.var_index:
+                    rows.append(i)
+                    cols.append(self.var_index[v])
+                    vals.append(d)
+                elif v in param_index:
+                    p_rows.append(i)
+                    p_cols.append(param_index[v])
+                    p_vals.append(d)
+        n = len(self.constraints)
+        jacobian = coo_matrix((vals, (rows, cols)), shape=(n, n)).tocsc()
+        if parameters is None:
+            return jacobian
+        return jacobian, coo_matrix((p_vals, (p_rows, p_cols)), shape=(n, len(param_index))).toarray()
@@ -0,0 +1,167 @@
+import functools
+import time
+from pyomo.environ import Var, check_optimal_termination
+from pyomo.common.collections import ComponentMap, ComponentSet
+from model import list_specification, _var_datas
+"""
+Re-solve a flowsheet as measurements come in, e.g for a digital twin.
+
+The measurements are values of the specification of the block (see model.list_specification),
+usually the variables that replaced state variables, such as an outlet pressure or temperature.
+Each batch of measurements is applied to those (fixed) variables, and the block is re-solved starting
+from the previous solution. If no measurement has moved by more than the tolerance since the last solve,
+the solve is skipped.
+
+Example:
+    runner = StreamingRunner(m.fs, opt, rtol=1e-3)
+    for state in runner.run(measurements):  # e.g [{"h1.outlet.pressure[0.0]": 2e5}, ...]
+        print(state.latency, state.values["fs.h1.heat_duty"])
+"""
+
+
+class SolvedState:
+    """
+    The result of one batch of measurements.
+
+    Attributes:
+        inputs: The measurement values, by variable name.
+        values: The value of every variable in the block after the update, by variable name.
+        results: The solver results, or None if the solve was skipped.
+        skipped: True if no measurement moved more than the tolerance, so the block wasn't re-solved.
+        latency: Seconds taken to handle the batch.
+    """
+
+    def __init__(self, inputs, values, results, skipped, latency):
+        self.inputs = inputs
+        self.values = values
+        self.results = results
+        self.skipped = skipped
+        self.latency = latency
+
+    @property
+    def converged(self):
+        return self.results is not None and check_optimal_termination(self.results)
+
+
+def _solve_job(opt, blk):
+    return opt.solve(blk)
+
+
+class StreamingRunner:
+    """
+    Applies batches of measurements to a block and re-solves it.
+
+    Args:
+        blk: The block to solve, usually the flowsheet.
+        opt: The solver.
+        rtol: A batch is skipped if every measurement is within rtol (relative to its last solved value) of it.
+        atol: Absolute tolerance, used as well as rtol.
+        warm_start: An optional warm_start.WarmStartStore. If given, converged points are recorded in it,
+            and the initial values are set from the nearest stored point before each solve.
+            Otherwise each solve starts from the last converged point.
+    """
+
+    def __init__(self, blk, opt, rtol=1e-6, atol=0.0, warm_start=None):
+        self.blk = blk
+        self.opt = opt
+        self.rtol = rtol
+        self.atol = atol
+        self.warm_start = warm_start
+        self.latencies = []
+        self._specification = ComponentSet(v for var in list_specification(blk) for v in _var_datas(var))
+        self._variables = list(blk.component_data_objects(Var, descend_into=True))
+        self._last_inputs = ComponentMap()  # var -> value at the last converged solve
+        self._last_good = None  # values of self._variables at the last converged solve
+
+    def _resolve(self, key):
+        var = self.blk.find_component(key) if isinstance(key, str) else key
+        if var is None:
+            raise ValueError(f"Could not find variable {key} in {self.blk.name}.")
+        if var not in self._specification:
+            raise ValueError(
+                f"Variable {var.name} is not part of the specification of {self.blk.name}. "
+                "Measurements can only be applied to state variables, or variables that replaced them."
+            )
+        return var
+
+    def _apply(self, batch):
+        """
+        Set the measured values, and return (the measured variables, whether the solve can be skipped).
+        """
+        measured = []
+        skip = self._last_good is not None
+        for key, val in batch.items():
+            var = self._resolve(key)
+            old = self._last_inputs.get(var)
+            if old is None or abs(val - old) > self.atol + self.rtol * abs(old):
+                skip = False
+            var.fix(val)
+            measured.append(var)
+        return measured, skip
+
+    def _before_solve(self):
+        if self.warm_start is not None:
+            self.warm_start.seed(self.blk)
+
+    def _after_solve(self, results, measured):
+        if check_optimal_termination(results):
+            for var in measured:
+                self._last_inputs[var] = var.value
+            self._last_good = [v.value for v in self._variables]
+            if self.warm_start is not None:
+                self.warm_start.record(self.blk, results)
+        elif self._last_good is not None:
+            # Start the next solve from the last converged point, not from wherever this one got to.
+            for v, val in zip(self._variables, self._last_good):
+                if not v.fixed:
+                    v.set_value(val, skip_validation=True)
+
+    def _state(self, measured, results, skipped, start):
+        latency = time.perf_counter() - start
+        self.latencies.append(latency)
+        inputs = {v.name: v.value for v in measured}
+        values = {v.name: v.value for v in self._variables}
+        return SolvedState(inputs, values, results, skipped, latency)
+
+    def update(self, batch):
+        """
+        Apply one batch of measurements, and re-solve if needed.
+        The batch is a dict of {name relative to the block: value}, or a ComponentMap of {variable: value}.
+
+        Returns:
+            A SolvedState.
+        """
+        start = time.perf_counter()
+        measured, skip = self._apply(batch)
+        if skip:
+            return self._state(measured, None, True, start)
+        self._before_solve()
+        results = self.opt.solve(self.blk)
+        self._after_solve(results, measured)
+        return self._state(measured, results, False, start)
+
+    def run(self, measurements):
+        """
+        Yield a SolvedState for each batch of measurements in an iterable.
+        """
+        for batch in measurements:
+            yield self.update(batch)
+
+    async def run_async(self, measurements, executor=None, timeout=None):
+        """
+        Yield a SolvedState for each batch in an async iterable of measurements.
+        The solves run in a subprocess (see async_solve.py), so the event loop isn't blocked.
+        """
+        from async_solve import get_executor
+
+        executor = executor or get_executor()
+        async for batch in measurements:
+            start = time.perf_counter()
+            measured, skip = self._apply(batch)
+            if skip:
+                yield self._state(measured, None, True, start)
+                continue
+            self._before_solve()
+            results = await executor.run(self.blk, functools.partial(_solve_job, self.opt), timeout)
+            self._after_solve(results, measured)
+            yield self._state(measured, results, False, start)
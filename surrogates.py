@@ -0,0 +1,206 @@
+from itertools import combinations_with_replacement
+import numpy as np
+from pyomo.environ import Var, check_optimal_termination
+from pyomo.common.collections import ComponentSet
+import idaes.logger as idaeslog
+from model import list_state_vars, _var_datas
+from warm_start import relative_names, var_values
+"""
+Surrogate models that give initial guesses for SV unit models.
+
+A surrogate maps the values of a unit's state variables to the values of every other variable in the unit.
+It is fitted from the results of previous solves, and used to set initial values before staged_initialise(),
+where the state vars are exactly what is fixed in the first stage.
+
+Example:
+    samples = SampleLog()
+    for ... :  # solve a range of operating points
+        samples.record(m.fs.h1, res)
+    surrogate = samples.fit()
+    surrogate.save("heater.npz")
+    register_surrogate(SVHeater, PolynomialSurrogate.load("heater.npz"))
+"""
+
+_log = idaeslog.getLogger(__name__)
+
+
+class PolynomialSurrogate:
+    """
+    A polynomial least squares fit from input values to output values.
+
+    Inputs are normalised to zero mean and unit variance before building the polynomial features,
+    so the fit is well conditioned even with IAPWS sized values (e.g pressures in Pa).
+    """
+
+    def __init__(self, input_names, output_names, degree=2, ridge=1e-8):
+        self.input_names = tuple(input_names)
+        self.output_names = tuple(output_names)
+        self.degree = degree
+        self.ridge = ridge
+        self.mean = None
+        self.std = None
+        self.coefficients = None
+
+    def _features(self, X):
+        Z = (X - self.mean) / self.std
+        columns = [np.ones(len(Z))]
+        for d in range(1, self.degree + 1):
+            for combination in combinations_with_replacement(range(Z.shape[1]), d):
+                columns.append(np.prod(Z[:, combination], axis=1))
+        return np.column_stack(columns)
+
+    def fit(self, X, Y):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        Y = np.atleast_2d(np.asarray(Y, dtype=float))
+        self.mean = X.mean(axis=0)
+        self.std = X.std(axis=0)
+        self.std[self.std == 0] = 1
+        F = self._features(X)
+        # Ridge regularised normal equations, so a small number of samples still gives a usable fit.
+        A = F.T @ F + self.ridge * np.eye(F.shape[1])
+        self.coefficients = np.linalg.solve(A, F.T @ Y)
+        return self
+
+    def predict(self, X):
+        if self.coefficients is None:
+            raise ValueError("The surrogate has not been fitted yet.")
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        return self._features(X) @ self.coefficients
+
+    def save(self, path):
+        np.savez(
+            path,
+            input_names=np.array(self.input_names),
+            output_names=np.array(self.output_names),
+            degree=self.degree,
+            ridge=self.ridge,
+            mean=self.mean,
+            std=self.std,
+            coefficients=self.coefficients,
+        )
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        surrogate = cls(
+            data["input_names"].tolist(),
+            data["output_names"].tolist(),
+            int(data["degree"]),
+            float(data["ridge"]),
+        )
+        surrogate.mean = data["mean"]
+        surrogate.std = data["std"]
+        surrogate.coefficients = data["coefficients"]
+        return surrogate
+
+
+def _inputs_and_outputs(block):
+    """
+    The state vars of the block, and every other variable in it.
+    """
+    inputs = [v for var in list_state_vars(block) for v in _var_datas(var)]
+    input_set = ComponentSet(inputs)
+    outputs = [
+        v for v in block.component_data_objects(Var, descend_into=True) if v not in input_set
+    ]
+    return inputs, outputs
+
+
+class SampleLog:
+    """
+    Training data for a surrogate: (state var values -> all other variable values) pairs from previous solves.
+    """
+
+    def __init__(self):
+        self.input_names = None
+        self.output_names = None
+        self.X = []
+        self.Y = []
+
+    def __len__(self):
+        return len(self.X)
+
+    def record(self, block, results=None):
+        """
+        Record the current values of the block.
+        If results are given, only record the point if the solve was optimal.
+        """
+        if results is not None and not check_optimal_termination(results):
+            return False
+        inputs, outputs = _inputs_and_outputs(block)
+        input_names = relative_names(block, inputs)
+        output_names = relative_names(block, outputs)
+        if self.input_names is None:
+            self.input_names = input_names
+            self.output_names = output_names
+        elif input_names != self.input_names or output_names != self.output_names:
+            raise ValueError(
+                f"Block {block.name} does not have the same variables as the other samples in this log."
+            )
+        x, y = var_values(inputs), var_values(outputs)
+        if np.isnan(x).any():
+            return False
+        self.X.append(x)
+        self.Y.append(y)
+        return True
+
+    def fit(self, degree=2):
+        """
+        Fit a PolynomialSurrogate to the recorded samples.
+        Outputs that were never given a value are left out.
+        """
+        if len(self.X) == 0:
+            raise ValueError("No samples have been recorded.")
+        Y = np.array(self.Y)
+        has_value = ~np.isnan(Y).any(axis=0)
+        output_names = [n for n, keep in zip(self.output_names, has_value) if keep]
+        surrogate = PolynomialSurrogate(self.input_names, output_names, degree)
+        return surrogate.fit(np.array(self.X), Y[:, has_value])
+
+
+_surrogates = {}
+
+
+def register_surrogate(unit_class, surrogate):
+    """
+    Use this surrogate for all units of this class (e.g SVHeater) that don't have their own.
+    """
+    _surrogates[unit_class] = surrogate
+
+
+def get_surrogate(block):
+    """
+    Get the surrogate registered for the class of this block (or one of its base classes), or None.
+    """
+    for cls in type(block).__mro__:
+        if cls in _surrogates:
+            return _surrogates[cls]
+    return None
+
+
+def seed_from_surrogate(block, surrogate=None):
+    """
+    Set the initial values of the unfixed variables in the block from the surrogate's prediction
+    at the block's current state var values.
+
+    Returns:
+        True if the block was seeded, False if there is no surrogate or its inputs don't match the block's
+        state vars (e.g a state var has been replaced since the surrogate was trained).
+    """
+    if surrogate is None:
+        surrogate = get_surrogate(block)
+        if surrogate is None:
+            return False
+    inputs, outputs = _inputs_and_outputs(block)
+    if relative_names(block, inputs) != surrogate.input_names:
+        _log.warning(
+            f"The state vars of {block.name} do not match the inputs of the surrogate, so it was not used."
+        )
+        return False
+    prediction = surrogate.predict(var_values(inputs))[0]
+    output_by_name = dict(zip(relative_names(block, outputs), outputs))
+    for name, val in zip(surrogate.output_names, prediction.tolist()):
+        v = output_by_name.get(name)
+        if v is not None and not v.fixed:
+            v.set_value(val, skip_validation=True)
+    return True
@@ -0,0 +1,146 @@
+"""
+Convergence metrics of every SV unit model over a catalogue of specifications, comparing the IDAES
+initialisation ("direct", which doesn't know about replacements) with the staged initialisation.
+
+For each unit, specification and method, records over a few repeats:
+- the success rate of the initialisation, and of the full solve after it,
+- the total IPOPT iterations and number of solves during initialisation (including the state block solves),
+- the wall time of the initialisation.
+
+The results are written to a JSON file, so runs can be compared. If a previous results file is given,
+the changes from it are printed.
+
+Run with:
+    python -m tests.benchmark_convergence [results.json] [previous_results.json]
+"""
+import datetime
+import json
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from model import *
+from idaes.core.util.exceptions import InitializationError
+import pyomo.environ as pyo
+from pyomo.opt.base.solvers import OptSolver
+from pyomo.common.tempfiles import TempfileManager
+from idaes.core.solvers import get_solver
+from .toy_models import catalogue, setup_unit
+
+
+@contextmanager
+def count_solves():
+    """
+    Count every solve made by a Pyomo solver, and the IPOPT iterations they take (read from the solver log).
+    """
+    stats = {"solves": 0, "iterations": 0}
+    original = OptSolver.solve
+
+    def solve(self, *args, **kwargs):
+        with TempfileManager.new_context() as tempfiles:
+            if kwargs.get("logfile") is None:
+                kwargs["logfile"] = tempfiles.create_tempfile(suffix=".log")
+            res = original(self, *args, **kwargs)
+            with open(kwargs["logfile"]) as f:
+                for line in f:
+                    if line.startswith("Number of Iterations....:"):
+                        stats["iterations"] += int(line.split(":")[1])
+        stats["solves"] += 1
+        return res
+
+    OptSolver.solve = solve
+    try:
+        yield stats
+    finally:
+        OptSolver.solve = original
+
+
+def run_case(unit_class, idaes_class, unit_kwargs, inlets, specify, method, opt):
+    m = setup_unit(unit_class, inlets, specify, unit_kwargs)
+    start = time.perf_counter()
+    with count_solves() as stats:
+        try:
+            if method == "staged":
+                m.fs.unit.initialize()
+            else:
+                idaes_class.initialize_build(m.fs.unit)
+            initialised = True
+        except (InitializationError, ValueError):
+            initialised = False
+    seconds = time.perf_counter() - start
+    try:
+        solved = pyo.check_optimal_termination(opt.solve(m))
+    except ValueError:
+        solved = False
+    return initialised, solved, stats["iterations"], stats["solves"], seconds
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    old = {(r["unit"], r["specification"], r["method"]): r for r in previous["results"]}
+    print(f"\nChanges from {previous.get('commit')}:")
+    for r in results:
+        o = old.get((r["unit"], r["specification"], r["method"]))
+        if o is None:
+            continue
+        changes = []
+        for key in ("init_success_rate", "solve_success_rate", "mean_iterations", "mean_solves"):
+            if r[key] != o[key]:
+                changes.append(f"{key} {o[key]:.3g} -> {r[key]:.3g}")
+        if changes:
+            print(f"  {r['unit']} {r['specification']} {r['method']}: {', '.join(changes)}")
+
+
+output = sys.argv[1] if len(sys.argv) > 1 else "benchmark_convergence.json"
+opt = get_solver("ipopt")
+n_repeats = 3
+results = []
+for unit_class, idaes_class, unit_kwargs, inlets, specifications in catalogue:
+    for spec_name, specify in specifications.items():
+        for method in ("direct", "staged"):
+            runs = [
+                run_case(unit_class, idaes_class, unit_kwargs, inlets, specify, method, opt)
+                for _ in range(n_repeats)
+            ]
+            results.append(
+                {
+                    "unit": unit_class.__name__,
+                    "specification": spec_name,
+                    "method": method,
+                    "repeats": n_repeats,
+                    "init_success_rate": sum(r[0] for r in runs) / n_repeats,
+                    "solve_success_rate": sum(r[1] for r in runs) / n_repeats,
+                    "mean_iterations": sum(r[2] for r in runs) / n_repeats,
+                    "mean_solves": sum(r[3] for r in runs) / n_repeats,
+                    "mean_time": sum(r[4] for r in runs) / n_repeats,
+                }
+            )
+
+print(f"{'unit':>16} {'specification':>22} {'method':>7} {'init':>5} {'solve':>5} {'iters':>6} {'solves':>6} {'time':>8}")
+for r in results:
+    print(
+        f"{r['unit']:>16} {r['specification']:>22} {r['method']:>7} {r['init_success_rate']:>5.0%} "
+        f"{r['solve_success_rate']:>5.0%} {r['mean_iterations']:>6.1f} {r['mean_solves']:>6.1f} {r['mean_time']:>7.3f}s"
+    )
+
+with open(output, "w") as f:
+    json.dump(
+        {
+            "commit": git_commit(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "results": results,
+        },
+        f,
+        indent=2,
+    )
+print(f"Results written to {output}")
+
+if len(sys.argv) > 2:
+    with open(sys.argv[2]) as f:
+        compare(results, json.load(f))
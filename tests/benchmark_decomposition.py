@@ -0,0 +1,79 @@
+"""
+Compare solving a long chain of compressors, heaters and turbines as one NLP with solving it in partitions
+in parallel (decomposition.py), for increasing numbers of units and partitions.
+
+Run with:
+    python -m tests.benchmark_decomposition
+"""
+import time
+from model import *
+import pyomo.environ as pyo
+from pyomo.network import Arc
+from idaes.core import FlowsheetBlock
+from idaes.core.solvers import get_solver
+from idaes.core.util.initialization import propagate_state
+from idaes.models.properties import iapws95
+from decomposition import solve_decomposed
+from unit_models.compressor import SVCompressor
+from unit_models.heater import SVHeater
+from unit_models.turbine import SVTurbine
+
+
+def setup(n_stages):
+    """
+    n_stages of compressor -> heater -> turbine in series, each replacing a state var with an outlet condition.
+    """
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.pp = iapws95.Iapws95ParameterBlock()
+    units = []
+    for i in range(n_stages):
+        compressor = SVCompressor(property_package=m.fs.pp)
+        heater = SVHeater(property_package=m.fs.pp)
+        turbine = SVTurbine(property_package=m.fs.pp)
+        m.fs.add_component(f"compressor{i}", compressor)
+        m.fs.add_component(f"heater{i}", heater)
+        m.fs.add_component(f"turbine{i}", turbine)
+        units += [compressor, heater, turbine]
+    for i, (source, dest) in enumerate(zip(units, units[1:])):
+        m.fs.add_component(f"arc{i}", Arc(source=source.outlet, destination=dest.inlet))
+    pyo.TransformationFactory("network.expand_arcs").apply_to(m)
+    register_inlet_ports(m.fs)
+
+    m.fs.compressor0.inlet.flow_mol.fix(100)
+    m.fs.compressor0.inlet.pressure.fix(1e5)
+    m.fs.compressor0.inlet.enth_mol.fix(m.fs.pp.htpx(p=1e5 * pyo.units.Pa, T=420 * pyo.units.K))
+    for i in range(n_stages):
+        compressor, heater, turbine = units[3 * i : 3 * i + 3]
+        compressor.deltaP.fix(4e5)
+        replace_state_var(heater.heat_duty, heater.outlet.enth_mol)
+        heater.outlet.enth_mol.fix(m.fs.pp.htpx(p=5e5 * pyo.units.Pa, T=700 * pyo.units.K))
+        replace_state_var(turbine.work_mechanical, turbine.outlet.pressure)
+        turbine.outlet.pressure.fix(1e5)
+    for i, unit in enumerate(units):
+        unit.initialize()
+        if i < len(units) - 1:
+            propagate_state(getattr(m.fs, f"arc{i}"))
+    return m
+
+
+opt = get_solver("ipopt")
+results = []
+for n_stages in (2, 4, 8):
+    m = setup(n_stages)
+    start = time.perf_counter()
+    res = opt.solve(m)
+    results.append((3 * n_stages, "monolithic", pyo.check_optimal_termination(res), None, time.perf_counter() - start))
+    for n_partitions in (2, 4):
+        m = setup(n_stages)
+        start = time.perf_counter()
+        try:
+            report = solve_decomposed(m.fs, n_partitions=n_partitions, max_workers=n_partitions)
+            ok, rounds = report.converged, len(report.rounds)
+        except RuntimeError:
+            ok, rounds = False, None
+        results.append((3 * n_stages, f"{n_partitions} partitions", ok, rounds, time.perf_counter() - start))
+
+print(f"{'units':>6} {'mode':>14} {'solved':>7} {'rounds':>7} {'time':>9}")
+for n_units, mode, ok, rounds, seconds in results:
+    print(f"{n_units:>6} {mode:>14} {str(ok):>7} {str(rounds or ''):>7} {seconds:>8.3f}s")
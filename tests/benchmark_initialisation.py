@@ -0,0 +1,61 @@
+"""
+Compare the shared staged initialisation of the SV unit models (StagedInitialisationMixin)
+with the IDAES default initialisation of the same units, over different replacements.
+
+For each unit and specification, reports whether initialisation succeeded, whether the full solve
+afterwards converged, and how long initialisation took.
+
+Run with:
+    python -m tests.benchmark_initialisation
+"""
+import time
+from model import *
+from idaes.core.util.exceptions import InitializationError
+import pyomo.environ as pyo
+from idaes.core.solvers import get_solver
+from .toy_models import catalogue, setup_unit
+
+# name, unit class, IDAES class, unit kwargs, inlets, function making the replacements
+cases = [
+    (f"{unit_class.__name__}: {spec_name}", unit_class, idaes_class, unit_kwargs, inlets, specify)
+    for unit_class, idaes_class, unit_kwargs, inlets, specifications in catalogue
+    for spec_name, specify in specifications.items()
+]
+
+opt = get_solver("ipopt")
+n_repeats = 3
+results = []
+for name, unit_class, idaes_class, unit_kwargs, inlets, specify in cases:
+    for method in ("idaes", "staged"):
+        successes = 0
+        converged = 0
+        times = []
+        for _ in range(n_repeats):
+            m = setup_unit(unit_class, inlets, specify, unit_kwargs)
+            start = time.perf_counter()
+            try:
+                if method == "staged":
+                    m.fs.unit.initialize()
+                else:
+                    # The IDAES initialisation, which doesn't know about replacements
+                    idaes_class.initialize_build(m.fs.unit)
+                successes += 1
+            except (InitializationError, ValueError):
+                pass
+            times.append(time.perf_counter() - start)
+            res = opt.solve(m)
+            converged += pyo.check_optimal_termination(res)
+        results.append((name, method, successes, converged, sum(times) / len(times)))
+
+
+print(f"{'case':>40} {'method':>8} {'init ok':>8} {'solved':>8} {'init time':>10}")
+for name, method, successes, converged, avg_time in results:
+    print(f"{name:>40} {method:>8} {successes:>5}/{n_repeats} {converged:>5}/{n_repeats} {avg_time:>9.3f}s")
+
+for method in ("idaes", "staged"):
+    rows = [r for r in results if r[1] == method]
+    failures = sum(n_repeats - r[2] for r in rows)
+    print(
+        f"{method}: initialisation failure rate {failures / (n_repeats * len(rows)):.0%}, "
+        f"mean init time {sum(r[4] for r in rows) / len(rows):.3f}s"
+    )
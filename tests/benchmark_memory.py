@@ -0,0 +1,78 @@
+"""
+Measure the memory used by the registry, by the structural checks in replace_state_var(),
+and by the snapshots taken by record_model_definition(), on chains of toy units of increasing size.
+
+tests/test_memory.py runs the same measurements with thresholds, to catch regressions.
+
+Run with:
+    python -m tests.benchmark_memory
+"""
+import gc
+import tracemalloc
+from model import *
+from model_initialisation import record_model_definition
+from .toy_models import build_chain
+
+
+def _traced():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def measure(n_units, n_replacements=10):
+    """
+    Returns a dict of:
+        registration: bytes per unit, allocated in model.py and still held after building the flowsheet
+            (the _state_vars and _replacements registries).
+        replacement_peak: the most memory in use at once while making a replacement, above what was held before
+            (mostly the incidence graph of the structural check).
+        replacement_retained: bytes per replacement still held afterwards.
+        snapshot: bytes per unit held by a record_model_definition() snapshot of the flowsheet.
+    """
+    n_replacements = min(n_units - 1, n_replacements)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        m, units = build_chain(n_units)
+        registry = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, "*model.py")])
+        registration = sum(stat.size for stat in registry.statistics("filename"))
+
+        units[0].flow_in.fix(1)
+        units[0].h_in.fix(10)
+        for unit in units:
+            unit.duty.fix(10)
+        # The first replacement fills caches in Pyomo that are only created once, so it isn't counted.
+        replace_state_var(units[-1].duty, units[-1].h_out)
+
+        before = _traced()
+        peak = 0
+        for unit in units[:n_replacements]:
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            replace_state_var(unit.duty, unit.h_out)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - start)
+        replacement_retained = _traced() - before
+
+        before = _traced()
+        state = record_model_definition(m.fs)
+        snapshot = _traced() - before
+        del state
+    finally:
+        tracemalloc.stop()
+    return {
+        "registration": registration / n_units,
+        "replacement_peak": peak,
+        "replacement_retained": replacement_retained / n_replacements,
+        "snapshot": snapshot / n_units,
+    }
+
+
+if __name__ == "__main__":
+    sizes = [10, 50, 200, 800]
+    print(f"{'units':>6} {'registration':>14} {'replace peak':>14} {'replace kept':>14} {'snapshot':>14}")
+    for n_units in sizes:
+        r = measure(n_units)
+        print(
+            f"{n_units:>6} {r['registration']:>12.0f} B {r['replacement_peak']:>12.0f} B "
+            f"{r['replacement_retained']:>12.0f} B {r['snapshot']:>12.0f} B"
+        )
@@ -0,0 +1,109 @@
+"""
+Compare the Newton solver (newton.py) with IPOPT on the example units, each with a replaced state var.
+
+Each unit is initialised, its specification is then changed, and the new point is solved from the old solution
+with both solvers. Reports whether each converged, the number of iterations, and the time per solve.
+The Newton solver is timed over repeated solves, so later solves reuse the structure from the first one.
+
+Run with:
+    python -m tests.benchmark_newton
+"""
+import time
+from model import *
+import pyomo.environ as pyo
+from idaes.core import FlowsheetBlock
+from idaes.core.solvers import get_solver
+from idaes.models.properties import iapws95
+from model_initialisation import solve_with_iterations
+from newton import NewtonSolver
+from unit_models.heater import SVHeater
+from unit_models.compressor import SVCompressor
+from unit_models.turbine import SVTurbine
+from unit_models.valve import SVValve
+
+
+def setup(unit_class, inlet, replace):
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.pp = iapws95.Iapws95ParameterBlock()
+    m.fs.unit = unit_class(property_package=m.fs.pp)
+    register_inlet_ports(m.fs)
+    flow, pressure, temperature = inlet
+    m.fs.unit.inlet.flow_mol.fix(flow)
+    m.fs.unit.inlet.pressure.fix(pressure)
+    m.fs.unit.inlet.enth_mol.fix(htpx(m, pressure, temperature))
+    spec = replace(m)
+    m.fs.unit.initialize()
+    return m, spec
+
+
+def htpx(m, pressure, temperature):
+    return pyo.value(m.fs.pp.htpx(p=pressure * pyo.units.Pa, T=temperature * pyo.units.K))
+
+
+def replaced(state_var, new_var, val):
+    new_var = new_var[0.0]
+    replace_state_var(state_var, new_var)
+    new_var.fix(val)
+    return new_var
+
+
+# name, unit class, inlet (flow, pressure, temperature), function making the replacement, relative change to the spec
+cases = [
+    (
+        "heater: outlet enthalpy",
+        SVHeater,
+        (100, 1e5, 300),
+        lambda m: replaced(m.fs.unit.heat_duty, m.fs.unit.outlet.enth_mol, htpx(m, 1e5, 330)),
+        1.05,
+    ),
+    (
+        "compressor: outlet pressure",
+        SVCompressor,
+        (100, 1e5, 400),
+        lambda m: replaced(m.fs.unit.deltaP, m.fs.unit.outlet.pressure, 5e5),
+        1.1,
+    ),
+    (
+        "turbine: outlet pressure",
+        SVTurbine,
+        (100, 1e6, 700),
+        lambda m: replaced(m.fs.unit.work_mechanical, m.fs.unit.outlet.pressure, 2e5),
+        1.1,
+    ),
+    (
+        "valve: outlet pressure",
+        SVValve,
+        (100, 1e6, 700),
+        lambda m: replaced(m.fs.unit.valve_opening, m.fs.unit.outlet.pressure, 8e5),
+        1.05,
+    ),
+]
+
+solvers = {"ipopt": lambda: get_solver("ipopt"), "newton": lambda: NewtonSolver(tol=1e-6)}
+n_repeats = 5
+results = []
+for name, unit_class, inlet, replace, change in cases:
+    for solver_name, make_solver in solvers.items():
+        m, spec = setup(unit_class, inlet, replace)
+        opt = make_solver()
+        start_values = [(v, v.value) for v in m.component_data_objects(pyo.Var)]
+        base = spec.value
+        converged = 0
+        iterations = []
+        times = []
+        for _ in range(n_repeats):
+            for v, val in start_values:
+                v.set_value(val, skip_validation=True)
+            spec.fix(base * change)
+            start = time.perf_counter()
+            res, its = solve_with_iterations(opt, m)
+            times.append(time.perf_counter() - start)
+            converged += pyo.check_optimal_termination(res)
+            iterations.append(its)
+        results.append((name, solver_name, converged, iterations[0], times[0], sum(times[1:]) / (n_repeats - 1)))
+
+
+print(f"{'case':>30} {'solver':>8} {'solved':>8} {'iters':>6} {'first':>9} {'repeat':>9}")
+for name, solver_name, converged, its, first, repeat in results:
+    print(f"{name:>30} {solver_name:>8} {converged:>5}/{n_repeats} {str(its):>6} {first:>8.3f}s {repeat:>8.3f}s")
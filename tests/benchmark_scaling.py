@@ -0,0 +1,93 @@
+"""
+Compare solver iterations with and without scaling factors propagated from the state variables.
+
+Run with:
+    python -m tests.benchmark_scaling
+"""
+from model import *
+from model_initialisation import solve_with_iterations
+from scaling import propagate_scaling
+import pyomo.environ as pyo
+from pyomo.network import Arc
+from idaes.core import FlowsheetBlock
+from idaes.core.solvers import get_solver
+from idaes.core.util.exceptions import InitializationError
+from idaes.models.properties import iapws95
+from idaes.core.util.initialization import propagate_state
+from unit_models.compressor import SVCompressor
+from unit_models.heater import SVHeater
+from unit_models.turbine import SVTurbine
+
+
+def setup(inlet_pressure, outlet_pressure, outlet_temperature):
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.pp = iapws95.Iapws95ParameterBlock()
+    m.fs.compressor = SVCompressor(property_package=m.fs.pp)
+    m.fs.heater = SVHeater(property_package=m.fs.pp, has_pressure_change=True)
+    m.fs.turbine = SVTurbine(property_package=m.fs.pp)
+    m.fs.arc1 = Arc(source=m.fs.compressor.outlet, destination=m.fs.heater.inlet)
+    m.fs.arc2 = Arc(source=m.fs.heater.outlet, destination=m.fs.turbine.inlet)
+    pyo.TransformationFactory("network.expand_arcs").apply_to(m)
+    register_inlet_ports(m.fs)
+
+    m.fs.compressor.inlet.flow_mol.fix(100)
+    m.fs.compressor.inlet.enth_mol.fix(
+        m.fs.pp.htpx(p=inlet_pressure * pyo.units.Pa, T=420 * pyo.units.K)
+    )
+    m.fs.compressor.inlet.pressure.fix(inlet_pressure)
+    m.fs.compressor.deltaP.fix(outlet_pressure - inlet_pressure)  # guess
+    m.fs.heater.heat_duty.fix(1e6)  # guess
+
+    replace_state_var(m.fs.compressor.deltaP, m.fs.compressor.outlet.pressure)
+    m.fs.compressor.outlet.pressure.fix(outlet_pressure)
+    replace_state_var(m.fs.heater.heat_duty, m.fs.heater.outlet.enth_mol)
+    m.fs.heater.outlet.enth_mol.fix(
+        m.fs.pp.htpx(p=outlet_pressure * pyo.units.Pa, T=outlet_temperature * pyo.units.K)
+    )
+    m.fs.turbine.work_mechanical.fix(-1e5)
+    return m
+
+
+def initialise(m):
+    m.fs.compressor.initialize()
+    propagate_state(m.fs.arc1)
+    m.fs.heater.initialize()
+    propagate_state(m.fs.arc2)
+    m.fs.turbine.initialize()
+
+
+cases = [
+    (1e5, 5e5, 600),
+    (2e5, 2e6, 700),
+    (5e5, 1e7, 800),
+    (1e6, 3e7, 900),
+]
+
+results = []
+for use_scaling in (False, True):
+    for case in cases:
+        m = setup(*case)
+        if use_scaling:
+            propagate_scaling(m.fs)
+            opt = get_solver("ipopt", {"nlp_scaling_method": "user-scaling"})
+        else:
+            opt = get_solver("ipopt")
+        try:
+            initialise(m)
+        except InitializationError:
+            results.append((use_scaling, case, "InitializationError", None))
+            continue
+        res, iterations = solve_with_iterations(opt, m)
+        status = "Success" if pyo.check_optimal_termination(res) else "Solver Failed"
+        results.append((use_scaling, case, status, iterations))
+
+
+print(f"{'scaled':>8} {'case':>30} {'status':>20} {'iterations':>10}")
+for use_scaling, case, status, iterations in results:
+    print(f"{str(use_scaling):>8} {str(case):>30} {status:>20} {str(iterations):>10}")
+
+for use_scaling in (False, True):
+    its = [i for s, _, status, i in results if s is use_scaling and i is not None]
+    ok = sum(1 for s, _, status, _ in results if s is use_scaling and status == "Success")
+    print(f"scaled={use_scaling}: {ok}/{len(cases)} converged, {sum(its)} total iterations")
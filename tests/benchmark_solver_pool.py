@@ -0,0 +1,69 @@
+"""
+Compare solving the units of a flowsheet one at a time with a plain IPOPT solver, and with a SolverPool
+solving them from several threads at once, over a few rounds with changing outlet targets
+(as when a flowsheet is re-initialised after its specification changes).
+
+Run with:
+    python -m tests.benchmark_solver_pool
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from model import *
+import pyomo.environ as pyo
+from idaes.core import FlowsheetBlock
+from idaes.core.solvers import get_solver
+from idaes.models.properties import iapws95
+from solver_pool import SolverPool
+from unit_models.heater import SVHeater
+
+
+def setup(n_units):
+    """
+    n_units heaters on separate streams, each with its outlet enthalpy replacing its heat duty.
+    """
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.pp = iapws95.Iapws95ParameterBlock()
+    units = []
+    for i in range(n_units):
+        heater = SVHeater(property_package=m.fs.pp)
+        m.fs.add_component(f"heater{i}", heater)
+        units.append(heater)
+    register_inlet_ports(m.fs)
+    for heater in units:
+        heater.inlet.flow_mol.fix(100)
+        heater.inlet.pressure.fix(1e5)
+        heater.inlet.enth_mol.fix(m.fs.pp.htpx(p=1e5 * pyo.units.Pa, T=300 * pyo.units.K))
+        replace_state_var(heater.heat_duty, heater.outlet.enth_mol)
+    return m, units
+
+
+def set_targets(m, units, temperature):
+    for heater in units:
+        heater.outlet.enth_mol.fix(m.fs.pp.htpx(p=1e5 * pyo.units.Pa, T=temperature * pyo.units.K))
+
+
+def run(n_units, solve_all):
+    m, units = setup(n_units)
+    start = time.perf_counter()
+    ok = True
+    for temperature in (320, 330, 340, 350):
+        set_targets(m, units, temperature)
+        ok &= all(pyo.check_optimal_termination(res) for res in solve_all(units))
+    return ok, time.perf_counter() - start
+
+
+results = []
+opt = get_solver("ipopt")
+for n_units in (4, 16):
+    ok, seconds = run(n_units, lambda units: [opt.solve(u) for u in units])
+    results.append((n_units, "plain", ok, seconds))
+    for n_workers in (1, 4):
+        with SolverPool("ipopt", n_workers=n_workers) as pool, ThreadPoolExecutor(n_workers) as threads:
+            pooled = pool.solver()
+            ok, seconds = run(n_units, lambda units: list(threads.map(pooled.solve, units)))
+        results.append((n_units, f"pool x{n_workers}", ok, seconds))
+
+print(f"{'units':>6} {'mode':>10} {'solved':>7} {'time':>9}")
+for n_units, mode, ok, seconds in results:
+    print(f"{n_units:>6} {mode:>10} {str(ok):>7} {seconds:>8.3f}s")
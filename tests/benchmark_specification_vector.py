@@ -0,0 +1,46 @@
+"""
+Compare setting the specification of a flowsheet with SpecificationVector.set_values()
+against a plain loop of var.fix(value), as in a parameter sweep.
+
+Run with:
+    python -m tests.benchmark_specification_vector
+"""
+import time
+import numpy as np
+from model import *
+import pyomo.environ as pyo
+from idaes.core import FlowsheetBlock
+from specification_vector import SpecificationVector
+from .toy_models import ToySplitter
+
+
+def setup(n_components):
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.sep = ToySplitter(n_components=n_components)
+    register_inlet_ports(m.fs)
+    return m
+
+
+def timed(set_all, values, repeats):
+    start = time.perf_counter()
+    for i in range(repeats):
+        set_all(values * (1 + i / repeats))
+    return (time.perf_counter() - start) / repeats
+
+
+def fix_loop(variables):
+    def set_all(values):
+        for v, val in zip(variables, values):
+            v.fix(val)
+    return set_all
+
+
+print(f"{'variables':>10} {'var.fix loop':>14} {'set_values':>12} {'speedup':>8}")
+for n_components in (10, 100, 1000):
+    spec = SpecificationVector(setup(n_components).fs)
+    values = spec.get_values()
+    repeats = max(10, 20000 // len(spec))
+    loop = timed(fix_loop(spec.variables), values, repeats)
+    vector = timed(lambda x: spec.set_values(x, fix=True), values, repeats)
+    print(f"{len(spec):>10} {loop * 1e6:>12.1f}us {vector * 1e6:>10.1f}us {loop / vector:>7.1f}x")
@@ -0,0 +1,81 @@
+"""
+Compare solver iterations when starting from the default initial values,
+and when starting from a surrogate fitted to previous solves.
+
+Run with:
+    python -m tests.benchmark_surrogates
+"""
+import numpy as np
+from model import *
+from model_initialisation import solve_with_iterations
+from surrogates import SampleLog, seed_from_surrogate
+import pyomo.environ as pyo
+from idaes.core import FlowsheetBlock
+from idaes.core.solvers import get_solver
+from idaes.models.properties import iapws95
+from unit_models.heater import SVHeater
+from unit_models.compressor import SVCompressor
+from unit_models.turbine import SVTurbine
+
+
+def setup(unit_class, inlet_pressure, inlet_temperature, state_vars, **kwargs):
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.pp = iapws95.Iapws95ParameterBlock()
+    m.fs.unit = unit_class(property_package=m.fs.pp, **kwargs)
+    register_inlet_ports(m.fs)
+    m.fs.unit.inlet.flow_mol.fix(100)
+    m.fs.unit.inlet.enth_mol.fix(
+        m.fs.pp.htpx(p=inlet_pressure * pyo.units.Pa, T=inlet_temperature * pyo.units.K)
+    )
+    m.fs.unit.inlet.pressure.fix(inlet_pressure)
+    for name, val in state_vars.items():
+        m.fs.unit.find_component(name).fix(val)
+    return m
+
+
+# unit class, build kwargs, (inlet pressure, inlet temperature), sampled state vars
+units = [
+    (SVHeater, {}, (1e5, 300, 400), {"heat_duty": (1e5, 5e6)}),
+    (SVCompressor, {}, (1e5, 400, 500), {"deltaP": (1e5, 1e6), "efficiency_isentropic": (0.7, 0.9)}),
+    (SVTurbine, {}, (1e6, 500, 700), {"work_mechanical": (-3e5, -5e4), "efficiency_isentropic": (0.7, 0.9)}),
+]
+
+rng = np.random.default_rng(42)
+opt = get_solver("ipopt")
+n_train = 20
+n_test = 10
+
+for unit_class, kwargs, (pressure, t_low, t_high), ranges in units:
+
+    def sample():
+        state_vars = {name: rng.uniform(low, high) for name, (low, high) in ranges.items()}
+        return rng.uniform(t_low, t_high), state_vars
+
+    samples = SampleLog()
+    for _ in range(n_train):
+        temperature, state_vars = sample()
+        m = setup(unit_class, pressure, temperature, state_vars, **kwargs)
+        m.fs.unit.initialize()
+        res = opt.solve(m)
+        samples.record(m.fs.unit, res)
+    surrogate = samples.fit()
+
+    default_iterations = []
+    surrogate_iterations = []
+    for _ in range(n_test):
+        temperature, state_vars = sample()
+        m = setup(unit_class, pressure, temperature, state_vars, **kwargs)
+        _, iterations = solve_with_iterations(opt, m)
+        default_iterations.append(iterations)
+
+        m = setup(unit_class, pressure, temperature, state_vars, **kwargs)
+        seed_from_surrogate(m.fs.unit, surrogate)
+        _, iterations = solve_with_iterations(opt, m)
+        surrogate_iterations.append(iterations)
+
+    print(
+        f"{unit_class.__name__}: {len(samples)} training samples, "
+        f"default start {default_iterations} iterations, "
+        f"surrogate start {surrogate_iterations} iterations"
+    )
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from model import *
+from async_solve import SubprocessExecutor, staged_initialise_async
+from newton import NewtonSolver
+import pyomo.environ as pyo
+import pytest
+from idaes.core import FlowsheetBlock
+from .toy_models import ToyHeater
+
+
+def setup():
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.h1 = ToyHeater()
+    register_inlet_ports(m.fs)
+    m.fs.h1.h_in.fix(10)
+    m.fs.h1.duty.fix(5)
+    return m
+
+
+def calculate_outlet(blk):
+    blk.h_out.set_value(pyo.value(blk.h_in + blk.duty))
+    blk.t_out.set_value(2 * blk.h_out.value)
+    blk.duty.unfix()
+    return "done"
+
+
+def sleep(blk):
+    time.sleep(30)
+
+
+def fail(blk):
+    raise ValueError("job failed")
+
+
+def test_result_is_applied():
+    m = setup()
+    result = asyncio.run(SubprocessExecutor(2).run(m.fs.h1, calculate_outlet))
+    assert result == "done"
+    assert m.fs.h1.h_out.value == 15
+    assert m.fs.h1.t_out.value == 30
+    assert not m.fs.h1.duty.fixed
+
+
+def test_many_jobs():
+    models = [setup() for _ in range(4)]
+    executor = SubprocessExecutor(2)
+
+    async def run_all():
+        return await asyncio.gather(*(executor.run(m.fs.h1, calculate_outlet) for m in models))
+
+    assert asyncio.run(run_all()) == ["done"] * 4
+    assert all(m.fs.h1.h_out.value == 15 for m in models)
+
+
+def test_executor_shared_between_event_loops():
+    # e.g the default executor, used from successive asyncio.run calls
+    executor = SubprocessExecutor(1)
+    for _ in range(2):
+        models = [setup() for _ in range(2)]
+
+        async def run_all():
+            return await asyncio.gather(*(executor.run(m.fs.h1, calculate_outlet, timeout=60) for m in models))
+
+        assert asyncio.run(run_all()) == ["done"] * 2
+
+
+def test_timeout():
+    m = setup()
+    start = time.time()
+    with pytest.raises(TimeoutError):
+        asyncio.run(SubprocessExecutor(1).run(m.fs.h1, sleep, timeout=2))
+    assert time.time() - start < 20
+    assert m.fs.h1.h_out.value == 20
+
+
+def test_cancel():
+    m = setup()
+
+    async def run_and_cancel():
+        task = asyncio.ensure_future(SubprocessExecutor(1).run(m.fs.h1, sleep))
+        await asyncio.sleep(1)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(run_and_cancel())
+    assert m.fs.h1.h_out.value == 20
+
+
+def test_error_is_raised():
+    m = setup()
+    with pytest.raises(ValueError, match="job failed"):
+        asyncio.run(SubprocessExecutor(1).run(m.fs.h1, fail))
+
+
+def test_staged_initialise_with_replacement():
+    m = setup()
+    h1 = m.fs.h1
+    replace_state_var(h1.duty, h1.h_out)
+    h1.h_out.fix(30)
+    for blk in (h1, m.fs):
+        h1.duty.set_value(5)
+        asyncio.run(staged_initialise_async(blk, solver=NewtonSolver(), executor=SubprocessExecutor(1)))
+        assert h1.duty.value == pytest.approx(20)
+        assert h1.t_out.value == pytest.approx(60)
+        # The specification is unchanged
+        assert h1.h_out.fixed and h1.h_in.fixed
+        assert not h1.duty.fixed
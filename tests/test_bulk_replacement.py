@@ -0,0 +1,46 @@
+from model import *
+import pyomo.environ as pyo
+import pytest
+from idaes.core import FlowsheetBlock
+from .toy_models import ToySplitter
+
+
+def setup(n_components=200):
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.sep = ToySplitter(n_components=n_components)
+    register_inlet_ports(m.fs)
+    return m
+
+
+def test_register_slice():
+    m = setup()
+    # one state var per split fraction of the first outlet, plus the inlet flows
+    assert len(list_state_vars(m.fs)) == 200 + 1
+    assert all(v.fixed for v in m.fs.sep.split_fraction["outlet_1", :])
+
+
+def test_replace_slices():
+    m = setup()
+    sep = m.fs.sep
+    replace_state_var(sep.split_fraction["outlet_1", :], sep.flow_out["outlet_1", :])
+
+    assert len(list_replacements(m.fs)) == 200
+    assert list_replacements(m.fs)[5] == (sep.split_fraction["outlet_1", 5], sep.flow_out["outlet_1", 5])
+    assert all(v.fixed for v in sep.flow_out["outlet_1", :])
+    assert not any(v.fixed for v in sep.split_fraction["outlet_1", :])
+    assert len(list_guesses(m.fs)) == 200
+
+
+def test_replace_slices_invalid():
+    m = setup(n_components=3)
+    sep = m.fs.sep
+    # Different number of variables
+    with pytest.raises(ValueError):
+        replace_state_vars(sep.split_fraction["outlet_1", :], sep.flow_out[:, :])
+    # The inlet flows are fixed, so they can't be replacements
+    with pytest.raises(ValueError):
+        replace_state_vars(sep.split_fraction["outlet_1", :], sep.flow_in[:])
+    # Nothing should have changed
+    assert len(list_replacements(m.fs)) == 0
+    assert all(v.fixed for v in sep.split_fraction["outlet_1", :])
@@ -0,0 +1,65 @@
+from model import *
+from decomposition import solve_decomposed, partition_flowsheet
+from newton import NewtonSolver
+import pyomo.environ as pyo
+import pytest
+from .toy_models import build_chain, build_recycle
+
+
+def setup_chain():
+    m, units = build_chain(4)
+    units[0].flow_in.fix(2)
+    units[0].h_in.fix(10)
+    for unit in units:
+        unit.duty.fix(10)
+    replace_state_var(units[3].duty, units[3].h_out)
+    units[3].h_out.fix(60)
+    return m, units
+
+
+def test_partition_flowsheet():
+    m, units = setup_chain()
+    partitions = partition_flowsheet(m.fs, 2)
+    assert [[u.name for u in p] for p in partitions] == [["fs.unit0", "fs.unit1"], ["fs.unit2", "fs.unit3"]]
+
+
+def test_jacobi():
+    m, units = setup_chain()
+    report = solve_decomposed(m.fs, n_partitions=2, solver=NewtonSolver(), max_workers=2)
+    assert report.converged
+    assert report.coupling == ["fs.arc1"]
+    # The first round uses the initial guess for the coupling arc, and the second the values from the first
+    assert len(report.rounds) == 2
+    assert units[2].h_in.value == pytest.approx(30)
+    assert units[3].duty.value == pytest.approx(20)
+    # The model definition is unchanged
+    assert not units[2].h_in.fixed
+    assert units[3].h_out.fixed
+
+
+def test_gauss_seidel_recycle():
+    m = build_recycle()
+    m.fs.mixer.flow_1.fix(1)
+    m.fs.mixer.h_1.fix(10)
+    m.fs.heater.duty.fix(5)
+    m.fs.purge.fraction.fix(0.5)
+    report = solve_decomposed(
+        m.fs,
+        partitions=[[m.fs.mixer], [m.fs.heater, m.fs.purge]],
+        solver=NewtonSolver(),
+        method="gauss-seidel",
+        acceleration="wegstein",
+        tol=1e-5,
+    )
+    assert report.converged
+    assert m.fs.heater.flow_in.value == pytest.approx(2, rel=1e-4)
+    assert m.fs.mixer.h_2.value == pytest.approx(20, rel=1e-4)
+
+
+def test_values_left_when_not_converged():
+    m, units = setup_chain()
+    with pytest.raises(RuntimeError):
+        solve_decomposed(m.fs, n_partitions=2, solver=NewtonSolver(), max_iter=1)
+    # The first partition doesn't depend on the coupling arc, so its values from the one round are right
+    assert units[1].h_out.value == pytest.approx(30)
+    assert not units[2].h_in.fixed
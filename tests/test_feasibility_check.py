@@ -0,0 +1,54 @@
+from model import *
+import pytest
+from .toy_models import build_chain
+
+
+def setup():
+    """
+    A heater that can only heat, with its inlet fixed.
+    """
+    m, (unit,) = build_chain(1)
+    unit.flow_in.fix(1)
+    unit.h_in.fix(10)
+    unit.duty.setlb(0)
+    unit.duty.fix(10)
+    return m, unit
+
+
+def test_infeasible_replacement():
+    m, h = setup()
+    with pytest.raises(ValueError, match="infeasible"):
+        replace_state_var(h.duty, h.h_out, value=5, feasibility_check="raise")
+    # The replacement is undone
+    assert h.duty.fixed
+    assert not h.h_out.fixed
+    assert h.h_out.value == 20
+    assert h.duty.lb == 0 and h.duty.ub is None
+    # And it can still be made with a feasible value
+    replace_state_var(h.duty, h.h_out, value=50, feasibility_check="raise")
+    assert h.h_out.fixed and h.h_out.value == 50
+
+
+def test_warn():
+    m, h = setup()
+    with pytest.warns(UserWarning, match="infeasible"):
+        replace_state_var(h.duty, h.h_out, value=5, feasibility_check="warn")
+    assert h.h_out.fixed
+    assert not h.duty.fixed
+
+
+def test_tighten_bounds():
+    m, h = setup()
+    replace_state_var(h.duty, h.h_out, value=50, feasibility_check="raise", tighten_bounds=True)
+    assert h.duty.lb == pytest.approx(40) and h.duty.ub == pytest.approx(40)
+    assert h.t_out.lb == pytest.approx(100)
+
+
+def test_propagate_bounds():
+    m, h = setup()
+    h.duty.unfix()
+    h.h_out.fix(50)
+    tightened = propagate_bounds(h)
+    assert tightened[h.duty][0] == pytest.approx(40)
+    # The bounds are only kept if asked for
+    assert h.duty.lb == 0
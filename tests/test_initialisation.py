@@ -0,0 +1,346 @@
+from model import *
+from model_initialisation import (
+    fix_state_vars,
+    fix_replaced_state_vars,
+    unfix_everything,
+    staged_initialise,
+    initialise_with_fallbacks,
+    InitialisationBudget,
+    InitialisationReport,
+    infer_state_var_guesses,
+    constraint_residuals,
+    is_converged,
+    StagedInitialisationMixin,
+    state_block_solver,
+)
+import numpy as np
+import pyomo.environ as pyo
+import pytest
+from pyomo.opt import SolverResults, SolverStatus, TerminationCondition
+from idaes.core import FlowsheetBlock, declare_process_block_class
+from .toy_models import ToyHeater, ToyHeaterData, build_chain
+
+
+def setup():
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.h1 = ToyHeater()
+    register_inlet_ports(m.fs)
+    return m
+
+
+def test_fix_replaced_state_vars():
+    m = setup()
+    h1 = m.fs.h1
+    replace_state_var(h1.duty, h1.h_out)
+    unfix_everything(h1)
+
+    fix_state_vars(h1)
+    assert h1.duty.fixed
+    fix_replaced_state_vars(h1)
+    assert h1.h_out.fixed
+    assert not h1.duty.fixed
+
+
+def test_replacement_in_other_unit_is_not_fixed():
+    m, units = build_chain(2)
+    replace_state_var(units[0].duty, units[1].h_out)
+    unfix_everything(units[0])
+
+    fix_state_vars(units[0])
+    fix_replaced_state_vars(units[0])
+    # The replacing variable isn't part of unit0, so the guess stays fixed while unit0 is initialised on its own.
+    assert units[0].duty.fixed
+
+
+def test_report():
+    report = InitialisationReport("fs.h1")
+    report.add("state blocks", 0.5)
+    report.add("state vars", 1.0, 12, "optimal")
+    report.add("replacements", 0.25, 5, "optimal")
+    assert report.total_time == 1.75
+    assert report.total_iterations == 17
+    assert "replacements" in str(report)
+
+
+class ToyHeaterSolver:
+    """
+    Solves a ToyHeater directly. Fails (without changing anything) while the options don't include
+    those in needs_options, and reports `iterations` iterations in the log like IPOPT does.
+    """
+
+    def __init__(self, needs_options=None, iterations=10):
+        self.options = {}
+        self.needs_options = needs_options or {}
+        self.iterations = iterations
+        self.solves = []
+
+    def solve(self, blk, tee=False, logfile=None):
+        self.solves.append(dict(self.options))
+        ok = all(self.options.get(k) == v for k, v in self.needs_options.items())
+        if ok:
+            blk.flow_out.set_value(blk.flow_in.value)
+            if blk.duty.fixed:
+                blk.h_out.set_value(blk.h_in.value + blk.duty.value)
+            else:
+                blk.duty.set_value(blk.h_out.value - blk.h_in.value)
+            blk.t_out.set_value(2 * blk.h_out.value)
+        if logfile is not None:
+            with open(logfile, "w") as f:
+                f.write(f"Number of Iterations....: {self.iterations}\n")
+        res = SolverResults()
+        res.solver.status = SolverStatus.ok if ok else SolverStatus.warning
+        res.solver.termination_condition = (
+            TerminationCondition.optimal if ok else TerminationCondition.maxIterations
+        )
+        return res
+
+
+def setup_replaced():
+    m = setup()
+    h1 = m.fs.h1
+    h1.flow_in.fix(1)
+    h1.h_in.fix(10)
+    replace_state_var(h1.duty, h1.h_out)
+    h1.h_out.fix(30)
+    unfix_everything(h1)
+    h1.flow_in.fix()
+    h1.h_in.fix()
+    return m
+
+
+def test_staged_initialise_reaches_targets():
+    m = setup_replaced()
+    h1 = m.fs.h1
+    report = staged_initialise(h1, ToyHeaterSolver())
+    assert h1.h_out.value == 30
+    assert h1.duty.value == 20
+    assert [stage for stage, _, _, _ in report.stages] == ["state vars", "replacements"]
+    assert report.total_iterations == 20
+
+
+def test_continuation():
+    m = setup_replaced()
+    h1 = m.fs.h1
+    report = staged_initialise(h1, ToyHeaterSolver(), continuation_steps=2)
+    assert [stage for stage, _, _, _ in report.stages] == [
+        "state vars",
+        "continuation 1",
+        "continuation 2",
+        "replacements",
+    ]
+    assert h1.h_out.value == 30
+
+
+def test_fallback_ladder():
+    m = setup_replaced()
+    h1 = m.fs.h1
+    opt = ToyHeaterSolver(needs_options={"tol": 1e-4})
+    report = initialise_with_fallbacks(h1, opt)
+    assert report.outcome == "relaxed tolerance"
+    assert report.stages[0][0] == "staged: state vars"
+    assert h1.h_out.value == 30
+    # the relaxed options are removed afterwards
+    assert opt.options == {}
+
+
+def test_budget_exhausted_skips():
+    m = setup_replaced()
+    h1 = m.fs.h1
+    budget = InitialisationBudget(iterations=15)
+    report = initialise_with_fallbacks(h1, ToyHeaterSolver(needs_options={"never": True}), budget=budget)
+    assert report.outcome == "skipped"
+    assert budget.exhausted
+    # the block is left as it was
+    assert not h1.h_out.fixed
+    assert not h1.duty.fixed
+    assert h1.h_out.value == 30
+
+
+def test_budget_limits_solver():
+    parent = InitialisationBudget(wall_time=100, iterations=50)
+    budget = parent.child(iterations=30, max_stage_iterations=20)
+    assert budget.solver_options()["max_iter"] == 20
+    budget.charge(10, 25)
+    assert budget.solver_options()["max_iter"] == 5
+    assert parent.remaining_iterations == 25
+    assert budget.remaining_time == 90
+    budget.charge(1, 5)
+    assert budget.exhausted
+    assert not parent.exhausted
+
+
+def test_infer_state_var_guesses():
+    m = setup()
+    h1 = m.fs.h1
+    h1.flow_in.fix(1)
+    h1.h_in.fix(10)
+    # The outlet temperature is two equations away from the heat duty
+    replace_state_var(h1.duty, h1.t_out)
+    h1.t_out.fix(100)
+    h1.duty.set_value(10)
+    assert infer_state_var_guesses(h1) == [h1.duty]
+    assert h1.duty.value == pytest.approx(40)
+    assert h1.h_out.value == pytest.approx(50)
+
+
+def test_staged_initialise_infers_guesses():
+    class RecordingSolver(ToyHeaterSolver):
+        def solve(self, blk, tee=False, logfile=None):
+            self.guesses.append(blk.duty.value)
+            return super().solve(blk, tee, logfile)
+
+    for infer_guesses, first_guess in ((True, 20), (False, 5)):
+        m = setup_replaced()
+        h1 = m.fs.h1
+        h1.duty.set_value(5)
+        opt = RecordingSolver()
+        opt.guesses = []
+        staged_initialise(h1, opt, infer_guesses=infer_guesses)
+        # With inference, the state var solve already starts from the duty that gives the target
+        assert opt.guesses[0] == pytest.approx(first_guess)
+        assert h1.h_out.value == 30
+
+
+def test_skip_converged():
+    m = setup_replaced()
+    h1 = m.fs.h1
+    h1.duty.set_value(20)
+    h1.t_out.set_value(60)
+    opt = ToyHeaterSolver()
+    report = staged_initialise(h1, opt, skip_tol=1e-8)
+    assert report.stages == [("unit", 0.0, None, "skipped")]
+    assert opt.solves == []
+    assert constraint_residuals(h1).max() == 0
+
+
+def test_skip_stages():
+    # Only the duty is stale, and inferring it from the target solves the unit
+    m = setup_replaced()
+    h1 = m.fs.h1
+    h1.t_out.set_value(60)
+    opt = ToyHeaterSolver()
+    report = staged_initialise(h1, opt, skip_tol=1e-8)
+    assert [(stage, condition) for stage, _, _, condition in report.stages] == [
+        ("state vars", "skipped"),
+        ("replacements", "skipped"),
+    ]
+    assert opt.solves == []
+    assert h1.duty.value == 20
+
+    # The state var solve is needed, but then already meets the target
+    m = setup_replaced()
+    h1 = m.fs.h1
+    opt = ToyHeaterSolver()
+    report = staged_initialise(h1, opt, skip_tol=1e-8)
+    assert [stage for stage, _, _, _ in report.stages] == ["state vars", "replacements"]
+    assert report.stages[1][3] == "skipped"
+    assert len(opt.solves) == 1
+    assert not is_converged(h1, 1e-8, [(h1.h_out, 31)])
+
+
+@declare_process_block_class("ToyMixinHeater")
+class ToyMixinHeaterData(StagedInitialisationMixin, ToyHeaterData):
+    """
+    A ToyHeater using the shared initialisation, whose "state block" initialisation overwrites the outlet,
+    as initialising an outlet state block does.
+    """
+
+    def initialise_state_blocks(self, state_args, outlvl, solver, optarg, **kwargs):
+        self.state_block_solver = solver
+        self.h_out.set_value(0)
+        return []
+
+
+class DutyRecordingSolver(ToyHeaterSolver):
+    """
+    A ToyHeaterSolver that records the value of the duty each solve starts from.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.duties = []
+
+    def solve(self, blk, tee=False, logfile=None):
+        self.duties.append(blk.duty.value)
+        return super().solve(blk, tee, logfile)
+
+
+def test_targets_are_read_before_state_blocks():
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.h1 = ToyMixinHeater()
+    register_inlet_ports(m.fs)
+    h1 = m.fs.h1
+    h1.flow_in.fix(1)
+    h1.h_in.fix(10)
+    replace_state_var(h1.duty, h1.h_out)
+    h1.h_out.fix(30)
+    opt = DutyRecordingSolver()
+    h1.initialize_build(solver=opt)
+    # The duty guess for the first solve is inferred from the target, not from the overwritten outlet
+    assert opt.duties[0] == 20
+    assert h1.duty.value == 20
+    assert h1.h_out.value == 30 and h1.h_out.fixed
+    # A solver object (e.g from a SolverPool) is passed on for the state blocks too
+    assert h1.state_block_solver is opt
+    # but IDAES state blocks only take a name, so they get the default solver
+    assert state_block_solver(opt) is None
+    assert state_block_solver("ipopt") == "ipopt"
+
+
+@declare_process_block_class("ToyRelaxedHeater")
+class ToyRelaxedHeaterData(ToyHeaterData):
+    """
+    A ToyHeater that drops its temperature equation for a relaxed first solve.
+    """
+
+    def relax_for_initialisation(self, **kwargs):
+        self.temperature.deactivate()
+        return True
+
+    def restore_after_relaxation(self, relaxation):
+        self.temperature.activate()
+
+
+class FailingSolver(ToyHeaterSolver):
+    def solve(self, blk, tee=False, logfile=None):
+        raise RuntimeError("solver crashed")
+
+
+def test_relaxation_restored_after_failure():
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.h1 = ToyRelaxedHeater()
+    register_inlet_ports(m.fs)
+    h1 = m.fs.h1
+    with pytest.raises(RuntimeError, match="solver crashed"):
+        staged_initialise(h1, FailingSolver())
+    assert h1.temperature.active
+
+    # Or the budget runs out before the relaxed solve, and the ladder skips the unit
+    report = initialise_with_fallbacks(h1, ToyHeaterSolver(), ("staged", "skip"), InitialisationBudget(iterations=0))
+    assert report.outcome == "skipped"
+    assert h1.temperature.active
+
+
+def test_unevaluated_constraints_are_not_converged():
+    m = pyo.ConcreteModel()
+    m.x = pyo.Var()
+    m.y = pyo.Var(initialize=5)
+    m.c = pyo.Constraint(expr=m.x + m.y == 5)
+    m.d = pyo.Constraint(expr=pyo.log(m.y) == 0)
+    residuals = constraint_residuals(m)
+    assert np.isnan(residuals[0])
+    assert not is_converged(m, 1e-8)
+
+    m.x.set_value(0)
+    m.y.set_value(-1)
+    assert np.isnan(constraint_residuals(m)[1])
+    assert not is_converged(m, 1e-8)
+
+    # and skip_tol doesn't skip a unit that has never been evaluated
+    m = setup_replaced()
+    m.fs.h1.t_out.set_value(None)
+    report = staged_initialise(m.fs.h1, ToyHeaterSolver(), skip_tol=1e-8)
+    assert report.stages[0][0] != "unit"
@@ -0,0 +1,47 @@
+from model import *
+from model import _unmatched_constraints_in_scope
+import pyomo.environ as pyo
+import pytest
+from .toy_models import build_chain
+
+
+def setup(n_units=30):
+    m, units = build_chain(n_units)
+    units[0].flow_in.fix(1)
+    units[0].h_in.fix(10)
+    for unit in units:
+        unit.duty.fix(10)
+    return m, units
+
+
+def test_replacement_in_one_unit():
+    m, units = setup()
+    replace_state_var(units[15].duty, units[15].h_out)
+    assert units[15].h_out.fixed
+    assert not units[15].duty.fixed
+
+
+def test_scope_is_not_widened_for_local_replacement():
+    m, units = setup()
+    units[15].duty.unfix()
+    units[15].t_out.fix()
+    assert _unmatched_constraints_in_scope(m.fs, [units[15].duty, units[15].t_out]) == []
+    units[15].t_out.unfix()
+    units[15].duty.fix()
+
+
+def test_replacement_in_neighbouring_unit():
+    # Fixing the outlet of unit16 determines its inlet, and so the duty of unit15.
+    m, units = setup()
+    replace_state_var(units[15].duty, units[16].h_out)
+    assert units[16].h_out.fixed
+    assert not units[15].duty.fixed
+
+
+def test_singular_replacement_is_detected():
+    # The flow is already determined by the inlet of unit0, so it can't be fixed in unit15.
+    m, units = setup()
+    with pytest.raises(ValueError):
+        replace_state_var(units[15].duty, units[15].flow_out)
+    assert units[15].duty.fixed
+    assert not units[15].flow_out.fixed
@@ -0,0 +1,30 @@
+import pytest
+from .benchmark_memory import measure
+
+# Upper limits, about twice what was measured when these were set.
+# If a change pushes a measurement over its limit, check whether the extra memory is really needed
+# before raising the limit.
+thresholds = {
+    "registration": 1500,  # bytes per unit
+    "replacement_peak": 100_000,  # bytes
+    "replacement_retained": 8000,  # bytes per replacement
+    "snapshot": 15_000,  # bytes per unit
+}
+
+sizes = [10, 40, 160]
+
+
+@pytest.fixture(scope="module")
+def measurements():
+    return {n_units: measure(n_units) for n_units in sizes}
+
+
+@pytest.mark.parametrize("name", list(thresholds))
+def test_memory_thresholds(measurements, name):
+    for n_units, result in measurements.items():
+        assert result[name] <= thresholds[name], f"{name} with {n_units} units: {result[name]:.0f} B"
+
+
+def test_replacement_memory_does_not_grow_with_flowsheet(measurements):
+    # The structural check only looks at the units around the replacement.
+    assert measurements[sizes[-1]]["replacement_peak"] <= 2 * measurements[sizes[0]]["replacement_peak"]
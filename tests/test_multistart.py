@@ -0,0 +1,101 @@
+import time
+from model import *
+from multistart import multistart_initialise, sample_guesses, guess_vars
+import pyomo.environ as pyo
+import pytest
+from idaes.core import FlowsheetBlock, declare_process_block_class
+from idaes.core.util.exceptions import InitializationError
+from newton import NewtonSolver
+from warm_start import WarmStartStore
+from .toy_models import ToyHeater, ToyHeaterData
+
+
+@declare_process_block_class("RacingHeater")
+class RacingHeaterData(ToyHeaterData):
+    """
+    A ToyHeater whose initialisation only works if the duty guess is close to the answer,
+    and takes as many seconds as the guess is above it.
+    """
+
+    def initialize(self):
+        error = self.duty.value - (self.h_out.value - self.h_in.value)
+        if abs(error) > 5:
+            raise InitializationError(f"Guess {self.duty.value} is too far away.")
+        time.sleep(max(error, 0))
+        self.duty.set_value(self.h_out.value - self.h_in.value)
+        self.t_out.set_value(2 * self.h_out.value)
+
+
+def setup():
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.h1 = RacingHeater()
+    register_inlet_ports(m.fs)
+    m.fs.h1.h_in.fix(10)
+    replace_state_var(m.fs.h1.duty, m.fs.h1.h_out)
+    m.fs.h1.h_out.fix(30)
+    return m
+
+
+def test_first_success_wins():
+    m = setup()
+    # 100 fails, 24 succeeds after 4 s, 20 succeeds straight away
+    guesses = [{"duty": 100}, {"duty": 24}, {"duty": 20}]
+    winner = multistart_initialise(m.fs.h1, guesses, max_workers=3, initialize_kwargs={})
+    assert winner == 2
+    assert m.fs.h1.duty.value == 20
+    assert m.fs.h1.t_out.value == 60
+
+
+def test_all_fail():
+    m = setup()
+    with pytest.raises(InitializationError):
+        multistart_initialise(m.fs.h1, [{"duty": 100}, {"duty": -100}], max_workers=2, initialize_kwargs={})
+    assert m.fs.h1.t_out.value == 40
+
+
+def test_sample_guesses():
+    m = setup()
+    m.fs.h1.duty.setlb(0)
+    m.fs.h1.duty.setub(50)
+    guesses = sample_guesses(m.fs.h1, 20, seed=1)
+    assert len(guesses) == 20
+    assert [v.name for v in guess_vars(m.fs.h1)] == ["fs.h1.duty"]
+    assert all(0 <= g["duty"] <= 50 for g in guesses)
+
+
+def setup_toy():
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.h1 = ToyHeater()
+    register_inlet_ports(m.fs)
+    h1 = m.fs.h1
+    h1.flow_in.fix(1)
+    h1.h_in.fix(10)
+    replace_state_var(h1.duty, h1.h_out)
+    h1.h_out.fix(30)
+    return m
+
+
+def test_guesses_leave_specification_alone():
+    m = setup_toy()
+    h1 = m.fs.h1
+    # e.g a stored point from a unit with different inlet conditions and target
+    guesses = [{"duty": 15, "h_in": 0, "h_out": 100, "t_out": 50}]
+    winner = multistart_initialise(h1, guesses, max_workers=1, solver=NewtonSolver())
+    assert winner == 0
+    assert h1.h_in.value == 10 and h1.h_in.fixed
+    assert h1.h_out.value == 30 and h1.h_out.fixed
+    assert h1.duty.value == pytest.approx(20)
+    assert not h1.duty.fixed
+
+
+def test_nearest_points_leave_out_specification():
+    m = setup_toy()
+    h1 = m.fs.h1
+    h1.duty.set_value(20)
+    h1.t_out.set_value(60)
+    store = WarmStartStore()
+    store.record(h1)
+    points = store.nearest_points(h1, 1)
+    assert points == [{"duty": 20, "flow_out": 1, "t_out": 60}]
@@ -0,0 +1,112 @@
+from model import *
+from newton import NewtonSolver
+from model_initialisation import staged_initialise, unfix_everything
+import pyomo.environ as pyo
+import pytest
+from idaes.core import FlowsheetBlock
+from .toy_models import ToyHeater, ToySplitter, build_chain
+
+
+def setup_chain():
+    m, units = build_chain(3)
+    units[0].flow_in.fix(1)
+    units[0].h_in.fix(10)
+    for unit in units:
+        unit.duty.fix(10)
+    replace_state_var(units[2].duty, units[2].h_out)
+    units[2].h_out.fix(50)
+    return m, units
+
+
+def setup_splitter():
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.sep = ToySplitter(n_components=2)
+    register_inlet_ports(m.fs)
+    sep = m.fs.sep
+    sep.flow_in.fix(4)
+    for j in sep.components:
+        sep.split_fraction["outlet_1", j].fix(0.5)
+    replace_state_var(sep.split_fraction["outlet_1", 0], sep.flow_out["outlet_1", 0])
+    sep.flow_out["outlet_1", 0].fix(1)
+    # With the inlet flow unknown as well, the split equations are bilinear in the unknowns
+    sep.flow_in[0].unfix()
+    sep.flow_out["outlet_2", 0].fix(3)
+    sep.flow_in[0].set_value(1)
+    return m, sep
+
+
+def test_linear_chain():
+    m, units = setup_chain()
+    opt = NewtonSolver()
+    res = opt.solve(m)
+    assert pyo.check_optimal_termination(res)
+    assert res.solver.iterations == 1
+    assert units[2].duty.value == pytest.approx(20)
+    assert units[1].t_out.value == pytest.approx(60)
+
+
+def test_nonlinear():
+    m, sep = setup_splitter()
+    sep.split_fraction[:, :].set_value(0.9)
+    res = NewtonSolver().solve(m)
+    assert pyo.check_optimal_termination(res)
+    assert sep.split_fraction["outlet_1", 0].value == pytest.approx(0.25)
+    assert sep.split_fraction["outlet_2", 0].value == pytest.approx(0.75)
+    assert sep.flow_in[0].value == pytest.approx(4)
+
+
+def test_structure_is_reused():
+    m, units = setup_chain()
+    opt = NewtonSolver()
+    opt.solve(m)
+    system, order = opt._structures[m]
+    assert order is not None
+    units[2].h_out.fix(60)
+    res = opt.solve(m)
+    assert pyo.check_optimal_termination(res)
+    assert opt._structures[m][0] is system
+    assert units[2].duty.value == pytest.approx(30)
+
+    # Changing which variables are fixed rebuilds it
+    units[2].h_out.unfix()
+    units[2].duty.fix(10)
+    res = opt.solve(m)
+    assert pyo.check_optimal_termination(res)
+    assert opt._structures[m][0] is not system
+    assert units[2].h_out.value == pytest.approx(40)
+
+
+def test_not_square():
+    m, units = setup_chain()
+    units[2].h_out.unfix()
+    res = NewtonSolver().solve(m)
+    assert res.solver.termination_condition == pyo.TerminationCondition.invalidProblem
+    assert not pyo.check_optimal_termination(res)
+
+
+def test_iteration_limit():
+    m, sep = setup_splitter()
+    sep.split_fraction[:, :].set_value(0.9)
+    res = NewtonSolver(max_iter=1).solve(m)
+    assert res.solver.termination_condition == pyo.TerminationCondition.maxIterations
+
+
+def test_staged_initialise():
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.h1 = ToyHeater()
+    register_inlet_ports(m.fs)
+    h1 = m.fs.h1
+    h1.flow_in.fix(1)
+    h1.h_in.fix(10)
+    replace_state_var(h1.duty, h1.h_out)
+    h1.h_out.fix(30)
+    unfix_everything(h1)
+    h1.flow_in.fix()
+    h1.h_in.fix()
+    report = staged_initialise(h1, NewtonSolver())
+    assert h1.duty.value == pytest.approx(20)
+    assert h1.h_out.fixed
+    # The iteration count is read from the log, the same as for IPOPT
+    assert report.total_iterations is not None
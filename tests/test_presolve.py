@@ -0,0 +1,55 @@
+from model import *
+from presolve import eliminate, presolved, PresolvedSolver
+from newton import NewtonSolver
+from model_initialisation import solve_with_iterations
+import pyomo.environ as pyo
+import pytest
+from .test_newton import setup_chain, setup_splitter
+
+
+def test_chain_is_solved_directly():
+    m, units = setup_chain()
+    with presolved(m) as reduction:
+        assert reduction.n_constraints == 13
+        assert reduction.n_remaining == 0
+        assert units[2].duty.fixed
+        assert not units[2].energy.active
+    assert units[2].duty.value == pytest.approx(20)
+    assert units[1].t_out.value == pytest.approx(60)
+    # The model is as it was
+    assert not units[2].duty.fixed
+    assert units[2].energy.active
+    assert units[2].h_out.fixed
+
+
+def test_partial_reduction():
+    m, sep = setup_splitter()
+    reduction = eliminate(m)
+    # The split fraction and outlet flow of the second component are determined directly,
+    # but the first component's split equations are bilinear in the unknowns.
+    assert sep.split_fraction["outlet_2", 1].fixed
+    assert sep.flow_out["outlet_2", 1].value == pytest.approx(2)
+    assert not sep.flow_in[0].fixed
+    assert 0 < reduction.n_remaining < reduction.n_constraints
+    reduction.restore()
+    assert not sep.split_fraction["outlet_2", 1].fixed
+
+
+def test_presolved_solver():
+    m, sep = setup_splitter()
+    sep.split_fraction[:, :].set_value(0.9)
+    opt = PresolvedSolver(NewtonSolver())
+    res = opt.solve(m)
+    assert pyo.check_optimal_termination(res)
+    assert sep.flow_in[0].value == pytest.approx(4)
+    assert opt.reductions[-1].n_remaining == 3
+    assert not sep.flow_out["outlet_2", 1].fixed
+
+
+def test_nothing_left_to_solve():
+    m, units = setup_chain()
+    opt = PresolvedSolver(NewtonSolver())
+    res, iterations = solve_with_iterations(opt, m)
+    assert pyo.check_optimal_termination(res)
+    assert iterations == 0
+    assert units[2].duty.value == pytest.approx(20)
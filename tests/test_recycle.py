@@ -0,0 +1,83 @@
+from model import *
+from recycle import initialise_recycles, tear_streams
+from newton import NewtonSolver
+import pytest
+from idaes.core.util.exceptions import InitializationError
+from .toy_models import build_recycle, build_chain
+
+
+def setup():
+    m = build_recycle()
+    m.fs.mixer.flow_1.fix(1)
+    m.fs.mixer.h_1.fix(10)
+    m.fs.heater.duty.fix(5)
+    m.fs.purge.fraction.fix(0.5)
+    return m
+
+
+def check_solution(m):
+    assert m.fs.heater.flow_in.value == pytest.approx(2, rel=1e-5)
+    assert m.fs.heater.h_in.value == pytest.approx(15, rel=1e-5)
+    assert m.fs.mixer.h_2.value == pytest.approx(20, rel=1e-5)
+    assert m.fs.purge.flow_purge.value == pytest.approx(1, rel=1e-5)
+
+
+def test_tear_streams():
+    m = setup()
+    assert len(tear_streams(m.fs)) == 1
+    m, units = build_chain(3)
+    assert tear_streams(m.fs) == []
+
+
+@pytest.mark.parametrize("method", ["direct", "wegstein", "broyden"])
+def test_methods(method):
+    m = setup()
+    report = initialise_recycles(m.fs, NewtonSolver(), method=method)
+    check_solution(m)
+    assert len(report.loops) == 1
+    tears, iterations, converged, errors = report.loops[0]
+    assert converged
+    assert len(errors) == iterations
+    # The unit definitions are left as they were
+    assert m.fs.purge.fraction.fixed
+    assert not m.fs.mixer.flow_2.fixed
+    assert not m.fs.heater.flow_in.fixed
+
+
+def test_acceleration_needs_fewer_iterations():
+    iterations = {}
+    for method in ("direct", "wegstein"):
+        report = initialise_recycles(setup().fs, NewtonSolver(), method=method)
+        iterations[method] = report.total_iterations
+    assert iterations["wegstein"] < iterations["direct"]
+
+
+def test_chosen_tear_and_guesses():
+    m = setup()
+    report = initialise_recycles(
+        m.fs,
+        NewtonSolver(),
+        tears=[m.fs.recycle],
+        guesses={m.fs.recycle: {"flow": 1, "enth": 20}},
+    )
+    check_solution(m)
+    assert report.loops[0][0] == ["fs.recycle"]
+    # Starting from the solution, one pass is enough
+    assert report.loops[0][1] == 1
+
+
+def test_not_converged():
+    m = setup()
+    with pytest.raises(InitializationError):
+        initialise_recycles(m.fs, NewtonSolver(), method="direct", max_iter=3)
+
+
+def test_no_recycle():
+    m, units = build_chain(3)
+    units[0].flow_in.fix(2)
+    units[0].h_in.fix(10)
+    report = initialise_recycles(m.fs, NewtonSolver())
+    assert report.loops == []
+    assert [unit.name for unit in report.units] == ["fs.unit0", "fs.unit1", "fs.unit2"]
+    assert units[2].h_in.value == pytest.approx(30)
+    assert units[2].flow_out.value == pytest.approx(2)
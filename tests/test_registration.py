@@ -0,0 +1,20 @@
+from model import *
+from model import _has_var
+import pyomo.environ as pyo
+from .toy_models import build_chain
+
+
+def test_has_var():
+    m, (unit,) = build_chain(1)
+    # Comparing two different variables with == builds an expression, which must not count as a match
+    assert not _has_var(unit.h_out, [unit.duty])
+    assert _has_var(unit.duty, [unit.h_out, unit.duty])
+    m.x = pyo.Var([1, 2])
+    assert not _has_var(m.x, [unit.duty])
+    assert _has_var(m.x, [m.x])
+
+
+def test_inlet_ports_are_all_registered():
+    m, (unit,) = build_chain(1)
+    state_vars = list_state_vars(unit)
+    assert [v.name for v in state_vars] == ["fs.unit0.duty", "fs.unit0.flow_in", "fs.unit0.h_in"]
@@ -0,0 +1,85 @@
+from model import *
+from model import RegistryList
+import pickle
+import cloudpickle
+import pyomo.environ as pyo
+from pyomo.network import Port
+from flowsheet_cache import FlowsheetCache
+from .toy_models import build_chain
+
+
+def build(n_units):
+    m, units = build_chain(n_units)
+    replace_state_var(units[1].duty, units[1].h_out)
+    return m
+
+
+def assert_registry_belongs_to(m):
+    state_vars = list_state_vars(m.fs)
+    assert len(state_vars) == 4
+    assert all(v.model() is m for v in state_vars)
+    replacements = list_replacements(m.fs)
+    assert len(replacements) == 1
+    assert replacements[0][0] is m.fs.unit1.duty
+    assert replacements[0][1] is m.fs.unit1.h_out
+
+
+def test_clone():
+    m = build(2)
+    assert_registry_belongs_to(m)
+    assert_registry_belongs_to(m.clone())
+
+
+def test_clone_block():
+    m = build(2)
+    unit = m.fs.unit0.clone()
+    assert all(is_child_of(unit, v) for v in list_state_vars(unit))
+
+
+def test_pickle():
+    m = build(2)
+    assert_registry_belongs_to(pickle.loads(cloudpickle.dumps(m)))
+
+
+def test_matching_cache_not_copied():
+    m = build(2)
+    retarget_replacement(m.fs.unit1.duty, m.fs.unit1.t_out)
+    assert m.fs._matching.value is not None
+    assert m.clone().fs._matching.value is None
+
+
+def test_flowsheet_cache(tmp_path):
+    cache = FlowsheetCache(directory=tmp_path)
+    m1 = cache.get(build, n_units=2)
+    m2 = cache.get(build, n_units=2)
+    assert m1 is not m2
+    assert_registry_belongs_to(m2)
+
+    # Another process would only have the files
+    m3 = FlowsheetCache(directory=tmp_path).get(build, n_units=2)
+    assert_registry_belongs_to(m3)
+
+
+def build_port_registered():
+    """
+    A block that is only registered through its inlet port.
+    """
+    m = pyo.ConcreteModel()
+    m.fs = pyo.Block()
+    m.fs.b = pyo.Block()
+    m.fs.b.flow = pyo.Var(initialize=1)
+    m.fs.b.inlet = Port(initialize={"flow": m.fs.b.flow})
+    m.fs.b.inlet.is_inlet = True
+    register_inlet_ports(m.fs)
+    return m
+
+
+def test_port_registered_clone_and_pickle():
+    m = build_port_registered()
+    for copy in (m.clone(), pickle.loads(cloudpickle.dumps(m))):
+        state_vars = list_state_vars(copy.fs)
+        assert len(state_vars) == 1
+        assert state_vars[0] is copy.fs.b.flow
+    assert isinstance(m.fs.b._state_vars, RegistryList)
+    block = m.fs.b.clone()
+    assert list_state_vars(block)[0] is block.flow
@@ -0,0 +1,82 @@
+from model import *
+import pyomo.environ as pyo
+import pytest
+from idaes.core import FlowsheetBlock
+from .toy_models import ToyHeater, build_chain
+
+
+def setup():
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.h1 = ToyHeater()
+    # The inlet and the duty are the state vars, as in the heater this test was written with
+    register_block(m.fs.h1, [m.fs.h1.flow_in, m.fs.h1.h_in, m.fs.h1.duty])
+    return m
+
+
+def test_retarget_replacement():
+    m = setup()
+    h1 = m.fs.h1
+    replace_state_var(h1.duty, h1.h_out)
+
+    retarget_replacement(h1.duty, h1.t_out)
+
+    assert len(list_replacements(m.fs)) == 1
+    assert list_replacements(m.fs)[0][0] is h1.duty
+    assert list_replacements(m.fs)[0][1] is h1.t_out
+    assert h1.t_out.fixed
+    assert not h1.h_out.fixed
+    assert not h1.duty.fixed
+
+
+def test_chain_replacement():
+    m = setup()
+    h1 = m.fs.h1
+    replace_state_var(h1.duty, h1.h_out)
+
+    chain_replacement(h1.h_out, h1.t_out)
+
+    assert list_replacements(m.fs)[0][0] is h1.duty
+    assert list_replacements(m.fs)[0][1] is h1.t_out
+    assert list_guesses(m.fs)[0] is h1.duty
+
+
+def test_retarget_singular():
+    m = setup()
+    h1 = m.fs.h1
+    h1.x = pyo.Var(initialize=1)
+    h1.c3 = pyo.Constraint(expr=h1.x == h1.flow_in)
+    replace_state_var(h1.duty, h1.h_out)
+
+    # x is already determined by the (fixed) flow, so it can't be used as a replacement.
+    with pytest.raises(ValueError):
+        retarget_replacement(h1.duty, h1.x)
+
+    # The model should be left unchanged
+    assert list_replacements(m.fs)[0][1] is h1.h_out
+    assert h1.h_out.fixed
+    assert not h1.x.fixed
+
+    # and the cached matching should still be usable
+    retarget_replacement(h1.duty, h1.t_out)
+    assert list_replacements(m.fs)[0][1] is h1.t_out
+
+
+def test_retarget_not_replaced():
+    m = setup()
+    with pytest.raises(ValueError):
+        retarget_replacement(m.fs.h1.duty, m.fs.h1.t_out)
+
+
+def test_matching_not_trusted_after_manual_fix():
+    m, units = build_chain(2)
+    replace_state_var(units[0].duty, units[0].h_out)
+    retarget_replacement(units[0].duty, units[0].t_out)  # caches a matching for the flowsheet
+
+    # Fixed outside of replace_state_var, so the cached matching doesn't know about it
+    units[1].t_out.fix(100)
+    # h_out is already determined by t_out, so it can't replace duty.
+    with pytest.raises(ValueError):
+        replace_state_var(units[1].duty, units[1].h_out)
+    assert units[1].duty.fixed
+    assert not units[1].h_out.fixed
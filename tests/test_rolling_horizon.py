@@ -0,0 +1,126 @@
+import pyomo.environ as pyo
+from pyomo.dae import ContinuousSet, DerivativeVar
+from pyomo.opt import SolverResults, SolverStatus, TerminationCondition
+import pytest
+from idaes.core import FlowsheetBlock
+from model import list_replacements
+from newton import NewtonSolver
+from rolling_horizon import RollingHorizon
+from unit_models.pid_controller import SVPIDController
+from .toy_models import ToyTank
+
+k = 0.5
+n_elements = 4
+
+
+def setup():
+    # dx/dt = -k x over one window of 1 s, with backward differences
+    m = pyo.ConcreteModel()
+    m.time = ContinuousSet(bounds=(0, 1))
+    m.x = pyo.Var(m.time, initialize=1)
+    m.u = pyo.Var(m.time, initialize=0)
+    m.dxdt = DerivativeVar(m.x, wrt=m.time)
+    m.ode = pyo.Constraint(m.time, rule=lambda m, t: m.dxdt[t] == -k * m.x[t] + m.u[t])
+    pyo.TransformationFactory("dae.finite_difference").apply_to(m, nfe=n_elements, scheme="BACKWARD")
+    m.u.fix(0)
+    m.x[0].fix(1)
+    return m
+
+
+class BackwardEulerSolver:
+    """
+    Solves the model from setup() exactly, by stepping through the time points.
+    """
+
+    def solve(self, m):
+        assert m.x[0].fixed
+        times = list(m.time)
+        for t_prev, t in zip(times, times[1:]):
+            h = t - t_prev
+            m.x[t].set_value((m.x[t_prev].value + h * m.u[t].value) / (1 + k * h))
+        for t in times:
+            m.dxdt[t].set_value(-k * m.x[t].value + m.u[t].value)
+        res = SolverResults()
+        res.solver.status = SolverStatus.ok
+        res.solver.termination_condition = TerminationCondition.optimal
+        return res
+
+
+def test_rolling_horizon():
+    m = setup()
+    runner = RollingHorizon(m, m.time, BackwardEulerSolver(), record=[m.x])
+    runner.run(3)
+
+    h = 1 / n_elements
+    expected = 1 / (1 + k * h) ** (3 * n_elements)
+    assert m.x[1].value == pytest.approx(expected)
+    assert runner.simulated_time == 3
+    assert runner.throughput > 0
+
+    trajectory = runner.trajectories["x[*]"]
+    assert len(trajectory) == 3 * n_elements + 1
+    assert trajectory[0] == (0, 1)
+    assert trajectory[-1][0] == pytest.approx(3)
+    assert trajectory[-1][1] == pytest.approx(expected)
+
+
+def test_update_inputs():
+    m = setup()
+
+    def update_inputs(model, t_start):
+        model.u.fix(1 if t_start >= 1 else 0)
+
+    runner = RollingHorizon(m, m.time, BackwardEulerSolver(), update_inputs=update_inputs)
+    runner.run(2)
+    assert m.u[0.5].value == 1
+    assert m.x[0].value == pytest.approx(1 / (1 + k / n_elements) ** n_elements)
+
+
+def setup_pid():
+    """
+    A PI controller holding the level of a ToyTank at a setpoint by manipulating its inlet flow,
+    starting from steady state at a level of 1.
+    """
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=True, time_set=[0, 1], time_units=pyo.units.s)
+    m.fs.tank = ToyTank()
+    m.fs.pid = SVPIDController(process_var=m.fs.tank.level, manipulated_var=m.fs.tank.flow_in)
+    pyo.TransformationFactory("dae.finite_difference").apply_to(m.fs, nfe=n_elements, wrt=m.fs.time, scheme="BACKWARD")
+    m.fs.pid.setpoint.fix(1.5)
+    m.fs.pid.gain_p.fix(0.5)
+    m.fs.pid.gain_i.fix(0.2)
+    m.fs.pid.mv_ref.fix(0.5)
+    m.fs.tank.level[0].fix(1)
+    m.fs.tank.flow_in[0].fix(0.5)
+    return m
+
+
+def test_pid_controller():
+    m = setup_pid()
+    pid = m.fs.pid
+    runner = RollingHorizon(m, m.fs.time, NewtonSolver(), record=[m.fs.tank.level])
+    runner.solve_window()
+    # Bumpless start: the initial integral term cancels the proportional term
+    assert pid.mv_integral_component[0].value == pytest.approx(-0.25)
+    integral = pid.mv_integral_component[1].value
+    flow = m.fs.tank.flow_in[1].value
+    level = m.fs.tank.level[1].value
+    assert integral > -0.25
+
+    runner.solve_window()
+    # The integral term and the controller output carry over from the end of the last window
+    assert pid.mv_integral_component[0].fixed
+    assert pid.mv_integral_component[0].value == pytest.approx(integral)
+    assert m.fs.tank.flow_in[0].value == pytest.approx(flow)
+    assert m.fs.tank.level[0].value == pytest.approx(level)
+    assert runner.deactivated == [pid.initial_integral_error_eqn]
+    # The integral keeps growing while the level is below the setpoint
+    assert pid.mv_integral_component[1].value > integral
+
+    runner.run(20)
+    # The setpoint is still the specification, rather than the inlet flow
+    assert any(old is m.fs.tank.flow_in and new is pid.setpoint for old, new in list_replacements(m.fs))
+    assert all(pid.setpoint[t].fixed for t in m.fs.time)
+    assert not any(m.fs.tank.flow_in[t].fixed for t in m.fs.time if t != 0)
+    # With integral action, the level settles at the setpoint
+    assert m.fs.tank.level[1].value == pytest.approx(1.5, abs=0.01)
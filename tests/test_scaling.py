@@ -0,0 +1,34 @@
+from model import *
+from scaling import propagate_scaling
+from idaes.core.scaling.util import get_scaling_factor
+from .toy_models import build_chain
+
+
+def setup():
+    m, units = build_chain(3)
+    units[0].flow_in.fix(100)
+    units[0].h_in.fix(5000)
+    for u in units:
+        u.duty.fix(1000)
+    replace_state_var(units[1].duty, units[1].h_out)
+    units[1].h_out.fix(20000)
+    return m, units
+
+
+def test_propagate_scaling():
+    m, units = setup()
+    propagate_scaling(m.fs)
+
+    # Seeded from the state vars and replacements
+    assert get_scaling_factor(units[0].flow_in) == 1 / 100
+    assert get_scaling_factor(units[0].h_in) == 1 / 5000
+    assert get_scaling_factor(units[1].h_out) == 1 / 20000
+
+    # Propagated through the units and across the arcs
+    assert get_scaling_factor(units[2].flow_out) == 1 / 100
+    assert get_scaling_factor(units[0].h_out) == 1 / 5000
+    assert get_scaling_factor(units[2].h_in) == 1 / 20000
+    assert get_scaling_factor(units[2].h_out) == 1 / 20000
+
+    # Constraints are scaled too
+    assert get_scaling_factor(units[2].energy) is not None
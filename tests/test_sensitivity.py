@@ -0,0 +1,66 @@
+from model import *
+from sensitivity import Sensitivity
+import pyomo.environ as pyo
+import pytest
+from pyomo.common.collections import ComponentMap
+from .toy_models import build_chain
+
+
+def setup():
+    m, units = build_chain(3)
+    units[0].flow_in.fix(1)
+    units[0].h_in.fix(10)
+    for unit in units:
+        unit.duty.fix(10)
+    replace_state_var(units[2].duty, units[2].h_out)
+    units[2].h_out.fix(50)
+    # the solution
+    for i, unit in enumerate(units):
+        unit.flow_out.set_value(1)
+        if i > 0:
+            unit.flow_in.set_value(1)
+            unit.h_in.set_value(units[i - 1].h_out.value)
+        if i < 2:
+            unit.h_out.set_value(unit.h_in.value + unit.duty.value)
+        else:
+            unit.duty.set_value(unit.h_out.value - unit.h_in.value)
+        unit.t_out.set_value(2 * unit.h_out.value)
+    return m, units
+
+
+def test_derivatives():
+    m, units = setup()
+    sens = Sensitivity(m.fs)
+    assert sens.derivative(units[2].duty, units[2].h_out) == pytest.approx(1)
+    assert sens.derivative(units[2].duty, units[0].duty) == pytest.approx(-1)
+    assert sens.derivative(units[2].t_out, units[0].duty) == pytest.approx(0)
+    assert sens.derivative(units[1].t_out, units[0].h_in) == pytest.approx(2)
+    assert sens.derivative("unit2.duty", "unit2.h_out") == pytest.approx(1)
+
+
+def test_predict_and_apply():
+    m, units = setup()
+    sens = Sensitivity(m.fs)
+    predicted = sens.predict({"unit2.h_out": 55, "unit0.h_in": 12})
+    assert predicted[units[2].duty] == pytest.approx(55 - 32)
+    assert predicted[units[1].h_out] == pytest.approx(32)
+
+    sens.apply(ComponentMap([(units[2].h_out, 55)]))
+    assert units[2].h_out.fixed
+    assert units[2].h_out.value == 55
+    assert units[2].duty.value == pytest.approx(25)
+    assert units[2].t_out.value == pytest.approx(110)
+
+
+def test_not_specification():
+    m, units = setup()
+    sens = Sensitivity(m.fs)
+    with pytest.raises(ValueError):
+        sens.predict({"unit1.t_out": 5})
+
+
+def test_not_square():
+    m, units = setup()
+    units[1].t_out.fix()
+    with pytest.raises(ValueError):
+        Sensitivity(m.fs)
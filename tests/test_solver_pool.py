@@ -0,0 +1,95 @@
+from model import *
+from solver_pool import SolverPool
+from newton import NewtonSolver
+from model_initialisation import staged_initialise, solve_with_iterations, unfix_everything
+import pyomo.environ as pyo
+import pytest
+from .test_newton import setup_chain
+
+
+def setup_unit():
+    """
+    The last unit of the chain, ready for staged_initialise()
+    """
+    m, units = setup_chain()
+    h = units[2]
+    unfix_everything(h)
+    h.flow_in.fix(1)
+    h.h_in.fix(30)
+    return m, h
+
+
+def test_pool():
+    with SolverPool(NewtonSolver()) as pool:
+        opt = pool.solver()
+        m, units = setup_chain()
+        res, iterations = solve_with_iterations(opt, m)
+        assert pyo.check_optimal_termination(res)
+        assert iterations == 1
+        assert units[2].duty.value == pytest.approx(20)
+
+        # Only the values are sent for the next solve of the same model
+        units[2].h_out.fix(60)
+        res = opt.solve(m)
+        assert pyo.check_optimal_termination(res)
+        assert units[2].duty.value == pytest.approx(30)
+        assert pool.models_sent == 1
+
+        # A block of the same model
+        m.fs.unit0.duty.fix(20)
+        m.fs.unit0.h_out.set_value(0)
+        res = opt.solve(m.fs.unit0)
+        assert pyo.check_optimal_termination(res)
+        assert m.fs.unit0.h_out.value == pytest.approx(30)
+        assert pool.models_sent == 1
+
+        # The model is sent again if its structure changes
+        m.fs.extra = pyo.Var(initialize=1)
+        m.fs.extra_con = pyo.Constraint(expr=m.fs.extra == 2 * units[0].h_out)
+        res = opt.solve(m)
+        assert pyo.check_optimal_termination(res)
+        assert m.fs.extra.value == pytest.approx(60)
+        assert pool.models_sent == 2
+        assert pool.solves == 4
+
+
+def test_staged_initialise_with_pool():
+    m, h = setup_unit()
+    with SolverPool(NewtonSolver()) as pool:
+        report = staged_initialise(h, pool.solver(max_iter=10))
+    assert [stage for stage, _, _, _ in report.stages] == ["state vars", "replacements"]
+    assert h.duty.value == pytest.approx(20)
+    assert h.t_out.value == pytest.approx(100)
+
+
+def test_only_block_state_is_sent():
+    with SolverPool(NewtonSolver()) as pool:
+        opt = pool.solver()
+        m, units = setup_chain()
+        opt.solve(m)
+        # A change to the structure outside the block doesn't matter to its solve
+        m.fs.extra = pyo.Var(initialize=1)
+        m.fs.extra_con = pyo.Constraint(expr=m.fs.extra == 2 * units[0].h_out)
+        units[2].h_out.fix(70)
+        units[2].inlet.fix()
+        res = opt.solve(units[2])
+        assert pyo.check_optimal_termination(res)
+        assert units[2].duty.value == pytest.approx(40)
+        assert pool.models_sent == 1
+
+
+def test_dead_workers_are_removed():
+    m, units = setup_chain()
+    with SolverPool(NewtonSolver(), n_workers=2) as pool:
+        opt = pool.solver()
+        pool._workers[0].process.kill()
+        pool._workers[0].process.wait()
+        for _ in range(3):
+            assert pyo.check_optimal_termination(opt.solve(m))
+        assert pool.n_workers == 1
+
+        pool._workers[0].process.kill()
+        pool._workers[0].process.wait()
+        with pytest.raises(RuntimeError, match="exited"):
+            opt.solve(m)
+        assert pool.n_workers == 0
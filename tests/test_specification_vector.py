@@ -0,0 +1,64 @@
+import numpy as np
+from model import *
+from specification_vector import SpecificationVector
+import pyomo.environ as pyo
+import pytest
+from idaes.core import FlowsheetBlock
+from .toy_models import ToySplitter
+
+
+def setup(n_components=5):
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.sep = ToySplitter(n_components=n_components)
+    register_inlet_ports(m.fs)
+    sep = m.fs.sep
+    replace_state_var(sep.split_fraction["outlet_1", 0], sep.flow_out["outlet_1", 0])
+    return m
+
+
+def test_ordering():
+    m = setup()
+    spec = SpecificationVector(m.fs)
+    # the unreplaced split fractions, the inlet flows, then the replacing outlet flow
+    assert len(spec) == 4 + 5 + 1
+    assert spec.variables[-1] is m.fs.sep.flow_out["outlet_1", 0]
+    assert len(SpecificationVector(m.fs, "state_vars")) == 5 + 5
+    assert SpecificationVector(m.fs, "guesses").variables == [m.fs.sep.split_fraction["outlet_1", 0]]
+    assert SpecificationVector(m.fs, "replacements").names == ["sep.flow_out[outlet_1,0]"]
+
+
+def test_get_and_set_values():
+    m = setup()
+    spec = SpecificationVector(m.fs)
+    values = np.arange(len(spec), dtype=float)
+    spec.set_values(values)
+    assert np.array_equal(spec.get_values(), values)
+    assert m.fs.sep.flow_out["outlet_1", 0].value == values[-1]
+    assert m.fs.sep.flow_out["outlet_1", 0].fixed
+
+
+def test_set_values_and_fix():
+    m = setup()
+    guesses = SpecificationVector(m.fs, "guesses")
+    guesses.set_values([0.3], fix=True)
+    assert m.fs.sep.split_fraction["outlet_1", 0].value == 0.3
+    assert m.fs.sep.split_fraction["outlet_1", 0].fixed
+
+
+def test_wrong_length():
+    m = setup()
+    with pytest.raises(ValueError):
+        SpecificationVector(m.fs).set_values([1, 2])
+    with pytest.raises(ValueError):
+        SpecificationVector(m.fs, "everything")
+
+
+def test_missing_values_round_trip():
+    m = setup()
+    guesses = SpecificationVector(m.fs, "guesses")
+    m.fs.sep.split_fraction["outlet_1", 0].set_value(None)
+    values = guesses.get_values()
+    assert np.isnan(values[0])
+    guesses.set_values(values)
+    assert m.fs.sep.split_fraction["outlet_1", 0].value is None
@@ -0,0 +1,81 @@
+import asyncio
+from model import *
+from streaming import StreamingRunner
+from async_solve import SubprocessExecutor
+import pyomo.environ as pyo
+from pyomo.opt import SolverResults, SolverStatus, TerminationCondition
+import pytest
+from pyomo.common.collections import ComponentMap
+from idaes.core import FlowsheetBlock
+from .toy_models import ToyHeater
+
+
+class ToyHeaterSolver:
+    """
+    Solves a ToyHeater with its outlet enthalpy fixed, and counts how many times it is called.
+    """
+
+    def __init__(self):
+        self.solves = 0
+
+    def solve(self, blk):
+        self.solves += 1
+        h1 = blk.h1
+        h1.flow_out.set_value(h1.flow_in.value)
+        h1.duty.set_value(h1.h_out.value - h1.h_in.value)
+        h1.t_out.set_value(2 * h1.h_out.value)
+        res = SolverResults()
+        res.solver.status = SolverStatus.ok
+        res.solver.termination_condition = TerminationCondition.optimal
+        return res
+
+
+def setup():
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.h1 = ToyHeater()
+    register_inlet_ports(m.fs)
+    m.fs.h1.flow_in.fix(1)
+    m.fs.h1.h_in.fix(10)
+    m.fs.h1.duty.fix(10)
+    replace_state_var(m.fs.h1.duty, m.fs.h1.h_out)
+    return m
+
+
+def test_streaming_updates():
+    m = setup()
+    opt = ToyHeaterSolver()
+    runner = StreamingRunner(m.fs, opt, rtol=1e-3)
+    measurements = [{"h1.h_out": 20}, {"h1.h_out": 20.001}, ComponentMap([(m.fs.h1.h_out, 25)])]
+    states = list(runner.run(measurements))
+
+    assert [s.skipped for s in states] == [False, True, False]
+    assert opt.solves == 2
+    assert states[0].converged
+    assert states[0].values["fs.h1.duty"] == 10
+    assert states[2].values["fs.h1.duty"] == 15
+    assert states[2].inputs == {"fs.h1.h_out": 25}
+    assert len(runner.latencies) == 3
+
+
+def test_measurement_must_be_in_specification():
+    m = setup()
+    runner = StreamingRunner(m.fs, ToyHeaterSolver())
+    with pytest.raises(ValueError):
+        runner.update({"h1.t_out": 50})
+
+
+def test_streaming_async():
+    m = setup()
+    runner = StreamingRunner(m.fs, ToyHeaterSolver(), rtol=1e-3)
+
+    async def measurements():
+        for val in (20, 20.001, 30):
+            yield {"h1.h_out": val}
+
+    async def collect():
+        return [s async for s in runner.run_async(measurements(), executor=SubprocessExecutor(1))]
+
+    states = asyncio.run(collect())
+    assert [s.skipped for s in states] == [False, True, False]
+    assert m.fs.h1.duty.value == 20
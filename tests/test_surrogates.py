@@ -0,0 +1,49 @@
+import numpy as np
+from model import *
+from surrogates import SampleLog, PolynomialSurrogate, seed_from_surrogate
+from .toy_models import build_chain
+
+
+def set_solution(heater, h_in, duty):
+    """Set a (consistent) solution, as if the model had been solved."""
+    heater.flow_in.fix(1)
+    heater.h_in.fix(h_in)
+    heater.duty.fix(duty)
+    heater.flow_out.set_value(1)
+    heater.h_out.set_value(h_in + duty)
+    heater.t_out.set_value(2 * (h_in + duty))
+
+
+def test_fit_and_seed(tmp_path):
+    m, units = build_chain(1)
+    heater = units[0]
+    samples = SampleLog()
+    for h_in in [0, 10, 20]:
+        for duty in [100, 150, 200]:
+            set_solution(heater, h_in, duty)
+            assert samples.record(heater)
+    surrogate = samples.fit(degree=1)
+
+    path = tmp_path / "heater.npz"
+    surrogate.save(path)
+    surrogate = PolynomialSurrogate.load(path)
+
+    set_solution(heater, 15, 120)
+    heater.h_out.set_value(0)
+    heater.t_out.set_value(0)
+    assert seed_from_surrogate(heater, surrogate)
+    assert np.isclose(heater.h_out.value, 135)
+    assert np.isclose(heater.t_out.value, 270)
+
+
+
+def test_seed_with_different_state_vars():
+    m, units = build_chain(1)
+    heater = units[0]
+    # e.g a surrogate trained on a unit that didn't register duty as a state var
+    surrogate = PolynomialSurrogate(["flow_in", "h_in"], ["t_out"], degree=1)
+    surrogate.fit([[1, 0], [1, 10], [2, 20]], [[0], [10], [20]])
+
+    heater.t_out.set_value(5)
+    assert not seed_from_surrogate(heater, surrogate)
+    assert heater.t_out.value == 5
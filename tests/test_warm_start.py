@@ -0,0 +1,72 @@
+from model import *
+from warm_start import WarmStartStore
+from .toy_models import build_chain
+
+
+def setup():
+    m, units = build_chain(1)
+    heater = units[0]
+    replace_state_var(heater.duty, heater.h_out)
+    return m, heater
+
+
+def set_solution(heater, h_in, h_out):
+    """Set a (consistent) solution, as if the model had been solved."""
+    heater.flow_in.fix(1)
+    heater.h_in.fix(h_in)
+    heater.h_out.fix(h_out)
+    heater.flow_out.set_value(1)
+    heater.duty.set_value(h_out - h_in)
+    heater.t_out.set_value(2 * h_out)
+
+
+def test_seed_from_nearest():
+    m, heater = setup()
+    store = WarmStartStore()
+    for h_out in [100, 200, 300]:
+        set_solution(heater, 10, h_out)
+        assert store.record(heater)
+    assert len(store) == 3
+
+    # A new operating point, closest to h_out = 200
+    heater.h_out.fix(210)
+    heater.duty.set_value(0)
+    heater.t_out.set_value(0)
+    distance = store.seed(heater)
+
+    assert distance is not None
+    assert heater.duty.value == 190  # from the stored point
+    assert heater.t_out.value == 400
+    assert heater.h_out.value == 210  # specification is left alone
+
+
+def test_eviction():
+    m, heater = setup()
+    store = WarmStartStore(max_size=2)
+    for h_out in [100, 200, 300]:
+        set_solution(heater, 10, h_out)
+        store.record(heater)
+    assert len(store) == 2
+
+    # The oldest point (h_out = 100) should have been evicted
+    heater.h_out.fix(100)
+    store.seed(heater)
+    assert heater.duty.value == 190
+
+
+def test_eviction_past_capacity():
+    # Enough points to grow the bucket's arrays several times, with evictions from the front
+    m, heater = setup()
+    store = WarmStartStore(max_size=5)
+    for h_out in range(100, 1100, 100):
+        set_solution(heater, 10, h_out)
+        store.record(heater)
+    assert len(store) == 5
+
+    # Only h_out = 600...1000 are left, so the nearest to 100 is 600
+    heater.h_out.fix(100)
+    store.seed(heater)
+    assert heater.duty.value == 590
+    heater.h_out.fix(1000)
+    store.seed(heater)
+    assert heater.duty.value == 990
@@ -0,0 +1,339 @@
+"""
+Small unit models with linear equations, in the same style as the SV unit models.
+These don't need a property package or a solver, so they are quick to build in tests.
+
+Also the single-unit flowsheets of the SV unit models, with a catalogue of specifications,
+shared by the benchmarks (these need the IAPWS property package).
+"""
+import pyomo.environ as pyo
+from pyomo.dae import DerivativeVar
+from pyomo.common.config import ConfigValue
+from pyomo.network import Port, Arc
+from idaes.core import FlowsheetBlock, ProcessBlockData, declare_process_block_class
+from idaes.models.properties import iapws95
+from model import register_block, register_inlet_ports, replace_state_var
+from unit_models.heater import SVHeater
+from unit_models.compressor import SVCompressor
+from unit_models.turbine import SVTurbine
+from unit_models.pump import SVPump
+from unit_models.valve import SVValve
+from unit_models.mixer import SVMixer
+from unit_models.separator import SVSeparator
+from unit_models.heat_exchanger import SVHeatExchanger
+from idaes.models.unit_models.heater import HeaterData
+from idaes.models.unit_models.pressure_changer import CompressorData, TurbineData, PumpData
+from idaes.models.unit_models.valve import ValveData
+from idaes.models.unit_models.mixer import MixerData
+from idaes.models.unit_models.separator import SeparatorData
+from idaes.models.unit_models.heat_exchanger import HeatExchangerData
+
+
+@declare_process_block_class("ToyHeater")
+class ToyHeaterData(ProcessBlockData):
+    """
+    A heater-like block, with heat duty as the state variable.
+    """
+
+    def build(self):
+        super().build()
+        self.flow_in = pyo.Var(initialize=1)
+        self.h_in = pyo.Var(initialize=10)
+        self.flow_out = pyo.Var(initialize=1)
+        self.h_out = pyo.Var(initialize=20)
+        self.duty = pyo.Var(initialize=10)
+        self.t_out = pyo.Var(initialize=40)
+        self.mass_balance = pyo.Constraint(expr=self.flow_out == self.flow_in)
+        self.energy = pyo.Constraint(expr=self.h_out == self.h_in + self.duty)
+        self.temperature = pyo.Constraint(expr=self.t_out == 2 * self.h_out)
+
+        self.inlet = Port(initialize={"flow": self.flow_in, "enth": self.h_in})
+        self.outlet = Port(initialize={"flow": self.flow_out, "enth": self.h_out})
+
+        register_block(self, [self.duty], allow_degrees_of_freedom=True)
+
+        self.inlet.is_inlet = True
+        self.outlet.is_inlet = False
+
+
+def build_chain(n_units, expand_arcs=True):
+    """
+    A flowsheet of n ToyHeaters (fs.unit0, fs.unit1, ...) connected in series by Arcs.
+    """
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    units = []
+    for i in range(n_units):
+        unit = ToyHeater()
+        m.fs.add_component(f"unit{i}", unit)
+        units.append(unit)
+    for i in range(n_units - 1):
+        m.fs.add_component(
+            f"arc{i}", Arc(source=units[i].outlet, destination=units[i + 1].inlet)
+        )
+    if expand_arcs:
+        pyo.TransformationFactory("network.expand_arcs").apply_to(m)
+    register_inlet_ports(m.fs)
+    return m, units
+
+
+@declare_process_block_class("ToySplitter")
+class ToySplitterData(ProcessBlockData):
+    """
+    A separator-like block that splits each component between two outlets,
+    with the split fractions of the first outlet as the state variables.
+    """
+
+    CONFIG = ProcessBlockData.CONFIG()
+    CONFIG.declare("n_components", ConfigValue(default=3))
+
+    def build(self):
+        super().build()
+        self.components = pyo.Set(initialize=range(self.config.n_components))
+        self.outlets = pyo.Set(initialize=["outlet_1", "outlet_2"])
+        self.flow_in = pyo.Var(self.components, initialize=1)
+        self.flow_out = pyo.Var(self.outlets, self.components, initialize=0.5)
+        self.split_fraction = pyo.Var(self.outlets, self.components, initialize=0.5)
+        self.split = pyo.Constraint(
+            self.outlets,
+            self.components,
+            rule=lambda b, o, j: b.flow_out[o, j] == b.split_fraction[o, j] * b.flow_in[j],
+        )
+        self.sum_split = pyo.Constraint(
+            self.components,
+            rule=lambda b, j: sum(b.split_fraction[o, j] for o in b.outlets) == 1,
+        )
+        self.inlet = Port(initialize={"flow": self.flow_in})
+        self.inlet.is_inlet = True
+
+        register_block(self, [self.split_fraction["outlet_1", :]], allow_degrees_of_freedom=True)
+
+
+@declare_process_block_class("ToyMixer")
+class ToyMixerData(ProcessBlockData):
+    """
+    A mixer-like block with two inlets. It has no state variables of its own.
+    """
+
+    def build(self):
+        super().build()
+        self.flow_1 = pyo.Var(initialize=1)
+        self.h_1 = pyo.Var(initialize=10)
+        self.flow_2 = pyo.Var(initialize=1)
+        self.h_2 = pyo.Var(initialize=10)
+        self.flow_out = pyo.Var(initialize=2)
+        self.h_out = pyo.Var(initialize=10)
+        self.mass_balance = pyo.Constraint(expr=self.flow_out == self.flow_1 + self.flow_2)
+        self.energy = pyo.Constraint(expr=self.flow_out * self.h_out == self.flow_1 * self.h_1 + self.flow_2 * self.h_2)
+
+        self.inlet_1 = Port(initialize={"flow": self.flow_1, "enth": self.h_1})
+        self.inlet_2 = Port(initialize={"flow": self.flow_2, "enth": self.h_2})
+        self.outlet = Port(initialize={"flow": self.flow_out, "enth": self.h_out})
+
+        register_block(self, [], allow_degrees_of_freedom=True)
+
+        self.inlet_1.is_inlet = True
+        self.inlet_2.is_inlet = True
+        self.outlet.is_inlet = False
+
+
+@declare_process_block_class("ToyPurge")
+class ToyPurgeData(ProcessBlockData):
+    """
+    Splits a stream into a product and a purge, with the product fraction as the state variable.
+    """
+
+    def build(self):
+        super().build()
+        self.flow_in = pyo.Var(initialize=1)
+        self.h_in = pyo.Var(initialize=10)
+        self.fraction = pyo.Var(initialize=0.5)
+        self.flow_product = pyo.Var(initialize=0.5)
+        self.flow_purge = pyo.Var(initialize=0.5)
+        self.h_out = pyo.Var(initialize=10)
+        self.split = pyo.Constraint(expr=self.flow_product == self.fraction * self.flow_in)
+        self.mass_balance = pyo.Constraint(expr=self.flow_purge == self.flow_in - self.flow_product)
+        self.energy = pyo.Constraint(expr=self.h_out == self.h_in)
+
+        self.inlet = Port(initialize={"flow": self.flow_in, "enth": self.h_in})
+        self.product = Port(initialize={"flow": self.flow_product, "enth": self.h_out})
+        self.purge = Port(initialize={"flow": self.flow_purge, "enth": self.h_out})
+
+        register_block(self, [self.fraction], allow_degrees_of_freedom=True)
+
+        self.inlet.is_inlet = True
+        self.product.is_inlet = False
+        self.purge.is_inlet = False
+
+
+@declare_process_block_class("ToyTank")
+class ToyTankData(ProcessBlockData):
+    """
+    A tank in a dynamic flowsheet, draining in proportion to its level, with the inlet flow as the state variable.
+    """
+
+    def build(self):
+        super().build()
+        time = self.flowsheet().time
+        self.level = pyo.Var(time, initialize=1)
+        self.flow_in = pyo.Var(time, initialize=0.5)
+        self.dlevel = DerivativeVar(self.level, wrt=time)
+        self.balance = pyo.Constraint(time, rule=lambda b, t: b.dlevel[t] == b.flow_in[t] - 0.5 * b.level[t])
+
+        register_block(self, [self.flow_in], allow_degrees_of_freedom=True)
+
+
+def build_recycle():
+    """
+    A feed mixed (fs.mixer) with a recycle, heated (fs.heater) and split (fs.purge),
+    with the product of the split recycled to the mixer.
+    """
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.mixer = ToyMixer()
+    m.fs.heater = ToyHeater()
+    m.fs.purge = ToyPurge()
+    m.fs.mixer_to_heater = Arc(source=m.fs.mixer.outlet, destination=m.fs.heater.inlet)
+    m.fs.heater_to_purge = Arc(source=m.fs.heater.outlet, destination=m.fs.purge.inlet)
+    m.fs.recycle = Arc(source=m.fs.purge.product, destination=m.fs.mixer.inlet_2)
+    pyo.TransformationFactory("network.expand_arcs").apply_to(m)
+    register_inlet_ports(m.fs)
+    return m
+
+
+def htpx(m, pressure, temperature):
+    return pyo.value(m.fs.pp.htpx(p=pressure * pyo.units.Pa, T=temperature * pyo.units.K))
+
+
+def setup_unit(unit_class, inlets, specify, unit_kwargs=None):
+    """
+    A flowsheet with one SV unit (fs.unit) using IAPWS water, with its inlets fixed
+    at {port name: (flow, pressure, temperature)}, then specify(m) called to set its specification.
+    """
+    m = pyo.ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.pp = iapws95.Iapws95ParameterBlock()
+    if unit_class is SVHeatExchanger:
+        m.fs.unit = unit_class(hot_side={"property_package": m.fs.pp}, cold_side={"property_package": m.fs.pp})
+    else:
+        m.fs.unit = unit_class(property_package=m.fs.pp, **(unit_kwargs or {}))
+    register_inlet_ports(m.fs)
+    for inlet, (flow, pressure, temperature) in inlets.items():
+        port = getattr(m.fs.unit, inlet)
+        port.flow_mol.fix(flow)
+        port.pressure.fix(pressure)
+        port.enth_mol.fix(htpx(m, pressure, temperature))
+    specify(m)
+    return m
+
+
+def replaced(state_var, new_var, val):
+    def specify(m):
+        new = new_var(m)
+        replace_state_var(state_var(m), new)
+        new.fix(val(m) if callable(val) else val)
+
+    return specify
+
+
+def fixed(var, val):
+    return lambda m: var(m).fix(val)
+
+
+water = (100, 1e5, 300)
+hot_water = (50, 1e5, 350)
+steam = (100, 1e6, 700)
+gas = (100, 1e5, 400)
+
+# unit, IDAES class, unit kwargs, inlets, {specification name: function making it}
+catalogue = [
+    (
+        SVHeater,
+        HeaterData,
+        {},
+        {"inlet": water},
+        {
+            "heat duty": fixed(lambda m: m.fs.unit.heat_duty, 1e6),
+            "outlet enthalpy": replaced(
+                lambda m: m.fs.unit.heat_duty, lambda m: m.fs.unit.outlet.enth_mol, lambda m: htpx(m, 1e5, 330)
+            ),
+        },
+    ),
+    (
+        SVCompressor,
+        CompressorData,
+        {},
+        {"inlet": gas},
+        {
+            "deltaP": fixed(lambda m: m.fs.unit.deltaP, 2e5),
+            "outlet pressure": replaced(lambda m: m.fs.unit.deltaP, lambda m: m.fs.unit.outlet.pressure, 5e5),
+            "work": replaced(lambda m: m.fs.unit.deltaP, lambda m: m.fs.unit.work_mechanical, 5e5),
+        },
+    ),
+    (
+        SVTurbine,
+        TurbineData,
+        {},
+        {"inlet": steam},
+        {
+            "work": fixed(lambda m: m.fs.unit.work_mechanical, -1e5),
+            "outlet pressure": replaced(
+                lambda m: m.fs.unit.work_mechanical, lambda m: m.fs.unit.outlet.pressure, 2e5
+            ),
+        },
+    ),
+    (
+        SVPump,
+        PumpData,
+        {},
+        {"inlet": water},
+        {
+            "work": fixed(lambda m: m.fs.unit.work_mechanical, 1e3),
+            "outlet pressure": replaced(lambda m: m.fs.unit.work_mechanical, lambda m: m.fs.unit.outlet.pressure, 3e5),
+            "deltaP": replaced(lambda m: m.fs.unit.work_mechanical, lambda m: m.fs.unit.deltaP, 2e5),
+        },
+    ),
+    (
+        SVValve,
+        ValveData,
+        {},
+        {"inlet": steam},
+        {
+            "opening": fixed(lambda m: m.fs.unit.valve_opening, 0.5),
+            "outlet pressure": replaced(lambda m: m.fs.unit.valve_opening, lambda m: m.fs.unit.outlet.pressure, 8e5),
+        },
+    ),
+    (
+        SVMixer,
+        MixerData,
+        {},
+        {"inlet_1": water, "inlet_2": hot_water},
+        {"inlets": lambda m: None},
+    ),
+    (
+        SVSeparator,
+        SeparatorData,
+        {},
+        {"inlet": water},
+        {
+            "split fraction": fixed(lambda m: m.fs.unit.split_fraction[0, "outlet_1"], 0.3),
+            "outlet flow": replaced(
+                lambda m: m.fs.unit.split_fraction[0, "outlet_1"], lambda m: m.fs.unit.outlet_1.flow_mol[0], 30
+            ),
+        },
+    ),
+    (
+        SVHeatExchanger,
+        HeatExchangerData,
+        {},
+        {"hot_side_inlet": steam, "cold_side_inlet": water},
+        {
+            "area": fixed(lambda m: m.fs.unit.area, 10),
+            "cold outlet enthalpy": replaced(
+                lambda m: m.fs.unit.area, lambda m: m.fs.unit.cold_side_outlet.enth_mol, lambda m: htpx(m, 1e5, 320)
+            ),
+            "hot outlet enthalpy": replaced(
+                lambda m: m.fs.unit.area, lambda m: m.fs.unit.hot_side_outlet.enth_mol, lambda m: htpx(m, 1e6, 600)
+            ),
+        },
+    ),
+]
@@ -2,8 +2,9 @@ from idaes.models.unit_models import Heater
 from idaes.core import declare_process_block_class
 from idaes.models.unit_models.heater import HeaterData
 from model import register_block
+from model_initialisation import StagedInitialisationMixin
 @declare_process_block_class("SVHeater")
-class SVHeaterData(HeaterData):
+class SVHeaterData(StagedInitialisationMixin, HeaterData):
     """
     Heater model, but it's set up with heat duty and deltaP as state variables.
     """
@@ -2,10 +2,11 @@ from idaes.models.unit_models import Heater
 from idaes.core import declare_process_block_class
 from idaes.models.unit_models.mixer import MixerData
 from model import register_block
+from model_initialisation import StagedInitialisationMixin
 
 
 @declare_process_block_class("SVMixer")
-class SVMixerData(MixerData):
+class SVMixerData(StagedInitialisationMixin, MixerData):
     """
     Heater model, but it's set up with heat duty and deltaP as state variables.
     """
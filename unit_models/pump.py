@@ -2,10 +2,12 @@ from idaes.models.unit_models import Heater
 from idaes.core import declare_process_block_class
 from idaes.models.unit_models.pressure_changer import PumpData
 from model import register_block
+from model_initialisation import StagedInitialisationMixin
+from scaling import propagate_pressure_changer_scaling
 
 
 @declare_process_block_class("SVPump")
-class SVPumpData(PumpData):
+class SVPumpData(StagedInitialisationMixin, PumpData):
     """
     Heater model, but it's set up with heat duty and deltaP as state variables.
     """
@@ -29,3 +31,10 @@ class SVPumpData(PumpData):
         # IDAES doesn't store this information.
         self.inlet.is_inlet = True
         self.outlet.is_inlet = False
+
+    def propagate_scaling(self):
+        """
+        From the scaling factors of the state variables, set the scaling factors of the outlet.
+        Used by scaling.propagate_scaling().
+        """
+        propagate_pressure_changer_scaling(self)
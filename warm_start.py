@@ -0,0 +1,214 @@
+from collections import OrderedDict
+import numpy as np
+from pyomo.environ import Var, check_optimal_termination
+from pyomo.common.collections import ComponentSet
+from model import list_specification, _var_datas
+"""
+Warm starts from previously converged solutions.
+
+After a successful solve, the values of the specification (state vars that haven't been replaced,
+and the variables that replaced them) are recorded along with the value of every variable in the block.
+Before the next solve, the initial values are set from the stored point whose specification
+is closest to the current one.
+
+Names are stored relative to the block, so one store can be shared between all instances of a unit class.
+
+Example:
+    store = get_store(SVHeater)
+    store.seed(m.fs.h1)
+    m.fs.h1.initialize()
+    res = opt.solve(m)
+    store.record(m.fs.h1, res)
+"""
+
+
+def relative_names(block, variables):
+    """
+    The names of the variables relative to the block, so they can be matched up between instances of a unit.
+    """
+    return tuple(v.getname(fully_qualified=True, relative_to=block) for v in variables)
+
+
+def var_values(variables):
+    """
+    The values of the variables as a float array, with nan for variables that have no value.
+    """
+    return np.array(
+        [np.nan if v.value is None else v.value for v in variables], dtype=float
+    )
+
+
+class _Bucket:
+    """
+    All stored points that share the same specification variables.
+    """
+
+    def __init__(self, spec_names, var_names):
+        self.spec_names = spec_names
+        self.var_names = var_names
+        self.ids = []
+        # Rows past len(self.ids) are spare capacity, doubled when full so that filling a bucket is linear.
+        self._specs = np.empty((1, len(spec_names)))
+        self._values = np.empty((1, len(var_names)))
+
+    @property
+    def specs(self):
+        return self._specs[: len(self.ids)]
+
+    @property
+    def values(self):
+        return self._values[: len(self.ids)]
+
+    def add(self, point_id, spec, values):
+        n = len(self.ids)
+        if n == len(self._specs):
+            self._specs = np.concatenate([self._specs, np.empty_like(self._specs)])
+            self._values = np.concatenate([self._values, np.empty_like(self._values)])
+        self._specs[n] = spec
+        self._values[n] = values
+        self.ids.append(point_id)
+
+    def remove(self, point_id):
+        i = self.ids.index(point_id)
+        n = len(self.ids)
+        # Shift the later rows up in place rather than reallocating.
+        self._specs[i : n - 1] = self._specs[i + 1 : n]
+        self._values[i : n - 1] = self._values[i + 1 : n]
+        del self.ids[i]
+
+    def distances(self, spec):
+        """
+        Distance from spec to each stored point, with each dimension normalised by the range of the stored points.
+        """
+        scale = self.specs.max(axis=0) - self.specs.min(axis=0)
+        # If a dimension doesn't vary, fall back to its magnitude (or 1 if it is zero).
+        flat = scale == 0
+        scale[flat] = np.abs(self.specs[0, flat])
+        scale[scale == 0] = 1
+        return np.sqrt(np.nansum(((self.specs - spec) / scale) ** 2, axis=1))
+
+    def nearest(self, spec):
+        """
+        Index and distance of the stored point nearest to spec.
+        """
+        distances = self.distances(spec)
+        i = int(np.argmin(distances))
+        return i, float(distances[i])
+
+
+class WarmStartStore:
+    """
+    A bounded, in-memory store of converged solutions.
+
+    Once max_size points are stored, the least recently used point is evicted.
+    """
+
+    def __init__(self, max_size=100):
+        self.max_size = max_size
+        self._buckets = {}  # spec names -> _Bucket
+        self._lru = OrderedDict()  # point id -> spec names
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self._lru)
+
+    def record(self, block, results=None):
+        """
+        Store the current values of the block.
+
+        Args:
+            block: The block (unit or flowsheet) that has been solved.
+            results: The solver results. If given, the point is only stored if the solve was optimal.
+        Returns:
+            True if the point was stored.
+        """
+        if results is not None and not check_optimal_termination(results):
+            return False
+        spec_vars = [v for var in list_specification(block) for v in _var_datas(var)]
+        variables = list(block.component_data_objects(Var, descend_into=True))
+        spec_names = relative_names(block, spec_vars)
+
+        bucket = self._buckets.get(spec_names)
+        if bucket is None:
+            bucket = _Bucket(spec_names, relative_names(block, variables))
+            self._buckets[spec_names] = bucket
+        elif len(bucket.var_names) != len(variables):
+            raise ValueError(
+                f"Block {block.name} has {len(variables)} variables, but the stored solutions with "
+                f"the same specification have {len(bucket.var_names)}. "
+                "A store should only be shared between blocks with the same structure."
+            )
+
+        point_id = self._next_id
+        self._next_id += 1
+        bucket.add(point_id, var_values(spec_vars), var_values(variables))
+        self._lru[point_id] = spec_names
+        while len(self._lru) > self.max_size:
+            old_id, old_spec_names = self._lru.popitem(last=False)
+            self._buckets[old_spec_names].remove(old_id)
+        return True
+
+    def seed(self, block):
+        """
+        Set the initial values of the block from the stored point that is nearest to the block's
+        current specification. Fixed variables and the specification itself are left alone.
+
+        Returns:
+            The normalised distance to the point used, or None if there was no suitable point.
+        """
+        spec_vars = [v for var in list_specification(block) for v in _var_datas(var)]
+        bucket = self._buckets.get(relative_names(block, spec_vars))
+        if bucket is None or len(bucket.ids) == 0:
+            return None
+
+        i, distance = bucket.nearest(var_values(spec_vars))
+        self._lru.move_to_end(bucket.ids[i])
+        variables = list(block.component_data_objects(Var, descend_into=True))
+        if len(variables) != len(bucket.var_names):
+            return None
+        spec = ComponentSet(spec_vars)
+        for v, val in zip(variables, bucket.values[i].tolist()):
+            if not v.fixed and v not in spec and not np.isnan(val):
+                v.set_value(val, skip_validation=True)
+        return distance
+
+
+    def nearest_points(self, block, n):
+        """
+        The values of up to n stored points nearest to the block's current specification, nearest first,
+        as dicts of {variable name relative to the block: value}.
+        As with seed(), fixed variables and the specification itself are left out.
+        """
+        spec_vars = [v for var in list_specification(block) for v in _var_datas(var)]
+        bucket = self._buckets.get(relative_names(block, spec_vars))
+        if bucket is None or len(bucket.ids) == 0:
+            return []
+        variables = list(block.component_data_objects(Var, descend_into=True))
+        if len(variables) != len(bucket.var_names):
+            return []
+        spec = ComponentSet(spec_vars)
+        guessed = [not v.fixed and v not in spec for v in variables]
+        order = np.argsort(bucket.distances(var_values(spec_vars)))[:n]
+        return [
+            {
+                name: val
+                for name, val, g in zip(bucket.var_names, bucket.values[i].tolist(), guessed)
+                if g and not np.isnan(val)
+            }
+            for i in order
+        ]
+
+
+_stores = {}
+
+
+def get_store(key, max_size=100):
+    """
+    Get the warm start store for a key, creating it if needed.
+
+    Use the unit class (e.g SVHeater) as the key to share solutions between all units of that type,
+    or any other hashable key (e.g the name of a flowsheet) for a store per flowsheet.
+    """
+    if key not in _stores:
+        _stores[key] = WarmStartStore(max_size)
+    return _stores[key]